@@ -37,11 +37,20 @@ from ODESolver import RungeKutta4
 import numpy as np
 import matplotlib.pyplot as plt
 from collections import OrderedDict
+import weakref
+
+# Workspaces of VBC.evaluate_into() by model, kept out of the attributes of the models so that
+# cache keys, copies and pickles do not see them
+WORKSPACES = weakref.WeakKeyDictionary()
 
 
 # Deterministic model (2 countries): Parameters and governing equations
 
 class VBC:
+    # Order of the parameters taken by __init__ (e.g. the columns of a parameter sweep)
+    PARAMETERS = ('mu1', 'mu2', 'mu3', 'mu4', 'muB', 'muC', 'muD', 'muE', 'k1', 'k2', 'k3', 'k4',
+                  'p1', 'p2', 'p3', 'p4', 'gamma1', 'gamma2', 'gamma3', 'gamma4', 'phi1', 'phi2', 'phi3', 'phi4')
+
     def __init__(self, mu1, mu2, mu3, mu4, muB, muC, muD, muE, k1, k2, k3, k4,
                  p1, p2, p3, p4, gamma1, gamma2, gamma3, gamma4, phi1, phi2, phi3, phi4):
         #rate at which agents enter voting system of country 1 (e.g. 0.06, around 6% of the population is 18 yo.)
@@ -93,7 +102,19 @@ class VBC:
         # per capita recruitment of party E from party D (between 0.0-1.0)
         self.phi4 = phi4
 
-    def __call__(self,u,t):
+    @classmethod
+    def from_array(cls, params):
+        # Build the model from parameter values in PARAMETERS order. An (n_sets, 24) array
+        # gives one model whose parameters are arrays over the sets; solved from
+        # (n_sets, 6) initial conditions, each row of the ensemble uses its own set
+        params = np.asarray(params, float)
+        return cls(*params.T)
+
+    def __call__(self,u,t,out=None):
+        # With out given, the derivatives are written into it (for RungeKutta4InPlace), see
+        # evaluate_into()
+        if out is not None:
+            return self.evaluate_into(u, out)
         #Unknown function
         V1, B, C, V2, D, E = u
         # Country 1: V1 -> Potential voters, B -> Voters of Political Party B, C -> Voters of Political Party C
@@ -154,214 +175,391 @@ class VBC:
              - self.gamma4*E
         return [dV1,dB,dC,dV2,dD,dE]
 
-# First simulation
-#Initial conditions country 1
-V10 = 1000
-B0 = 1000
-C0 = 1000
-#Initial conditions country 2
-V20 = 1000
-D0 = 1000
-E0 = 1000
-#Passing parameters to the model
-model = VBC(mu1=0.016, mu2=0.016, mu3=0.016, mu4=0.016,
-            muB= 0.016, muC= 0.016, muD=0.016, muE=0.016,
-            k1= 0.5, k2= 0.5, k3=0.5, k4=0.5,
-            p1= 0.1, p2= 0.1, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01,gamma3=0.01, gamma4=0.01,
-            phi1= 0.02, phi2= 0.02, phi3=0.02, phi4=0.02)
-
-solver= RungeKutta4(model)
-solver.set_initial_condition([V10,B0,C0,V20,D0,E0])
-time_points = np.linspace(0, 200, 1001)
-u,t = solver.solve(time_points)
-V1 = u[:,0]; B = u[:,1]; C = u[:,2]; V2 = u[:,3]; D = u[:,4]; E = u[:,5]
-print(V1,B,C,V2,D,E)
-
-fig, axs = plt.subplots(3,2)
-fig.suptitle('')
-axs[0,0].plot(t,V1,label="V1")
-axs[0,0].plot(t,B,label="B", ls=(0, (5, 1)))
-axs[0,0].plot(t,C,label="C", ls="-.")
-axs[0,0].plot(t,V2,label="V2", ls="--")
-axs[0,0].plot(t,D,label="D", ls="--")
-axs[0,0].plot(t,E,label="E", ls=":")
-axs[0,0].set_xlabel('Time in years')
-axs[0,0].set_ylabel('Number of agents')
-axs[0,0].set_title("")
-#axs[0,0].legend(loc='upper right')
-
-# Second simulation
-#Initial conditions country 1
-V10 = 1000
-B0 = 1000
-C0 = 1000
-#Initial conditions country 2
-V20 = 500
-D0 = 500
-E0 = 500
-#Passing parameters to the model
-model = VBC(mu1=0.016, mu2=0.016, mu3=0.016, mu4=0.016,
-            muB= 0.016, muC= 0.016, muD=0.016, muE=0.016,
-            k1= 0.5, k2= 0.5, k3=0.5, k4=0.5,
-            p1= 0.1, p2= 0.1, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01,gamma3=0.01, gamma4=0.01,
-            phi1= 0.02, phi2= 0.02, phi3=0.02, phi4=0.02)
-
-
-solver= RungeKutta4(model)
-solver.set_initial_condition([V10,B0,C0,V20,D0,E0])
-time_points = np.linspace(0, 200, 1001)
-u,t = solver.solve(time_points)
-V1 = u[:,0]; B = u[:,1]; C = u[:,2]; V2 = u[:,3]; D = u[:,4]; E = u[:,5]
-
-axs[0,1].plot(t,V1,label="V1")
-axs[0,1].plot(t,B,label="B", ls=(0, (5, 1)))
-axs[0,1].plot(t,C,label="C", ls="-.")
-axs[0,1].plot(t,V2,label="V2", ls="--")
-axs[0,1].plot(t,D,label="D", ls="--")
-axs[0,1].plot(t,E,label="E", ls=":")
-axs[0,1].set_xlabel('Time in years')
-axs[0,1].set_ylabel('Number of agents')
-
-# Third simulation
-#Initial conditions country 1
-V10 = 1000
-B0 = 1000
-C0 = 1000
-#Initial conditions country 2
-V20 = 1000
-D0 = 1000
-E0 = 1000
-#Passing parameters to the model
-model = VBC(mu1=0.016, mu2=0.016, mu3=0.016, mu4=0.016,
-            muB= 0.016, muC= 0.016, muD=0.016, muE=0.016,
-            k1= 0.4, k2= 0.5, k3=0.5, k4=0.5,
-            p1= 0.1, p2= 0.1, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01,gamma3=0.01, gamma4=0.01,
-            phi1= 0.02, phi2= 0.02, phi3=0.02, phi4=0.02)
-
-solver= RungeKutta4(model)
-solver.set_initial_condition([V10,B0,C0,V20,D0,E0])
-time_points = np.linspace(0, 200, 1001)
-u,t = solver.solve(time_points)
-V1 = u[:,0]; B = u[:,1]; C = u[:,2]; V2 = u[:,3]; D = u[:,4]; E = u[:,5]
-print(V1,B,C,V2,D,E)
-
-axs[1,0].plot(t,V1,label="V1")
-axs[1,0].plot(t,B,label="B", ls=(0, (5, 1)))
-axs[1,0].plot(t,C,label="C", ls="-.")
-axs[1,0].plot(t,V2,label="V2", ls="--")
-axs[1,0].plot(t,D,label="D", ls="--")
-axs[1,0].plot(t,E,label="E", ls=":")
-axs[1,0].set_xlabel('Time in years')
-axs[1,0].set_ylabel('Number of agents')
-axs[1,0].set_title("")
-#axs[0,0].legend(loc='upper right')
-
-# Fourth simulation
-#Initial conditions country 1
-V10 = 1000
-B0 = 1000
-C0 = 1000
-#Initial conditions country 2
-V20 = 500
-D0 = 500
-E0 = 500
-#Passing parameters to the model
-model = VBC(mu1=0.016, mu2=0.016, mu3=0.016, mu4=0.016,
-            muB= 0.016, muC= 0.016, muD=0.016, muE=0.016,
-            k1= 0.4, k2= 0.5, k3=0.5, k4=0.5,
-            p1= 0.1, p2= 0.1, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01,gamma3=0.01, gamma4=0.01,
-            phi1= 0.02, phi2= 0.02, phi3=0.02, phi4=0.02)
-
-
-solver= RungeKutta4(model)
-solver.set_initial_condition([V10,B0,C0,V20,D0,E0])
-time_points = np.linspace(0, 200, 1001)
-u,t = solver.solve(time_points)
-V1 = u[:,0]; B = u[:,1]; C = u[:,2]; V2 = u[:,3]; D = u[:,4]; E = u[:,5]
-
-axs[1,1].plot(t,V1,label="V1")
-axs[1,1].plot(t,B,label="B", ls=(0, (5, 1)))
-axs[1,1].plot(t,C,label="C", ls="-.")
-axs[1,1].plot(t,V2,label="V2", ls="--")
-axs[1,1].plot(t,D,label="D", ls="--")
-axs[1,1].plot(t,E,label="E", ls=":")
-axs[1,1].set_xlabel('Time in years')
-axs[1,1].set_ylabel('Number of agents')
-
-
-# Fifth simulation
-#Initial conditions country 1
-V10 = 10000
-B0 = 10000
-C0 = 10000
-#Initial conditions country 2
-V20 = 5000
-D0 = 5000
-E0 = 5000
-model = VBC(mu1=0.016, mu2=0.016, mu3=0.016, mu4=0.016,
-            muB= 0.016, muC= 0.016, muD=0.016, muE=0.016,
-            k1= 0.6, k2= 0.4, k3=0.6, k4=0.6,
-            p1= 0.2, p2= 0.1, p3=0.1, p4=0.2,
-            gamma1= 0.01, gamma2= 0.01,gamma3=0.01, gamma4=0.01,
-            phi1= 0.01, phi2= 0.03, phi3=0.015, phi4=0.01)
-
-solver= RungeKutta4(model)
-solver.set_initial_condition([V10,B0,C0,V20,D0,E0])
-time_points = np.linspace(0, 200, 1001)
-u,t = solver.solve(time_points)
-V1 = u[:,0]; B = u[:,1]; C = u[:,2]; V2 = u[:,3]; D = u[:,4]; E = u[:,5]
-print(V1,B,C,V2,D,E)
-
-axs[2,0].plot(t,V1,label="V1")
-axs[2,0].plot(t,B,label="B", ls=(0, (5, 1)))
-axs[2,0].plot(t,C,label="C", ls="-.")
-axs[2,0].plot(t,V2,label="V2", ls="--")
-axs[2,0].plot(t,D,label="D", ls="--")
-axs[2,0].plot(t,E,label="E", ls=":")
-axs[2,0].set_xlabel('Time in years')
-axs[2,0].set_ylabel('Number of agents')
-
-
-# Sixth simulation
-#Initial conditions country 1
-V10 = 10000
-B0 = 10000
-C0 = 10000
-#Initial conditions country 2
-V20 = 5000
-D0 = 5000
-E0 = 5000
-model = VBC(mu1=0.016, mu2=0.016, mu3=0.016, mu4=0.016,
-            muB= 0.016, muC= 0.016, muD=0.016, muE=0.016,
-            k1= 0.6, k2= 0.4, k3=0.6, k4=0.6,
-            p1= 0.2, p2= 0.1, p3=0.1, p4=0.2,
-            gamma1= 0.01, gamma2= 0.01,gamma3=0.01, gamma4=0.01,
-            phi1= 0.01, phi2= 0.03, phi3=0.03, phi4=0.01)
-
-
-solver= RungeKutta4(model)
-solver.set_initial_condition([V10,B0,C0,V20,D0,E0])
-time_points = np.linspace(0, 200, 1001)
-u,t = solver.solve(time_points)
-V1 = u[:,0]; B = u[:,1]; C = u[:,2]; V2 = u[:,3]; D = u[:,4]; E = u[:,5]
-
-axs[2,1].plot(t,V1,label="V1")
-axs[2,1].plot(t,B,label="B", ls=(0, (5, 1)))
-axs[2,1].plot(t,C,label="C", ls="-.")
-axs[2,1].plot(t,V2,label="V2", ls="--")
-axs[2,1].plot(t,D,label="D", ls="--")
-axs[2,1].plot(t,E,label="E", ls=":")
-axs[2,1].set_xlabel('Time in years')
-axs[2,1].set_ylabel('Number of agents')
-
-handles, labels = axs[1,1].get_legend_handles_labels()
-fig.legend(handles, labels, loc='lower center', ncol=2)
-plt.show()
-fig.set_size_inches(7, 6)
-fig.subplots_adjust(bottom=0.2)
-fig.savefig('3dPlot.pdf')
-
+    def __setattr__(self, name, value):
+        # Reassigning a parameter drops the workspace of evaluate_into()
+        if name in self.PARAMETERS:
+            WORKSPACES.pop(self, None)
+        object.__setattr__(self, name, value)
+
+    def workspace(self, u):
+        # Scratch arrays of evaluate_into() for states shaped like u, and the coefficients of
+        # the flows. Kept in WORKSPACES until the state shape changes or a parameter is
+        # reassigned (changing an array parameter in place is not noticed)
+        key = np.shape(u[0])
+        workspace = WORKSPACES.get(self)
+        if workspace is not None and workspace[0] == key:
+            return workspace
+        a1, a2, a3, a4 = self.k1*self.p1, self.k2*self.p2, self.k3*self.p3, self.k4*self.p4
+        # (coefficient, compartment x, ratio y/N, source, target) of the flows c*x*y/N, and the
+        # ratios B/N1, C/N1, D/N2, E/N2 by index
+        flows = [(a1, 0, 0, 0, 1), ((1-a1)*a3, 0, 2, 0, 1),                            # V1 -> B
+                 (a2, 0, 1, 0, 2), ((1-a2)*a4, 0, 3, 0, 2),                            # V1 -> C
+                 (self.phi2, 1, 1, 1, 2), ((1-self.phi2)*self.phi4, 1, 3, 1, 2),       # B -> C
+                 (self.phi1, 2, 0, 2, 1), ((1-self.phi1)*self.phi3, 2, 2, 2, 1),       # C -> B
+                 (a3, 3, 2, 3, 4), ((1-a3)*a1, 3, 0, 3, 4),                            # V2 -> D
+                 (a4, 3, 3, 3, 5), ((1-a4)*a2, 3, 1, 3, 5),                            # V2 -> E
+                 (self.phi4, 4, 3, 4, 5), ((1-self.phi4)*self.phi2, 4, 1, 4, 5),       # D -> E
+                 (self.phi3, 5, 2, 5, 4), ((1-self.phi3)*self.phi1, 5, 0, 5, 4)]       # E -> D
+        # (rate, compartment, equation) of the linear terms rate*u[compartment]
+        linear = [(-self.mu2, 0, 0), (self.gamma1, 1, 0), (self.gamma2, 2, 0),
+                  (-(self.muB + self.gamma1), 1, 1), (-(self.muC + self.gamma2), 2, 2),
+                  (-self.mu4, 3, 3), (self.gamma3, 4, 3), (self.gamma4, 5, 3),
+                  (-(self.muD + self.gamma3), 4, 4), (-(self.muE + self.gamma4), 5, 5)]
+        shape = np.broadcast(np.empty(np.shape(u[0])), *[getattr(self, name) for name in self.PARAMETERS]).shape
+        # N1, N2, the four ratios and a temporary
+        scratch = [np.empty(shape) for i in range(7)]
+        workspace = WORKSPACES[self] = (key, scratch, flows, linear)
+        return workspace
+
+    def evaluate_into(self, u, out):
+        # __call__ written into out without allocating arrays: every term is evaluated into
+        # the scratch arrays of workspace()
+        # Rows as arrays, also for a single system (whose rows are scalars)
+        u = np.reshape(u, (6, -1)) if np.ndim(u) == 1 else u
+        rows = np.reshape(out, (6, -1)) if np.ndim(out) == 1 else out
+        key, scratch, flows, linear = self.workspace(u)
+        N1, N2, b, c, d, e, tmp = scratch
+        np.add(u[0], u[1], out=N1)
+        np.add(N1, u[2], out=N1)
+        np.add(u[3], u[4], out=N2)
+        np.add(N2, u[5], out=N2)
+        ratios = (b, c, d, e)
+        np.divide(u[1], N1, out=b)
+        np.divide(u[2], N1, out=c)
+        np.divide(u[4], N2, out=d)
+        np.divide(u[5], N2, out=e)
+        # Entries into the potential voters
+        np.multiply(N1, self.mu1, out=rows[0])
+        np.multiply(N2, self.mu3, out=rows[3])
+        for i in (1, 2, 4, 5):
+            rows[i].fill(0.0)
+        for rate, x, i in linear:
+            np.multiply(u[x], rate, out=tmp)
+            np.add(rows[i], tmp, out=rows[i])
+        for coefficient, x, y, source, target in flows:
+            np.multiply(u[x], ratios[y], out=tmp)
+            np.multiply(tmp, coefficient, out=tmp)
+            np.subtract(rows[source], tmp, out=rows[source])
+            np.add(rows[target], tmp, out=rows[target])
+        return out
+
+    def jac(self, u, t):
+        # Analytic Jacobian of __call__ with respect to u, see jacobian()
+        return jacobian(u, *[getattr(self, name) for name in self.PARAMETERS])
+
+    def param_jac(self, u, t):
+        # Jacobian of __call__ with respect to the parameters, see parameter_jacobian()
+        return parameter_jacobian(u, *[getattr(self, name) for name in self.PARAMETERS])
+
+    def subset(self, index):
+        # Model for the ensemble members in index: parameters given per member are indexed,
+        # shared ones are kept (lets ODESolver skip members masked by an event)
+        values = [getattr(self, name) for name in self.PARAMETERS]
+        return type(self)(*[np.asarray(v)[index] if np.ndim(v) else v for v in values])
+
+# Jacobian of the governing equations
+
+def jacobian(u, mu1, mu2, mu3, mu4, muB, muC, muD, muE, k1, k2, k3, k4,
+             p1, p2, p3, p4, gamma1, gamma2, gamma3, gamma4, phi1, phi2, phi3, phi4):
+    # J[i, j] = d(du_i/dt)/du_j for u = (V1, B, C, V2, D, E). With the equations along the first
+    # axis of u, an ensemble of states (and of parameters) gives J of shape (6, 6, n_members)
+    u = np.asarray(u, float)
+    N = [u[0] + u[1] + u[2], u[3] + u[4] + u[5]]
+    J = np.zeros((6, 6) + np.broadcast(u[0], k1, p1, phi1, gamma1, mu1).shape)
+    # Non-linear flows c*X*Y/N (country of N) from compartment to compartment, as in __call__
+    flows = [(k1*p1, 0, 1, 0, 0, 1),                       # V1 -> B
+             ((1-(k1*p1))*k3*p3, 0, 4, 1, 0, 1),
+             (k2*p2, 0, 2, 0, 0, 2),                       # V1 -> C
+             ((1-(k2*p2))*k4*p4, 0, 5, 1, 0, 2),
+             (phi2, 1, 2, 0, 1, 2),                        # B -> C
+             ((1-phi2)*phi4, 1, 5, 1, 1, 2),
+             (phi1, 2, 1, 0, 2, 1),                        # C -> B
+             ((1-phi1)*phi3, 2, 4, 1, 2, 1),
+             (k3*p3, 3, 4, 1, 3, 4),                       # V2 -> D
+             ((1-(k3*p3))*k1*p1, 3, 1, 0, 3, 4),
+             (k4*p4, 3, 5, 1, 3, 5),                       # V2 -> E
+             ((1-(k4*p4))*k2*p2, 3, 2, 0, 3, 5),
+             (phi4, 4, 5, 1, 4, 5),                        # D -> E
+             ((1-phi4)*phi2, 4, 2, 0, 4, 5),
+             (phi3, 5, 4, 1, 5, 4),                        # E -> D
+             ((1-phi3)*phi1, 5, 1, 0, 5, 4)]
+    for c, x, y, k, source, target in flows:
+        # Gradient of c*u[x]*u[y]/N_k
+        grad = np.zeros_like(J[0])
+        grad[x] += c*u[y]/N[k]
+        grad[y] += c*u[x]/N[k]
+        grad[3*k:3*k+3] -= c*u[x]*u[y]/N[k]**2
+        J[target] += grad
+        J[source] -= grad
+    # Entries, exits and leakage back to potential voters
+    J[0, 0:3] += mu1
+    J[3, 3:6] += mu3
+    J[0, 0] -= mu2
+    J[3, 3] -= mu4
+    for gamma, mu, i, v in [(gamma1, muB, 1, 0), (gamma2, muC, 2, 0), (gamma3, muD, 4, 3), (gamma4, muE, 5, 3)]:
+        J[v, i] += gamma
+        J[i, i] -= gamma + mu
+    return J
+
+def parameter_jacobian(u, mu1, mu2, mu3, mu4, muB, muC, muD, muE, k1, k2, k3, k4,
+                       p1, p2, p3, p4, gamma1, gamma2, gamma3, gamma4, phi1, phi2, phi3, phi4):
+    # P[i, j] = d(du_i/dt)/d(parameter j), parameters in VBC.PARAMETERS order; (6, 24, n_members)
+    # for an ensemble, as jacobian()
+    u = np.asarray(u, float)
+    N = [u[0] + u[1] + u[2], u[3] + u[4] + u[5]]
+    P = np.zeros((6, 24) + np.broadcast(u[0], k1, p1, phi1, gamma1, mu1).shape)
+    k, p, phi = [k1, k2, k3, k4], [p1, p2, p3, p4], [phi1, phi2, phi3, phi4]
+    a = [k[i]*p[i] for i in range(4)]
+    K, Pi, PHI = 8, 12, 20 # positions of k1, p1 and phi1
+    def da(i, factor):
+        # Derivatives of factor*k_i*p_i
+        return [(K + i, factor*p[i]), (Pi + i, factor*k[i])]
+    # The non-linear flows c*u[x]*u[y]/N[country] of jacobian(), with the derivatives of c as
+    # [(parameter, dc)]
+    flows = [(da(0, 1), 0, 1, 0, 0, 1),                                     # V1 -> B
+             (da(0, -a[2]) + da(2, 1 - a[0]), 0, 4, 1, 0, 1),
+             (da(1, 1), 0, 2, 0, 0, 2),                                     # V1 -> C
+             (da(1, -a[3]) + da(3, 1 - a[1]), 0, 5, 1, 0, 2),
+             ([(PHI + 1, 1)], 1, 2, 0, 1, 2),                               # B -> C
+             ([(PHI + 1, -phi4), (PHI + 3, 1 - phi2)], 1, 5, 1, 1, 2),
+             ([(PHI + 0, 1)], 2, 1, 0, 2, 1),                               # C -> B
+             ([(PHI + 0, -phi3), (PHI + 2, 1 - phi1)], 2, 4, 1, 2, 1),
+             (da(2, 1), 3, 4, 1, 3, 4),                                     # V2 -> D
+             (da(2, -a[0]) + da(0, 1 - a[2]), 3, 1, 0, 3, 4),
+             (da(3, 1), 3, 5, 1, 3, 5),                                     # V2 -> E
+             (da(3, -a[1]) + da(1, 1 - a[3]), 3, 2, 0, 3, 5),
+             ([(PHI + 3, 1)], 4, 5, 1, 4, 5),                               # D -> E
+             ([(PHI + 3, -phi2), (PHI + 1, 1 - phi4)], 4, 2, 0, 4, 5),
+             ([(PHI + 2, 1)], 5, 4, 1, 5, 4),                               # E -> D
+             ([(PHI + 2, -phi1), (PHI + 0, 1 - phi3)], 5, 1, 0, 5, 4)]
+    for derivatives, x, y, country, source, target in flows:
+        flow = u[x]*u[y]/N[country]
+        for j, dc in derivatives:
+            P[target, j] += dc*flow
+            P[source, j] -= dc*flow
+    # Entries, exits and leakage back to potential voters
+    P[0, 0] += N[0]
+    P[0, 1] -= u[0]
+    P[3, 2] += N[1]
+    P[3, 3] -= u[3]
+    for j, i, v in [(0, 1, 0), (1, 2, 0), (2, 4, 3), (3, 5, 3)]:
+        P[i, 4 + j] -= u[i]   # muB, muC, muD, muE
+        P[v, 16 + j] += u[i]  # gamma1..gamma4
+        P[i, 16 + j] -= u[i]
+    return P
+
+if __name__ == "__main__":
+    from cache import ResultCache
+    # Trajectories of earlier runs are reused from .vbc_cache
+    cache = ResultCache('.vbc_cache')
+
+    # First simulation
+    #Initial conditions country 1
+    V10 = 1000
+    B0 = 1000
+    C0 = 1000
+    #Initial conditions country 2
+    V20 = 1000
+    D0 = 1000
+    E0 = 1000
+    #Passing parameters to the model
+    model = VBC(mu1=0.016, mu2=0.016, mu3=0.016, mu4=0.016,
+                muB= 0.016, muC= 0.016, muD=0.016, muE=0.016,
+                k1= 0.5, k2= 0.5, k3=0.5, k4=0.5,
+                p1= 0.1, p2= 0.1, p3=0.1, p4=0.1,
+                gamma1= 0.01, gamma2= 0.01,gamma3=0.01, gamma4=0.01,
+                phi1= 0.02, phi2= 0.02, phi3=0.02, phi4=0.02)
+
+    solver= RungeKutta4(model)
+    solver.set_initial_condition([V10,B0,C0,V20,D0,E0])
+    time_points = np.linspace(0, 200, 1001)
+    u,t = cache.solve(solver, time_points)
+    V1 = u[:,0]; B = u[:,1]; C = u[:,2]; V2 = u[:,3]; D = u[:,4]; E = u[:,5]
+    print(V1,B,C,V2,D,E)
+
+    fig, axs = plt.subplots(3,2)
+    fig.suptitle('')
+    axs[0,0].plot(t,V1,label="V1")
+    axs[0,0].plot(t,B,label="B", ls=(0, (5, 1)))
+    axs[0,0].plot(t,C,label="C", ls="-.")
+    axs[0,0].plot(t,V2,label="V2", ls="--")
+    axs[0,0].plot(t,D,label="D", ls="--")
+    axs[0,0].plot(t,E,label="E", ls=":")
+    axs[0,0].set_xlabel('Time in years')
+    axs[0,0].set_ylabel('Number of agents')
+    axs[0,0].set_title("")
+    #axs[0,0].legend(loc='upper right')
+
+    # Second simulation
+    #Initial conditions country 1
+    V10 = 1000
+    B0 = 1000
+    C0 = 1000
+    #Initial conditions country 2
+    V20 = 500
+    D0 = 500
+    E0 = 500
+    #Passing parameters to the model
+    model = VBC(mu1=0.016, mu2=0.016, mu3=0.016, mu4=0.016,
+                muB= 0.016, muC= 0.016, muD=0.016, muE=0.016,
+                k1= 0.5, k2= 0.5, k3=0.5, k4=0.5,
+                p1= 0.1, p2= 0.1, p3=0.1, p4=0.1,
+                gamma1= 0.01, gamma2= 0.01,gamma3=0.01, gamma4=0.01,
+                phi1= 0.02, phi2= 0.02, phi3=0.02, phi4=0.02)
+
+
+    solver= RungeKutta4(model)
+    solver.set_initial_condition([V10,B0,C0,V20,D0,E0])
+    time_points = np.linspace(0, 200, 1001)
+    u,t = cache.solve(solver, time_points)
+    V1 = u[:,0]; B = u[:,1]; C = u[:,2]; V2 = u[:,3]; D = u[:,4]; E = u[:,5]
+
+    axs[0,1].plot(t,V1,label="V1")
+    axs[0,1].plot(t,B,label="B", ls=(0, (5, 1)))
+    axs[0,1].plot(t,C,label="C", ls="-.")
+    axs[0,1].plot(t,V2,label="V2", ls="--")
+    axs[0,1].plot(t,D,label="D", ls="--")
+    axs[0,1].plot(t,E,label="E", ls=":")
+    axs[0,1].set_xlabel('Time in years')
+    axs[0,1].set_ylabel('Number of agents')
+
+    # Third simulation
+    #Initial conditions country 1
+    V10 = 1000
+    B0 = 1000
+    C0 = 1000
+    #Initial conditions country 2
+    V20 = 1000
+    D0 = 1000
+    E0 = 1000
+    #Passing parameters to the model
+    model = VBC(mu1=0.016, mu2=0.016, mu3=0.016, mu4=0.016,
+                muB= 0.016, muC= 0.016, muD=0.016, muE=0.016,
+                k1= 0.4, k2= 0.5, k3=0.5, k4=0.5,
+                p1= 0.1, p2= 0.1, p3=0.1, p4=0.1,
+                gamma1= 0.01, gamma2= 0.01,gamma3=0.01, gamma4=0.01,
+                phi1= 0.02, phi2= 0.02, phi3=0.02, phi4=0.02)
+
+    solver= RungeKutta4(model)
+    solver.set_initial_condition([V10,B0,C0,V20,D0,E0])
+    time_points = np.linspace(0, 200, 1001)
+    u,t = cache.solve(solver, time_points)
+    V1 = u[:,0]; B = u[:,1]; C = u[:,2]; V2 = u[:,3]; D = u[:,4]; E = u[:,5]
+    print(V1,B,C,V2,D,E)
+
+    axs[1,0].plot(t,V1,label="V1")
+    axs[1,0].plot(t,B,label="B", ls=(0, (5, 1)))
+    axs[1,0].plot(t,C,label="C", ls="-.")
+    axs[1,0].plot(t,V2,label="V2", ls="--")
+    axs[1,0].plot(t,D,label="D", ls="--")
+    axs[1,0].plot(t,E,label="E", ls=":")
+    axs[1,0].set_xlabel('Time in years')
+    axs[1,0].set_ylabel('Number of agents')
+    axs[1,0].set_title("")
+    #axs[0,0].legend(loc='upper right')
+
+    # Fourth simulation
+    #Initial conditions country 1
+    V10 = 1000
+    B0 = 1000
+    C0 = 1000
+    #Initial conditions country 2
+    V20 = 500
+    D0 = 500
+    E0 = 500
+    #Passing parameters to the model
+    model = VBC(mu1=0.016, mu2=0.016, mu3=0.016, mu4=0.016,
+                muB= 0.016, muC= 0.016, muD=0.016, muE=0.016,
+                k1= 0.4, k2= 0.5, k3=0.5, k4=0.5,
+                p1= 0.1, p2= 0.1, p3=0.1, p4=0.1,
+                gamma1= 0.01, gamma2= 0.01,gamma3=0.01, gamma4=0.01,
+                phi1= 0.02, phi2= 0.02, phi3=0.02, phi4=0.02)
+
+
+    solver= RungeKutta4(model)
+    solver.set_initial_condition([V10,B0,C0,V20,D0,E0])
+    time_points = np.linspace(0, 200, 1001)
+    u,t = cache.solve(solver, time_points)
+    V1 = u[:,0]; B = u[:,1]; C = u[:,2]; V2 = u[:,3]; D = u[:,4]; E = u[:,5]
+
+    axs[1,1].plot(t,V1,label="V1")
+    axs[1,1].plot(t,B,label="B", ls=(0, (5, 1)))
+    axs[1,1].plot(t,C,label="C", ls="-.")
+    axs[1,1].plot(t,V2,label="V2", ls="--")
+    axs[1,1].plot(t,D,label="D", ls="--")
+    axs[1,1].plot(t,E,label="E", ls=":")
+    axs[1,1].set_xlabel('Time in years')
+    axs[1,1].set_ylabel('Number of agents')
+
+
+    # Fifth simulation
+    #Initial conditions country 1
+    V10 = 10000
+    B0 = 10000
+    C0 = 10000
+    #Initial conditions country 2
+    V20 = 5000
+    D0 = 5000
+    E0 = 5000
+    model = VBC(mu1=0.016, mu2=0.016, mu3=0.016, mu4=0.016,
+                muB= 0.016, muC= 0.016, muD=0.016, muE=0.016,
+                k1= 0.6, k2= 0.4, k3=0.6, k4=0.6,
+                p1= 0.2, p2= 0.1, p3=0.1, p4=0.2,
+                gamma1= 0.01, gamma2= 0.01,gamma3=0.01, gamma4=0.01,
+                phi1= 0.01, phi2= 0.03, phi3=0.015, phi4=0.01)
+
+    solver= RungeKutta4(model)
+    solver.set_initial_condition([V10,B0,C0,V20,D0,E0])
+    time_points = np.linspace(0, 200, 1001)
+    u,t = cache.solve(solver, time_points)
+    V1 = u[:,0]; B = u[:,1]; C = u[:,2]; V2 = u[:,3]; D = u[:,4]; E = u[:,5]
+    print(V1,B,C,V2,D,E)
+
+    axs[2,0].plot(t,V1,label="V1")
+    axs[2,0].plot(t,B,label="B", ls=(0, (5, 1)))
+    axs[2,0].plot(t,C,label="C", ls="-.")
+    axs[2,0].plot(t,V2,label="V2", ls="--")
+    axs[2,0].plot(t,D,label="D", ls="--")
+    axs[2,0].plot(t,E,label="E", ls=":")
+    axs[2,0].set_xlabel('Time in years')
+    axs[2,0].set_ylabel('Number of agents')
+
+
+    # Sixth simulation
+    #Initial conditions country 1
+    V10 = 10000
+    B0 = 10000
+    C0 = 10000
+    #Initial conditions country 2
+    V20 = 5000
+    D0 = 5000
+    E0 = 5000
+    model = VBC(mu1=0.016, mu2=0.016, mu3=0.016, mu4=0.016,
+                muB= 0.016, muC= 0.016, muD=0.016, muE=0.016,
+                k1= 0.6, k2= 0.4, k3=0.6, k4=0.6,
+                p1= 0.2, p2= 0.1, p3=0.1, p4=0.2,
+                gamma1= 0.01, gamma2= 0.01,gamma3=0.01, gamma4=0.01,
+                phi1= 0.01, phi2= 0.03, phi3=0.03, phi4=0.01)
+
+
+    solver= RungeKutta4(model)
+    solver.set_initial_condition([V10,B0,C0,V20,D0,E0])
+    time_points = np.linspace(0, 200, 1001)
+    u,t = cache.solve(solver, time_points)
+    V1 = u[:,0]; B = u[:,1]; C = u[:,2]; V2 = u[:,3]; D = u[:,4]; E = u[:,5]
+
+    axs[2,1].plot(t,V1,label="V1")
+    axs[2,1].plot(t,B,label="B", ls=(0, (5, 1)))
+    axs[2,1].plot(t,C,label="C", ls="-.")
+    axs[2,1].plot(t,V2,label="V2", ls="--")
+    axs[2,1].plot(t,D,label="D", ls="--")
+    axs[2,1].plot(t,E,label="E", ls=":")
+    axs[2,1].set_xlabel('Time in years')
+    axs[2,1].set_ylabel('Number of agents')
+
+    handles, labels = axs[1,1].get_legend_handles_labels()
+    fig.legend(handles, labels, loc='lower center', ncol=2)
+    plt.show()
+    fig.set_size_inches(7, 6)
+    fig.subplots_adjust(bottom=0.2)
+    fig.savefig('3dPlot.pdf')
@@ -0,0 +1,143 @@
+# Cross-border influence model for any number of countries and parties.
+#
+# Generalises the deterministic model of Model.py (2 countries, 2 parties each) to C countries
+# with K parties each, where party j of every country stands for the same ideology j (B and
+# D, C and E in Model.VBC). The state of country c is [V_c, P_c1, ..., P_cK] and the
+# governing equations follow Model.VBC term by term: with s_cj = P_cj/N_c,
+#   recruitment of potential voters into j:  R_cj = a_cj*s_cj + (1 - a_cj)*sum_d W_cd*a_dj*s_dj
+#   pull of party j on voters of other parties: Q_cj = phi_cj*s_cj + (1 - phi_cj)*sum_d W_cd*phi_dj*s_dj
+#   dV_c/dt  = mu_birth_c*N_c - V_c*sum_j R_cj - mu_death_c*V_c + sum_j gamma_cj*P_cj
+#   dP_cj/dt = V_c*R_cj + Q_cj*(N_c - V_c - P_cj) - P_cj*(sum_i Q_ci - Q_cj) - (mu_cj + gamma_cj)*P_cj
+# where a_cj = k_cj*p_cj and W is the cross-border exposure matrix (W_cd: weight of the
+# influence of country d on country c). W is held as a list of links, so the right-hand side
+# costs O(C*K + links*K) however many countries there are. With C = K = 2 and
+# W = [[0, 1], [1, 0]] this is Model.VBC (see VBCNetwork.from_vbc).
+
+import numpy as np
+from ODESolver import RungeKutta4
+import matplotlib.pyplot as plt
+
+
+class VBCNetwork:
+    def __init__(self, mu_birth, mu_death, mu, k, p, gamma, phi, W):
+        # mu_birth, mu_death: (C,) rates at which agents enter / leave the potential voters of
+        # each country; mu, k, p, gamma, phi: (C, K) death rate, contacts per time, persuasion
+        # probability per contact, leakage back to potential voters and per capita recruitment
+        # from the other parties, for party j of country c. Parameters may carry a trailing
+        # ensemble axis, (C, m) and (C, K, m), as in Model.VBC.from_array.
+        # W: (C, C) exposure matrix, as a numpy array or any scipy.sparse matrix
+        self.mu_birth = np.asarray(mu_birth, float)
+        self.mu_death = np.asarray(mu_death, float)
+        self.mu = np.asarray(mu, float)
+        self.k = np.asarray(k, float)
+        self.p = np.asarray(p, float)
+        self.gamma = np.asarray(gamma, float)
+        self.phi = np.asarray(phi, float)
+        self.n_countries, self.n_parties = self.k.shape[:2]
+        self.W = W
+        if hasattr(W, 'tocoo'): # scipy.sparse
+            W = W.tocoo()
+            rows, cols, weights = W.row, W.col, W.data
+        else:
+            W = np.asarray(W, float)
+            rows, cols = np.nonzero(W)
+            weights = W[rows, cols]
+        if np.shape(W) != (self.n_countries, self.n_countries):
+            raise ValueError("VBCNetwork: W must be %d x %d, not %s" % (self.n_countries, self.n_countries, np.shape(W)))
+        # Links sorted by target country, so that sums over them are one reduceat
+        order = np.argsort(rows, kind='stable')
+        self.rows, self.cols = np.asarray(rows)[order], np.asarray(cols)[order]
+        self.weights = np.asarray(weights, float)[order]
+        self.targets, self.starts = np.unique(self.rows, return_index=True)
+
+    @classmethod
+    def from_vbc(cls, vbc):
+        # The 2 x 2 network equivalent to a Model.VBC instance
+        def g(*names):
+            values = np.array(np.broadcast_arrays(*[np.asarray(getattr(vbc, n), float) for n in names]))
+            return values.reshape((len(names)//2, 2) + values.shape[1:]) if len(names) == 4 else values
+        return cls(g('mu1', 'mu3'), g('mu2', 'mu4'),
+                   g('muB', 'muC', 'muD', 'muE'), g('k1', 'k2', 'k3', 'k4'), g('p1', 'p2', 'p3', 'p4'),
+                   g('gamma1', 'gamma2', 'gamma3', 'gamma4'), g('phi1', 'phi2', 'phi3', 'phi4'),
+                   np.array([[0, 1], [1, 0]], float))
+
+    @property
+    def neq(self):
+        return self.n_countries*(self.n_parties + 1)
+
+    def index(self, country, party=None):
+        # Position in the state of the potential voters (party None) or of a party of a country
+        return country*(self.n_parties + 1) + (0 if party is None else party + 1)
+
+    def state(self, V, P):
+        # Flat state from V (C[, m]) and P (C, K[, m]); an ensemble comes out as (m, neq)
+        V, P = np.asarray(V, float), np.asarray(P, float)
+        u = np.concatenate([V[:, None], P], axis=1)
+        return u.reshape((self.neq,) + u.shape[2:]).T
+
+    def split(self, u):
+        # V (C, ...) and P (C, K, ...) from a state with the equations along the first axis
+        u = np.asarray(u, float).reshape((self.n_countries, self.n_parties + 1) + np.shape(u)[1:])
+        return u[:, 0], u[:, 1:]
+
+    def exposure(self, X):
+        # (W @ X) over the first axis of X (C, ...), summed over the links only
+        out = np.zeros(X.shape)
+        if len(self.weights):
+            w = self.weights.reshape((-1,) + (1,)*(X.ndim - 1))
+            out[self.targets] = np.add.reduceat(w*X[self.cols], self.starts, axis=0)
+        return out
+
+    def subset(self, index):
+        # Model for the ensemble members in index (see ODESolver events)
+        member = lambda a, ndim: a[..., index] if a.ndim > ndim else a
+        return type(self)(member(self.mu_birth, 1), member(self.mu_death, 1), member(self.mu, 2),
+                          member(self.k, 2), member(self.p, 2), member(self.gamma, 2),
+                          member(self.phi, 2), self.W)
+
+    def __call__(self, u, t, out=None):
+        # With out given, the derivatives are written into it (for RungeKutta4InPlace)
+        V, P = self.split(u)
+        extra = V.ndim - 1
+        # Parameters without an ensemble axis broadcast against the members
+        param = lambda a, ndim: a.reshape(a.shape + (1,)*(ndim + extra - a.ndim))
+        mu_birth, mu_death = param(self.mu_birth, 1), param(self.mu_death, 1)
+        mu, gamma, phi = param(self.mu, 2), param(self.gamma, 2), param(self.phi, 2)
+        a = param(self.k, 2)*param(self.p, 2)
+        N = V + P.sum(axis=1)
+        s = P/N[:, None]
+        R = a*s + (1 - a)*self.exposure(a*s)
+        Q = phi*s + (1 - phi)*self.exposure(phi*s)
+        recruited = V[:, None]*R
+        dV = mu_birth*N - recruited.sum(axis=1) - mu_death*V + (gamma*P).sum(axis=1)
+        dP = recruited + Q*(N - V)[:, None] - Q*P - P*(Q.sum(axis=1)[:, None] - Q) - (mu + gamma)*P
+        du = np.concatenate([dV[:, None], dP], axis=1).reshape(np.shape(u))
+        if out is None:
+            return du
+        out[...] = du
+        return out
+
+
+if __name__ == "__main__":
+    # Six countries on a ring, each exposed to its two neighbours, with three parties. Party 0
+    # starts strong in country 0 only and spreads along the ring
+    C, K = 6, 3
+    W = np.zeros((C, C))
+    for c in range(C):
+        W[c, (c - 1) % C] = W[c, (c + 1) % C] = 0.5
+    ones = np.ones((C, K))
+    model = VBCNetwork(mu_birth=0.016*np.ones(C), mu_death=0.016*np.ones(C), mu=0.016*ones,
+                       k=0.5*ones, p=0.1*ones, gamma=0.01*ones, phi=0.02*ones, W=W)
+    model.k[0, 0] = 0.7
+    P0 = 1000*ones
+    P0[0, 0] = 3000
+    solver = RungeKutta4(model)
+    solver.set_initial_condition(model.state(1000*np.ones(C), P0))
+    u, t = solver.solve(np.linspace(0, 200, 1001))
+    V, P = model.split(u.T)
+    for c in range(C):
+        plt.plot(t, P[c, 0]/(V[c] + P[c].sum(axis=0)), label='Party 0, country %d' % c)
+    plt.xlabel('Time')
+    plt.ylabel('Share of the population')
+    plt.legend()
+    plt.show()
@@ -1,10 +1,78 @@
 import numpy as np
 
+class Event:
+    # An event is a sign change of g(u, t) along a trajectory. g gets the state like f
+    # (equations along the first axis) and returns one value per ensemble member, e.g.
+    #   Event(lambda u, t: u[1] - u[2], direction=1)                 B overtakes C
+    #   Event(lambda u, t: u[0] - 1e5, direction=-1)                 V1 falls below 1e5
+    #   Event(lambda u, t: u[1]/(u[0] + u[1] + u[2]) - 0.05, direction=-1,
+    #         action='mask')                                         B's share drops below 5%
+    # direction: +1 only counts crossings from negative to positive values, -1 the
+    # opposite ones and 0 both. action: 'record' logs the time and state of the event,
+    # 'terminate' also ends the solve there and 'mask' freezes the member at that state
+    # while the rest of the ensemble goes on. Events are located to xtol (a fraction of
+    # the step) on an interpolant of the step, during which t is an array with one time
+    # per ensemble member.
+    ACTIONS = ('record', 'terminate', 'mask')
+
+    def __init__(self, g, direction=0, action='record', xtol=1e-10):
+        if action not in self.ACTIONS:
+            raise ValueError("Event: action must be one of %s, not %r" % (', '.join(self.ACTIONS), action))
+        self.g = g
+        self.direction = direction
+        self.action = action
+        self.xtol = xtol
+
+    def crossed(self, g_old, g_new):
+        up = (g_old < 0) & (g_new >= 0)
+        down = (g_old > 0) & (g_new <= 0)
+        if self.direction > 0:
+            return up
+        if self.direction < 0:
+            return down
+        return up | down
+
+def save_grid(time_points, save_at):
+    # Union of the stepping grid and the output times save_at, and the positions of save_at
+    # in it. Grid points within round-off of an output time are replaced by it
+    time_points = np.asarray(time_points, float)
+    save_at = np.atleast_1d(np.asarray(save_at, float))
+    if np.any(np.diff(save_at) <= 0):
+        raise ValueError("save_at must be increasing")
+    tol = 1e-9*(time_points[-1] - time_points[0])
+    if save_at[0] < time_points[0] - tol or save_at[-1] > time_points[-1] + tol:
+        raise ValueError("save_at must lie within [%g, %g]" % (time_points[0], time_points[-1]))
+    i = np.clip(np.searchsorted(save_at, time_points), 1, max(len(save_at) - 1, 1))
+    distance = np.minimum(np.abs(time_points - save_at[i-1]), np.abs(time_points - save_at[np.minimum(i, len(save_at) - 1)]))
+    grid = np.union1d(time_points[distance > tol], save_at)
+    return grid, np.searchsorted(grid, save_at)
+
+def collect_saved(chunks, grid, keep, shape):
+    # Rows keep of the grid out of the (t, u) chunks of an iter_solve; a run that ends early
+    # (terminal event) keeps the rows it reached
+    u = np.zeros((len(keep),) + shape)
+    start = count = 0
+    for t_chunk, u_chunk in chunks:
+        rows = keep[(keep >= start) & (keep < start + len(t_chunk))]
+        rows = rows[t_chunk[rows - start] == grid[rows]]
+        u[count:count+len(rows)] = u_chunk[rows - start]
+        count += len(rows)
+        start += len(t_chunk)
+    return u[:count], grid[keep[:count]]
+
+def chunk_rows(U0, nbytes=2**24):
+    # Rows of a chunk of about nbytes for states like U0
+    return max(2, nbytes//(8*max(1, np.size(U0))))
+
 class ODESolver:
     def __init__(self, f):
         # Wrap user’s f in a new function that always
-        # converts list/tuple to array (or let array be array)
-        self.f = lambda u, t: np.asarray(f(u, t), float)
+        # converts list/tuple to array (or let array be array).
+        # Ensembles are stored as (n_members, neq) rows, but f always gets
+        # the equations along the first axis, so a right-hand side written
+        # for a single state advances every member in one vectorized call
+        self.rhs = f
+        self.f = lambda u, t: np.asarray(f(u.T, t), float).T
 
     def set_initial_condition(self, U0):
         if isinstance(U0, (float,int)): # scalar ODE
@@ -12,26 +80,256 @@ class ODESolver:
             U0 = float(U0)
         else: # system of ODEs
             U0 = np.asarray(U0)
-            self.neq = U0.size # no of equations
+            self.neq = U0.shape[-1] # no of equations
+            # (n_members, neq) initial conditions integrate an ensemble
+            self.n_members = U0.shape[0] if U0.ndim == 2 else 1
         self.U0 = U0
 
-    def solve(self, time_points):
+    def solve(self, time_points, events=None, save_at=None):
+        # events: a list of Event. Their times, states and ensemble members are
+        # collected in self.t_events, self.u_events and self.i_events (one array
+        # per event); a terminal event shortens self.u and self.t, whose last
+        # entry is then the time of the event.
+        # save_at: times at which to keep the solution. The solver steps on the
+        # union of time_points and save_at but stores only the rows of save_at
+        # (in chunks, so memory scales with len(save_at), not with the grid)
+        if save_at is not None:
+            return self.solve_saved(time_points, save_at, events)
         self.t = np.asarray(time_points)
         N = len(self.t)
-        if self.neq == 1: # scalar ODEs
+        if np.ndim(self.U0) == 2: # ensemble of systems
+            self.u = np.zeros((N,) + self.U0.shape)
+        elif self.neq == 1: # scalar ODEs
             self.u = np.zeros(N)
         else: # systems of ODEs
             self.u = np.zeros((N,self.neq))
 
         # Assume that self.t[0] corresponds to self.U0
         self.u[0] = self.U0
+        self.start_events(events)
 
         # Time loop
         for n in range(N-1):
-            self.n = n
-            self.u[n+1] = self.advance()
+            if not self.time_step(n):
+                break
+        self.finish_events()
         return self.u, self.t
 
+    def solve_saved(self, time_points, save_at, events=None):
+        grid, keep = save_grid(time_points, save_at)
+        chunks = self.iter_solve(grid, chunk_rows(self.U0), events)
+        self.u, self.t = collect_saved(chunks, grid, keep, np.shape(self.U0))
+        return self.u, self.t
+
+    def iter_solve(self, time_points, chunk_size=1000, events=None):
+        # Generator version of solve: yields (t, u) chunks of chunk_size consecutive time
+        # points (the first one starting at t[0], the last one possibly shorter) as they are
+        # computed. Only one chunk is held in memory, so the horizon and resolution are not
+        # bounded by memory; the chunks are fresh arrays that callers may keep
+        time_points = np.asarray(time_points)
+        N = len(time_points)
+        # Rolling buffer: row 0 carries the last state of the previous chunk
+        buffer = np.zeros((chunk_size + 1,) + np.shape(self.U0))
+        buffer[0] = self.U0
+        self.u, self.t = buffer, time_points[:1]
+        self.start_events(events)
+        start, offset = 0, 0
+        while True:
+            # Window of time points [start, end) stepped through in the buffer
+            end = min(start + chunk_size + offset, N)
+            self.u, self.t = buffer, time_points[start:end]
+            running = True
+            for n in range(end - start - 1):
+                running = self.time_step(n)
+                if not running:
+                    break
+            yield self.t[offset:].copy(), self.u[offset:len(self.t)].copy()
+            if not running or end == N:
+                break
+            buffer[0] = buffer[end - start - 1]
+            start, offset = end - 1, 1
+        self.finish_events()
+
+    def time_step(self, n):
+        # u[n] -> u[n+1]; returns False when a terminal event ends the solve
+        self.n = n
+        if self.active.all():
+            self.u[n+1] = self.advance()
+        elif self.active.any():
+            # Members masked by an event keep their state
+            unew = self.advance_members(np.flatnonzero(self.active))
+            self.u[n+1] = self.u[n]
+            self.u[n+1][self.active] = unew
+        else:
+            self.u[n+1] = self.u[n]
+        return not (self.events and self.step_events(n))
+
+    # Events
+
+    def start_events(self, events):
+        self.events = list(events or [])
+        self.active = np.ones(len(self.U0) if np.ndim(self.U0) == 2 else 1, bool)
+        self.t_events = [[] for event in self.events]
+        self.u_events = [[] for event in self.events]
+        self.i_events = [[] for event in self.events]
+        self.restricted = None
+        # Time at which each member was masked
+        self.t_masked = np.full(len(self.active), np.inf)
+        u0 = self.members(self.u[0])
+        self.g_old = [self.event_values(event, u0, self.t[0]) for event in self.events]
+
+    def finish_events(self):
+        shape = np.shape(self.U0)[-1:]
+        for i in range(len(self.events)):
+            self.t_events[i] = np.array(self.t_events[i], float)
+            self.u_events[i] = np.array(self.u_events[i], float).reshape((-1,) + shape)
+            self.i_events[i] = np.array(self.i_events[i], int)
+
+    def members(self, u):
+        # State(s) as (n_members, neq), a single system being one member
+        return np.reshape(u, (len(self.active), -1))
+
+    def state(self, u):
+        # Inverse of members()
+        return np.reshape(u, np.shape(self.U0))
+
+    def event_values(self, event, u, t):
+        if len(self.active) == 1:
+            t = np.ravel(t)[0]
+        return np.asarray(event.g(self.state(u).T, t), float).reshape(len(self.active))
+
+    def derivative(self, f, u, t):
+        # The user's right-hand side f (or a subset of it) at states u
+        return np.asarray(f(u.T, t), float).T
+
+    def member_derivative(self, u, t, members):
+        # f at the (n_members, neq) states u for the members given only
+        subset = getattr(self.rhs, 'subset', None)
+        if subset is None or len(self.active) == 1:
+            return self.members(self.derivative(self.rhs, self.state(u), t))[members]
+        return self.derivative(subset(members), u[members], t)
+
+    def restrict(self, index):
+        # Attributes used by advance(), restricted to the ensemble members in index, or
+        # None when the right-hand side has no subset(index) method (see Model.VBC) and
+        # the step has to run on every member
+        subset = getattr(self.rhs, 'subset', None)
+        if subset is None:
+            return None
+        f = subset(index)
+        return {'f': lambda u, t: np.asarray(f(u.T, t), float).T}
+
+    def advance_members(self, index):
+        # advance() for the members in index: the step runs on a two-row copy of their
+        # states with the restricted attributes swapped in
+        if self.restricted is None:
+            self.restricted = self.restrict(index) or {}
+        if not self.restricted:
+            return self.advance()[index]
+        u, t, n = self.u, self.t, self.n
+        saved = {name: getattr(self, name) for name in self.restricted}
+        self.__dict__.update(self.restricted)
+        self.u, self.t, self.n = u[n:n+2, index], t[n:n+2], 0
+        try:
+            return self.advance()
+        finally:
+            self.u, self.t, self.n = u, t, n
+            self.__dict__.update(saved)
+
+    def step_events(self, n):
+        # Events between t[n] and t[n+1]; returns True when a terminal event ends the solve
+        t0, t1 = self.t[n], self.t[n+1]
+        u0 = self.members(self.u[n])
+        u_end = self.members(self.u[n+1])
+        live = np.flatnonzero(self.active)
+        slopes = []
+        def interpolate(theta, members):
+            # Cubic Hermite interpolant from the states and slopes at both ends of the step
+            if not slopes:
+                slopes.append(self.member_derivative(u0, t0, live))
+                slopes.append(self.member_derivative(u_end, t1, live))
+            position = np.searchsorted(live, members)
+            dt = t1 - t0
+            s = np.asarray(theta)[:, None]
+            return ((1 + 2*s)*(1 - s)**2*u0[members] + s*(1 - s)**2*dt*slopes[0][position]
+                    + s**2*(3 - 2*s)*u_end[members] - s**2*(1 - s)*dt*slopes[1][position])
+        u1 = u_end.copy()
+        t_stop = self.detect_events(t0, t1, u1, interpolate)
+        self.u[n+1] = self.state(u1)
+        if t_stop is None:
+            return False
+        self.t = np.append(self.t[:n+1], t_stop)
+        self.u = self.u[:n+2]
+        return True
+
+    def detect_events(self, t0, t1, u1, interpolate):
+        # Locate the events of the step [t0, t1] for the active members and apply their
+        # actions to the states u1 (n_members, neq) at t1. interpolate(theta, members)
+        # gives the states of members at t0 + theta*(t1 - t0). Returns the time at which a
+        # terminal event stops the solve, or None
+        found = []
+        for i, event in enumerate(self.events):
+            g_new = self.event_values(event, u1, t1)
+            members = np.flatnonzero(self.active & event.crossed(self.g_old[i], g_new))
+            if len(members):
+                theta = self.locate_event(event, t0, t1, u1, members, self.g_old[i][members],
+                                          g_new[members], interpolate)
+                found += [(theta_j, i, j) for theta_j, j in zip(theta, members)]
+            self.g_old[i] = g_new
+        if not found:
+            return None
+        terminal = [theta for theta, i, j in found if self.events[i].action == 'terminate']
+        theta_stop = min(terminal) if terminal else None
+        states = {}
+        for theta, i, j in sorted(found):
+            if theta_stop is not None and theta > theta_stop:
+                break
+            t_event = t0 + theta*(t1 - t0)
+            u_event = interpolate(np.array([theta]), np.array([j]))[0]
+            self.t_events[i].append(t_event)
+            self.u_events[i].append(u_event)
+            self.i_events[i].append(j)
+            if self.events[i].action == 'mask' and j not in states:
+                states[j] = (t_event, u_event)
+        live = np.flatnonzero(self.active)
+        if theta_stop is not None:
+            u1[live] = interpolate(np.full(len(live), theta_stop), live)
+        for j, (t_event, u_event) in states.items():
+            self.active[j] = False
+            self.t_masked[j] = t_event
+            u1[j] = u_event
+        if states:
+            self.restricted = None
+        if theta_stop is None:
+            return None
+        return t0 + theta_stop*(t1 - t0)
+
+    def locate_event(self, event, t0, t1, u1, members, g_a, g_b, interpolate, maxiter=60):
+        # Illinois (modified regula falsi) on the fraction theta of the step, for all the
+        # crossing members at once. Returns theta just past each crossing
+        a = np.zeros(len(members))
+        b = np.ones(len(members))
+        side = np.zeros(len(members), int)
+        u = u1.copy()
+        t = np.full(len(u1), float(t1))
+        for i in range(maxiter):
+            searching = b - a > event.xtol
+            if not searching.any():
+                break
+            theta = b - g_b*(b - a)/(g_b - g_a)
+            u[members] = interpolate(theta, members)
+            t[members] = t0 + theta*(t1 - t0)
+            g = self.event_values(event, u, t)[members]
+            past = searching & (((g_a < 0) & (g >= 0)) | ((g_a > 0) & (g <= 0)))
+            before = searching & ~past
+            b = np.where(past, theta, b)
+            a = np.where(before | (past & (g == 0)), theta, a)
+            # Halve the value kept at the end that was not moved twice in a row
+            g_a = np.where(past & (side == 1), g_a/2, np.where(before, g, g_a))
+            g_b = np.where(before & (side == -1), g_b/2, np.where(past, g, g_b))
+            side = np.where(past, 1, np.where(before, -1, side))
+        return b
+
 class ForwardEuler(ODESolver):
     def advance(self):
         u, f, n, t = self.u, self.f, self.n, self.t
@@ -44,7 +342,7 @@ class ExplicitMidpoint(ODESolver):
         u, f, n, t = self.u, self.f, self.n, self.t
         dt = t[n+1] - t[n]
         dt2 = dt/2.0
-        k1 = f(u[n], t)
+        k1 = f(u[n], t[n])
         k2 = f(u[n] + dt2*k1, t[n] + dt2)
         unew = u[n] + dt*k2
         return unew
@@ -54,9 +352,316 @@ class RungeKutta4(ODESolver):
         u, f, n, t = self.u, self.f, self.n, self.t
         dt = t[n+1] - t[n]
         dt2 = dt/2.0
-        k1 = f(u[n], t)
+        k1 = f(u[n], t[n])
         k2 = f(u[n] + dt2*k1, t[n] + dt2)
         k3 = f(u[n] + dt2*k2, t[n] + dt2)
         k4 = f(u[n] + dt*k3, t[n] + dt)
         unew = u[n] + (dt/6.0)*(k1 + 2*k2 + 2*k3 + k4)
         return unew
+
+class RungeKutta4InPlace(ODESolver):
+    # RK4 for right-hand sides called as f(u, t, out) that write the derivative
+    # into out (e.g. VBC). The stages and the intermediate state live in buffers
+    # allocated once per solve and the update is written straight into u[n+1],
+    # so the time loop allocates no arrays. Systems and ensembles of systems only.
+    def __init__(self, f):
+        self.rhs = f
+        self.f = f
+
+    def solve(self, time_points, events=None, save_at=None):
+        shape = np.shape(self.U0)
+        self.k1, self.k2, self.k3, self.k4, self.tmp = [np.zeros(shape) for i in range(5)]
+        return ODESolver.solve(self, time_points, events, save_at)
+
+    def iter_solve(self, time_points, chunk_size=1000, events=None):
+        shape = np.shape(self.U0)
+        self.k1, self.k2, self.k3, self.k4, self.tmp = [np.zeros(shape) for i in range(5)]
+        return ODESolver.iter_solve(self, time_points, chunk_size, events)
+
+    def derivative(self, f, u, t):
+        out = np.empty(np.shape(u))
+        f(u.T, t, out.T)
+        return out
+
+    def restrict(self, index):
+        subset = getattr(self.rhs, 'subset', None)
+        if subset is None:
+            return None
+        restricted = {'f': subset(index)}
+        for name in ('k1', 'k2', 'k3', 'k4', 'tmp'):
+            restricted[name] = np.zeros((len(index), self.neq))
+        return restricted
+
+    def advance(self):
+        u, f, n, t = self.u, self.f, self.n, self.t
+        k1, k2, k3, k4, tmp = self.k1, self.k2, self.k3, self.k4, self.tmp
+        dt = t[n+1] - t[n]
+        dt2 = dt/2.0
+        # Transposes are views: f sees the equations along the first axis
+        f(u[n].T, t[n], k1.T)
+        np.multiply(k1, dt2, out=tmp)
+        tmp += u[n]
+        f(tmp.T, t[n] + dt2, k2.T)
+        np.multiply(k2, dt2, out=tmp)
+        tmp += u[n]
+        f(tmp.T, t[n] + dt2, k3.T)
+        np.multiply(k3, dt, out=tmp)
+        tmp += u[n]
+        f(tmp.T, t[n] + dt, k4.T)
+        # u[n+1] = u[n] + (dt/6)*(k1 + 2*k2 + 2*k3 + k4)
+        np.add(k2, k3, out=tmp)
+        tmp *= 2.0
+        tmp += k1
+        tmp += k4
+        tmp *= dt/6.0
+        unew = u[n+1]
+        np.add(u[n], tmp, out=unew)
+        return unew
+
+class Rosenbrock2(ODESolver):
+    # Linearly implicit 2-stage Rosenbrock method ROS2 (Verwer et al., SIAM J. Sci.
+    # Comput. 20, 1999): second order and L-stable, so stiff problems (high contact or
+    # recruitment rates) can be stepped on a coarse grid without blowing up. Each step
+    # needs the Jacobian jac(u, t), given like f with the equations along the first
+    # axis (e.g. VBC.jac); without it a finite difference Jacobian is used. The
+    # explicit time dependence of f is not part of the linearisation.
+    gamma = 1.0 + 1.0/np.sqrt(2.0)
+
+    def __init__(self, f, jac=None):
+        ODESolver.__init__(self, f)
+        self.jac_rhs = jac
+        if jac is None:
+            self.jac = self.numerical_jacobian
+        else:
+            # (neq, neq[, n_members]) from jac -> (neq, neq) or (n_members, neq, neq)
+            self.jac = lambda u, t: np.moveaxis(np.asarray(jac(u.T, t), float), (0, 1), (-2, -1))
+
+    def numerical_jacobian(self, u, t):
+        f0 = self.f(u, t)
+        J = np.zeros(u.shape + (self.neq,))
+        for j in range(self.neq):
+            h = 1e-7*np.maximum(1.0, np.abs(u[..., j]))
+            e = np.zeros_like(u)
+            e[..., j] = h
+            J[..., j] = (self.f(u + e, t) - f0)/h[..., None]
+        return J
+
+    def restrict(self, index):
+        restricted = ODESolver.restrict(self, index)
+        if restricted is None or self.jac_rhs is None:
+            return restricted
+        # An analytic Jacobian can only be restricted when it is a method of the model
+        # (e.g. VBC.jac)
+        if getattr(self.jac_rhs, '__self__', None) is not self.rhs:
+            return None
+        jac = getattr(self.rhs.subset(index), self.jac_rhs.__name__)
+        restricted['jac'] = lambda u, t: np.moveaxis(np.asarray(jac(u.T, t), float), (0, 1), (-2, -1))
+        return restricted
+
+    def advance(self):
+        u, f, n, t = self.u, self.f, self.n, self.t
+        dt = t[n+1] - t[n]
+        # One inverse of (I - gamma*dt*J) per step serves both stages
+        W = np.linalg.inv(np.eye(self.neq) - self.gamma*dt*self.jac(u[n], t[n]))
+        k1 = np.einsum('...ij,...j->...i', W, f(u[n], t[n]))
+        k2 = np.einsum('...ij,...j->...i', W, f(u[n] + dt*k1, t[n] + dt) - 2.0*k1)
+        unew = u[n] + dt*(1.5*k1 + 0.5*k2)
+        return unew
+
+class DormandPrince45(ODESolver):
+    # Adaptive Dormand-Prince 5(4) pair with PI step size control. The solver
+    # takes its own steps and evaluates the 4th order continuous extension at the
+    # requested time_points, so long horizons that settle to equilibrium need few
+    # steps however finely the output is sampled.
+    c = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+    a = [[],
+         [1/5],
+         [3/40, 9/40],
+         [44/45, -56/15, 32/9],
+         [19372/6561, -25360/2187, 64448/6561, -212/729],
+         [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+         [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84]]
+    # Difference between the 5th and 4th order weights, for the error estimate
+    e = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+    # Coefficients of the dense output polynomial in theta, theta^2, theta^3, theta^4
+    p = np.array([
+        [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+        [0, 0, 0, 0],
+        [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+        [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+        [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+        [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+        [0, 40617522/29380423, -110615467/29380423, 69997945/29380423]])
+
+    def __init__(self, f, rtol=1e-6, atol=1e-6, first_step=None, max_step=np.inf,
+                 safety=0.9, beta=0.04):
+        ODESolver.__init__(self, f)
+        self.rtol = rtol
+        self.atol = atol
+        self.first_step = first_step
+        self.max_step = max_step
+        self.safety = safety
+        # PI controller: exponent on the current and on the previous error norm
+        self.beta = beta
+        self.alpha = 0.2 - 0.75*beta
+
+    def error_norm(self, err, u_old, u_new):
+        scale = self.atol + self.rtol*np.maximum(np.abs(u_old), np.abs(u_new))
+        # RMS norm over the equations; an ensemble shares its steps, so the
+        # worst member decides
+        return np.max(np.sqrt(np.mean(np.atleast_2d(err/scale)**2, axis=-1)))
+
+    def initial_step(self, u0, f0, t0):
+        # Hairer, Norsett & Wanner, Solving ODEs I, Sec. II.4
+        scale = self.atol + self.rtol*np.abs(u0)
+        d0 = np.sqrt(np.mean((u0/scale)**2))
+        d1 = np.sqrt(np.mean((f0/scale)**2))
+        h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01*d0/d1
+        f1 = self.f(u0 + h0*f0, t0 + h0)
+        d2 = np.sqrt(np.mean(((f1 - f0)/scale)**2))/h0
+        if max(d1, d2) <= 1e-15:
+            h1 = max(1e-6, h0*1e-3)
+        else:
+            h1 = (0.01/max(d1, d2))**0.2
+        return min(100*h0, h1, self.max_step)
+
+    def step(self, u, t, h, k1):
+        k = [k1]
+        for i in range(1, 7):
+            du = sum(a_ij*k_j for a_ij, k_j in zip(self.a[i], k) if a_ij != 0)
+            k.append(self.f(u + h*du, t + self.c[i]*h))
+        # The last stage is evaluated at the 5th order solution (FSAL)
+        u_new = u + h*du
+        err = h*sum(e_i*k_i for e_i, k_i in zip(self.e, k) if e_i != 0)
+        return u_new, err, k
+
+    def dense_output(self, u, h, k, theta):
+        # Solution at t + theta*h for each theta in [0, 1]
+        q = np.tensordot(self.p, np.array(k), axes=(0, 0))
+        powers = theta[:, None]**np.arange(1, 5)
+        return u + h*np.tensordot(powers, q, axes=(1, 0))
+
+    def dense_members(self, u, h, k, theta, members):
+        # Solution of the given members at t + theta[i]*h, one theta per member
+        q = np.tensordot(self.p, np.array(k), axes=(0, 0))
+        q = q.reshape((4, len(self.active), -1))[:, members]
+        powers = np.asarray(theta)[:, None]**np.arange(1, 5)
+        return self.members(u)[members] + h*np.einsum('ip,pij->ij', powers, q)
+
+    def solve(self, time_points, events=None, save_at=None):
+        # Events and save_at as in ODESolver.solve. The ensemble shares its steps, so
+        # members masked by an event are still stepped but are held at their state at the
+        # event and no longer take part in the step size control
+        if save_at is not None:
+            return self.solve_saved(time_points, save_at, events)
+        time_points = np.asarray(time_points, float)
+        N = len(time_points)
+        u = np.zeros((N,) + np.shape(self.U0))
+        t = time_points.copy()
+        i = 0
+        for t_block, u_block in self.integrate(time_points, events):
+            t[i:i+len(t_block)] = t_block
+            u[i:i+len(t_block)] = u_block
+            i += len(t_block)
+        # Shorter after a terminal event
+        self.u, self.t = u[:i], t[:i]
+        return self.u, self.t
+
+    def iter_solve(self, time_points, chunk_size=1000, events=None):
+        # As ODESolver.iter_solve: the output points of each step are gathered into chunks
+        t_chunk, u_chunk = [], []
+        size = 0
+        for t_block, u_block in self.integrate(np.asarray(time_points, float), events):
+            t_chunk.append(t_block)
+            u_chunk.append(u_block)
+            size += len(t_block)
+            while size >= chunk_size:
+                t_all, u_all = np.concatenate(t_chunk), np.concatenate(u_chunk)
+                yield t_all[:chunk_size], u_all[:chunk_size]
+                t_chunk, u_chunk = [t_all[chunk_size:]], [u_all[chunk_size:]]
+                size -= chunk_size
+        if size:
+            yield np.concatenate(t_chunk), np.concatenate(u_chunk)
+
+    def integrate(self, time_points, events=None):
+        # Step from time_points[0] to time_points[-1], yielding (t, u) for the output points
+        # covered by each accepted step (t ends at the event time after a terminal event)
+        N = len(time_points)
+        self.t = time_points
+        self.u = np.asarray(self.U0, float)[None]
+        self.start_events(events)
+        masked = np.zeros(self.members(self.U0).shape)
+        self.nfev = 0
+        self.n_steps = 0
+        self.n_rejected = 0
+        yield time_points[:1], self.u
+
+        t, u = time_points[0], np.asarray(self.U0, float)
+        t_end = time_points[-1]
+        k1 = self.f(u, t)
+        self.nfev += 1
+        h = self.first_step
+        if h is None:
+            h = self.initial_step(u, k1, t)
+            self.nfev += 1
+        err_old = 1e-4
+        n = 1 # next output point
+        while n < N:
+            h = min(h, self.max_step)
+            last = h >= t_end - t
+            if last:
+                h = t_end - t
+            u_new, err, k = self.step(u, t, h, k1)
+            self.nfev += 6
+            if not self.active.all():
+                live = self.active
+                err_norm = self.error_norm(err[live], u[live], u_new[live])
+            else:
+                err_norm = self.error_norm(err, u, u_new)
+            if err_norm <= 1.0:
+                # Accept: output every point covered by the step
+                t_new = t_end if last else t + h
+                self.n_steps += 1
+                t_stop = None
+                if self.events:
+                    u_new = self.members(u_new).copy()
+                    interpolate = lambda theta, members: self.dense_members(u, h, k, theta, members)
+                    active = self.active.copy()
+                    t_stop = self.detect_events(t, t_new, u_new, interpolate)
+                    masked[active & ~self.active] = u_new[active & ~self.active]
+                    u_new = self.state(u_new)
+                if t_stop is None:
+                    m = n + np.searchsorted(time_points[n:], t_new, side='right')
+                else:
+                    m = n + np.searchsorted(time_points[n:], t_stop, side='left')
+                t_out = time_points[n:m]
+                u_out = self.dense_output(u, h, k, (t_out - t)/h)
+                if t_stop is not None:
+                    t_out = np.append(t_out, t_stop)
+                    u_out = np.concatenate([u_out, [u_new]])
+                if not self.active.all():
+                    # Output points after a member was masked hold its state at the event
+                    u_members = u_out.reshape((len(u_out),) + masked.shape)
+                    for j in np.flatnonzero(~self.active):
+                        u_members[t_out > self.t_masked[j], j] = masked[j]
+                n = m
+                if t_stop is not None or not self.active.any():
+                    if t_stop is None:
+                        # Every member is masked: the rest of the output is frozen
+                        t_out = np.concatenate([t_out, time_points[n:]])
+                        u_out = np.concatenate([u_out, np.repeat(self.state(masked)[None], N - n, axis=0)])
+                    yield t_out, u_out
+                    break
+                yield t_out, u_out
+                err_norm = max(err_norm, 1e-10)
+                factor = self.safety*err_norm**(-self.alpha)*err_old**self.beta
+                h = h*min(10.0, max(0.2, factor))
+                err_old = err_norm
+                t, u, k1 = t_new, u_new, k[6]
+                if not self.active.all():
+                    u[~self.active] = masked[~self.active]
+            else:
+                # Reject: retry with a smaller step, without the PI memory
+                h = h*max(0.2, self.safety*err_norm**(-0.2))
+                self.n_rejected += 1
+        self.finish_events()
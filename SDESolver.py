@@ -0,0 +1,109 @@
+import numpy as np
+from ODESolver import save_grid, collect_saved, chunk_rows
+
+# Solvers for Ito stochastic differential equations du = a(u, t) dt + b(u, t) dW with
+# diagonal noise: the diffusion coefficient b returns one value per equation, and each
+# equation is driven by its own Wiener process. Mirrors the interface of ODESolver,
+# including (n_members, neq) ensembles.
+
+def random_stream(seed, *key):
+    # Counter-based (Philox) generator of the stream `key` under a master seed, e.g.
+    # random_stream(seed, scenario, replicate). Every key gets an independent stream that
+    # is recreated on its own, without drawing the streams before it
+    return np.random.Generator(np.random.Philox(np.random.SeedSequence(seed, spawn_key=key)))
+
+class SDESolver:
+    def __init__(self, a, b):
+        # a: drift, b: diffusion coefficient. As in ODESolver, both get the
+        # equations along the first axis and may return lists
+        self.drift, self.diffusion = a, b
+        self.a = lambda u, t: np.asarray(a(u.T, t), float).T
+        self.b = lambda u, t: np.asarray(b(u.T, t), float).T
+
+    def set_initial_condition(self, U0):
+        U0 = np.asarray(U0, float)
+        self.neq = U0.shape[-1] # no of equations
+        # (n_members, neq) initial conditions integrate an ensemble
+        self.n_members = U0.shape[0] if U0.ndim == 2 else 1
+        self.U0 = U0
+
+    def generators(self, rng):
+        # rng is a numpy Generator, a seed or None, or a list of those with one per member of
+        # the ensemble
+        if isinstance(rng, (list, tuple)):
+            if self.U0.ndim != 2 or len(rng) != self.n_members:
+                raise ValueError("SDESolver: %d generators for %d members" % (len(rng), self.n_members))
+            return [np.random.default_rng(r) for r in rng]
+        return np.random.default_rng(rng)
+
+    def wiener_increments(self, time_points, rng=None):
+        # Every increment of a run (or of a whole ensemble) in one bulk draw,
+        # shape (N-1,) + U0.shape. With one generator per member, member j gets the
+        # increments that a single run with rng[j] draws
+        rng = self.generators(rng)
+        dt = np.diff(np.asarray(time_points, float))
+        if isinstance(rng, list):
+            dW = np.stack([r.standard_normal((len(dt), self.neq)) for r in rng], axis=1)
+        else:
+            dW = rng.standard_normal((len(dt),) + self.U0.shape)
+        dW *= np.sqrt(dt).reshape((-1,) + (1,)*self.U0.ndim)
+        return dW
+
+    def solve(self, time_points, dW=None, rng=None, save_at=None):
+        # save_at: times at which to keep the solution, as in ODESolver.solve. The noise
+        # is then drawn chunk by chunk (the same path as a full solve on the same grid and
+        # rng) and self.dW is not kept
+        if save_at is not None:
+            grid, keep = save_grid(time_points, save_at)
+            if dW is not None and len(dW) != len(grid) - 1:
+                raise ValueError("SDESolver: dW must have one row per step of the union of time_points and save_at")
+            chunks = self.iter_solve(grid, chunk_rows(self.U0), dW, rng)
+            self.u, self.t = collect_saved(chunks, grid, keep, np.shape(self.U0))
+            self.dW = None
+            return self.u, self.t
+        self.t = np.asarray(time_points, float)
+        N = len(self.t)
+        # Pass dW to replay a given noise path; otherwise it is drawn from rng
+        self.dW = self.wiener_increments(self.t, rng) if dW is None else np.asarray(dW, float)
+        self.u = np.zeros((N,) + self.U0.shape)
+
+        # Assume that self.t[0] corresponds to self.U0
+        self.u[0] = self.U0
+
+        # Time loop
+        for n in range(N-1):
+            self.n = n
+            self.u[n+1] = self.advance()
+        return self.u, self.t
+
+    def iter_solve(self, time_points, chunk_size=1000, dW=None, rng=None):
+        # Chunks of (t, u) as in ODESolver.iter_solve, with the Wiener increments of each
+        # chunk drawn as it is reached
+        rng = self.generators(rng)
+        time_points = np.asarray(time_points, float)
+        N = len(time_points)
+        buffer = np.zeros((chunk_size + 1,) + self.U0.shape)
+        buffer[0] = self.U0
+        start, offset = 0, 0
+        while True:
+            end = min(start + chunk_size + offset, N)
+            self.u, self.t = buffer, time_points[start:end]
+            if dW is None:
+                self.dW = self.wiener_increments(self.t, rng)
+            else:
+                self.dW = np.asarray(dW[start:end-1], float)
+            for n in range(end - start - 1):
+                self.n = n
+                self.u[n+1] = self.advance()
+            yield self.t[offset:].copy(), self.u[offset:len(self.t)].copy()
+            if end == N:
+                break
+            buffer[0] = buffer[end - start - 1]
+            start, offset = end - 1, 1
+
+class EulerMaruyama(SDESolver):
+    def advance(self):
+        u, a, b, n, t, dW = self.u, self.a, self.b, self.n, self.t, self.dW
+        dt = t[n+1] - t[n]
+        unew = u[n] + dt*a(u[n], t[n]) + b(u[n], t[n])*dW[n]
+        return unew
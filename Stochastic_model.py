@@ -34,24 +34,28 @@
 # country is given by the proportion of voters of party n in such other country. Stronger ideologies
 # or parties within a country are also better able to export their ideas than minority parties.
 
-from ODESolver import RungeKutta4
+from SDESolver import EulerMaruyama
+from Model import jacobian, parameter_jacobian
+from parameters import StochasticParameters
 import numpy as np
 import matplotlib.pyplot as plt
 import random
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 import pandas as pd
 
-# Load data from CSV
-file_path = 'Voting_data.csv'
-data = pd.read_csv(file_path)
+# Time at which the parameters switch to those of the projections (suffix t): t=88, i.e. 2020
+CUTOFF = 88
 
 
 class VBC:
+    # Order of the parameters taken by __init__ (sigma apart)
+    PARAMETERS = StochasticParameters.NAMES
+
     def __init__(self, r1, r2, mu1, mu2, mu3, mu4, muB, muC, muD, muE,
                  k1, k2, k3, k4, p1, p2, p3, p4, gamma1, gamma2, gamma3, gamma4, phi1, phi2, phi3, phi4,
                  mu1t, mu2t, mu3t, mu4t, muBt, muCt, muDt, muEt,
-                 k1t, k2t, k3t, k4t, p1t, p2t, p3t, p4t, gamma1t, gamma2t, gamma3t, gamma4t, phi1t, phi2t, phi3t, phi4t
-                 ):
+                 k1t, k2t, k3t, k4t, p1t, p2t, p3t, p4t, gamma1t, gamma2t, gamma3t, gamma4t, phi1t, phi2t, phi3t, phi4t,
+                 sigma=0.1):
         # population rate at which mu changes over time in country 1 (if mu1=mu2=muB=muC,then r1 is the population growth rate)
         self.r1 = r1
         # population rate at which mu changes over time in country 2 (if mu3=mu4=muD=muE,then r1 is the population growth rate)
@@ -153,1006 +157,677 @@ class VBC:
         self.phi3t = phi3t
         # per capita recruitment of party E from party D (between 0.0-1.0)
         self.phi4t = phi4t
-
-    def __call__(self, u, t):
-        # Unknown function
+        # noise intensity of the recruitment, switching and leakage flows in drift/diffusion (SDE form)
+        self.sigma = sigma
+
+    @classmethod
+    def from_array(cls, params, sigma=0.1):
+        # As Model.VBC.from_array, with the 50 values in PARAMETERS order
+        params = np.asarray(params, float)
+        return cls(*params.T, sigma=sigma)
+
+    def regime(self, t):
+        # Parameters in force at time t: fitted to US data up to t=88 (2020), projections afterwards
+        if t < CUTOFF:
+            return (self.mu1, self.mu2, self.mu3, self.mu4, self.muB, self.muC, self.muD, self.muE,
+                    self.k1, self.k2, self.k3, self.k4, self.p1, self.p2, self.p3, self.p4,
+                    self.gamma1, self.gamma2, self.gamma3, self.gamma4, self.phi1, self.phi2, self.phi3, self.phi4)
+        return (self.mu1t, self.mu2t, self.mu3t, self.mu4t, self.muBt, self.muCt, self.muDt, self.muEt,
+                self.k1t, self.k2t, self.k3t, self.k4t, self.p1t, self.p2t, self.p3t, self.p4t,
+                self.gamma1t, self.gamma2t, self.gamma3t, self.gamma4t, self.phi1t, self.phi2t, self.phi3t, self.phi4t)
+
+    def flows(self, u, t):
+        # Flows between compartments at time t, the terms that carry noise
+        V1, B, C, V2, D, E = u
+        N1 = V1 + B + C
+        N2 = V2 + D + E
+        (mu1, mu2, mu3, mu4, muB, muC, muD, muE, k1, k2, k3, k4, p1, p2, p3, p4,
+         gamma1, gamma2, gamma3, gamma4, phi1, phi2, phi3, phi4) = self.regime(t)
+        # Country 1: V1 -> B (domestic and cross-border contacts), V1 -> C, B -> V1, C -> V1, B -> C, C -> B
+        V1B = (k1 * p1 * V1 * (B / N1), (1 - (k1 * p1)) * k3 * p3 * V1 * (D / N2))
+        V1C = (k2 * p2 * V1 * (C / N1), (1 - (k2 * p2)) * k4 * p4 * V1 * (E / N2))
+        BV1 = gamma1 * B
+        CV1 = gamma2 * C
+        BC = (phi2 * B * (C / N1), (1 - phi2) * phi4 * B * (E / N2))
+        CB = (phi1 * C * (B / N1), (1 - phi1) * phi3 * C * (D / N2))
+        # Country 2: V2 -> D, V2 -> E, D -> V2, E -> V2, D -> E, E -> D
+        V2D = (k3 * p3 * V2 * (D / N2), (1 - (k3 * p3)) * k1 * p1 * V2 * (B / N1))
+        V2E = (k4 * p4 * V2 * (E / N2), (1 - (k4 * p4)) * k2 * p2 * V2 * (C / N1))
+        DV2 = gamma3 * D
+        EV2 = gamma4 * E
+        DE = (phi4 * D * (E / N2), (1 - phi4) * phi2 * D * (C / N1))
+        ED = (phi3 * E * (D / N2), (1 - phi3) * phi1 * E * (B / N1))
+        # Terms entering each equation
+        return [V1B + V1C + (BV1, CV1),
+                V1B + BC + CB + (BV1,),
+                V1C + CB + BC + (CV1,),
+                V2D + V2E + (DV2, EV2),
+                V2D + DE + ED + (DV2,),
+                V2E + ED + DE + (EV2,)]
+
+    def drift(self, u, t):
+        # Deterministic part of the model: the equations with the flows at their mean
         V1, B, C, V2, D, E = u
-        # Country 1: V1 -> Potential voters, B -> Voters of Political Party B, C -> Voters of Political Party C
-        # Original population size of country 1 at t0
         N1 = V1 + B + C
-        # Country 2: V2 -> Potential voters, D -> Voters of Political Party D, E -> Voters of Political Party E
-        ##Original population size of country 2 at t0
         N2 = V2 + D + E
-        if isinstance(t, float):
-            # population growth rate over time: f(pop growth)=bo+b1*t.
-            # Population growth rate in country 1 (US)
-            self.r1 = 0.018 - 0.0001 * t
-            # Population growth rate in country 2 (Rest of the world)
-            self.r2 = 0.022 - 0.0001 * t
-            # print(self.r)
-
-        # "while" includes governing equations from t0 to t88, i.e. fitted to US data from 1932 to 2020
-        while np.any(t < 88):
-            # Governing equations country 1
-            dV1 = (self.mu1+self.r1) * N1 \
-                  - self.k1 * self.p1 * V1 * (B / N1) + self.k1 * self.p1 * V1 * (B / N1) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                  - (1 - (self.k1 * self.p1)) * self.k3 * self.p3 * V1 * (D / N2) + (
-                          1 - (self.k1 * self.p1)) * self.k3 * self.p3 * V1 * (D / N2) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                  - self.k2 * self.p2 * V1 * (C / N1) + self.k2 * self.p2 * V1 * (C / N1) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                  - (1 - (self.k2 * self.p2)) * self.k4 * self.p4 * V1 * (E / N2) + (
-                          1 - (self.k2 * self.p2)) * self.k4 * self.p4 * V1 * (E / N2) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                  - self.mu2 * V1 \
-                  + self.gamma1 * B + self.gamma1 * B * sqrtdt * np.random.normal(0.0, 1.0) \
-                  + self.gamma2 * C + self.gamma2 * C * sqrtdt * np.random.normal(0.0, 1.0)
-            dB = self.k1 * self.p1 * V1 * (B / N1) + self.k1 * self.p1 * V1 * (B / N1) * sqrtdt * np.random.normal(0.0,
-                                                                                                                   1.0) \
-                 + (1 - (self.k1 * self.p1)) * self.k3 * self.p3 * V1 * (D / N2) + (
-                         1 - (self.k1 * self.p1)) * self.k3 * self.p3 * V1 * (D / N2) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                 - self.phi2 * B * (C / N1) + self.phi2 * B * (C / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - (1 - self.phi2) * self.phi4 * B * (E / N2) + (1 - self.phi2) * self.phi4 * B * (
-                         E / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + self.phi1 * C * (B / N1) + self.phi1 * C * (B / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + (1 - self.phi1) * self.phi3 * C * (D / N2) + (1 - self.phi1) * self.phi3 * C * (
-                         D / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - self.muB * B \
-                 - self.gamma1 * B + self.gamma1 * B * sqrtdt * np.random.normal(0.0, 1.0)
-            dC = self.k2 * self.p2 * V1 * (C / N1) + self.k2 * self.p2 * V1 * (C / N1) * sqrtdt * np.random.normal(0.0,
-                                                                                                                   1.0) \
-                 + (1 - (self.k2 * self.p2)) * self.k4 * self.p4 * V1 * (E / N2) + (
-                         1 - (self.k2 * self.p2)) * self.k4 * self.p4 * V1 * (E / N2) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                 - self.phi1 * C * (B / N1) + self.phi1 * C * (B / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - (1 - self.phi1) * self.phi3 * C * (D / N2) + (1 - self.phi1) * self.phi3 * C * (
-                         D / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + self.phi2 * B * (C / N1) + self.phi2 * B * (C / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + (1 - self.phi2) * self.phi4 * B * (E / N2) + (1 - self.phi2) * self.phi4 * B * (
-                         E / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - self.muC * C \
-                 - self.gamma2 * C + self.gamma2 * C * sqrtdt * np.random.normal(0.0, 1.0)
-            # Governing equations country 2
-            dV2 = (self.mu3+self.r2) * N2 \
-                  - self.k3 * self.p3 * V2 * (D / N2) + self.k3 * self.p3 * V2 * (D / N2) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                  - (1 - (self.k3 * self.p3)) * self.k1 * self.p1 * V2 * (B / N1) + (
-                          1 - (self.k3 * self.p3)) * self.k1 * self.p1 * V2 * (B / N1) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                  - self.k4 * self.p4 * V2 * (E / N2) + self.k4 * self.p4 * V2 * (E / N2) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                  - (1 - (self.k4 * self.p4)) * self.k2 * self.p2 * V2 * (C / N1) + (
-                          1 - (self.k4 * self.p4)) * self.k2 * self.p2 * V2 * (C / N1) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                  - self.mu4 * V2 \
-                  + self.gamma3 * D + self.gamma3 * D * sqrtdt * np.random.normal(0.0, 1.0) \
-                  + self.gamma4 * E + self.gamma4 * E * sqrtdt * np.random.normal(0.0, 1.0)
-            dD = self.k3 * self.p3 * V2 * (D / N2) + self.k3 * self.p3 * V2 * (D / N2) * sqrtdt * np.random.normal(0.0,
-                                                                                                                   1.0) \
-                 + (1 - (self.k3 * self.p3)) * self.k1 * self.p1 * V2 * (B / N1) + (
-                         1 - (self.k3 * self.p3)) * self.k1 * self.p1 * V2 * (B / N1) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                 - self.phi4 * D * (E / N2) + self.phi4 * D * (E / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - (1 - self.phi4) * self.phi2 * D * (C / N1) + (1 - self.phi4) * self.phi2 * D * (
-                         C / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + self.phi3 * E * (D / N2) + self.phi3 * E * (D / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + (1 - self.phi3) * self.phi1 * E * (B / N1) + (1 - self.phi3) * self.phi1 * E * (
-                         B / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - self.muD * D \
-                 - self.gamma3 * D + self.gamma3 * D * sqrtdt * np.random.normal(0.0, 1.0)
-            dE = self.k4 * self.p4 * V2 * (E / N2) + self.k4 * self.p4 * V2 * (E / N2) * sqrtdt * np.random.normal(0.0,
-                                                                                                                   1.0) \
-                 + (1 - (self.k4 * self.p4)) * self.k2 * self.p2 * V2 * (C / N1) + (
-                         1 - (self.k4 * self.p4)) * self.k2 * self.p2 * V2 * (C / N1) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                 - self.phi3 * E * (D / N2) + self.phi3 * E * (D / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - (1 - self.phi3) * self.phi1 * E * (B / N1) + (1 - self.phi3) * self.phi1 * E * (
-                         B / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + self.phi4 * D * (E / N2) + self.phi4 * D * (E / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + (1 - self.phi4) * self.phi2 * D * (C / N1) + (1 - self.phi4) * self.phi2 * D * (
-                         C / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - self.muE * E \
-                 - self.gamma4 * E + self.gamma4 * E * sqrtdt * np.random.normal(0.0, 1.0)
-            return [dV1, dB, dC, dV2, dD, dE]
-
-        # "else" includes governing equations from t89 onwards to t88, i.e. predictions for US from 2020 on.
-        else:
-            # Governing equations country 1
-            dV1 = (self.mu1t+self.r1) * N1 \
-                  - self.k1t * self.p1t * V1 * (B / N1) + self.k1t * self.p1t * V1 * (
-                              B / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                  - (1 - (self.k1t * self.p1t)) * self.k3t * self.p3t * V1 * (D / N2) + (
-                          1 - (self.k1t * self.p1t)) * self.k3t * self.p3t * V1 * (D / N2) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                  - self.k2t * self.p2t * V1 * (C / N1) + self.k2t * self.p2t * V1 * (
-                              C / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                  - (1 - (self.k2t * self.p2t)) * self.k4t * self.p4t * V1 * (E / N2) + (
-                          1 - (self.k2t * self.p2t)) * self.k4t * self.p4t * V1 * (E / N2) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                  - self.mu2t * V1 \
-                  + self.gamma1t * B + self.gamma1t * B * sqrtdt * np.random.normal(0.0, 1.0) \
-                  + self.gamma2t * C + self.gamma2t * C * sqrtdt * np.random.normal(0.0, 1.0)
-            dB = self.k1t * self.p1t * V1 * (B / N1) + self.k1t * self.p1t * V1 * (B / N1) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                 + (1 - (self.k1t * self.p1t)) * self.k3t * self.p3t * V1 * (D / N2) + (
-                         1 - (self.k1t * self.p1t)) * self.k3t * self.p3t * V1 * (D / N2) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                 - self.phi2t * B * (C / N1) + self.phi2t * B * (C / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - (1 - self.phi2t) * self.phi4t * B * (E / N2) + (1 - self.phi2t) * self.phi4t * B * (
-                         E / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + self.phi1t * C * (B / N1) + self.phi1t * C * (B / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + (1 - self.phi1t) * self.phi3t * C * (D / N2) + (1 - self.phi1t) * self.phi3t * C * (
-                         D / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - self.muBt * B \
-                 - self.gamma1t * B + self.gamma1t * B * sqrtdt * np.random.normal(0.0, 1.0)
-            dC = self.k2t * self.p2t * V1 * (C / N1) + self.k2t * self.p2t * V1 * (C / N1) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                 + (1 - (self.k2t * self.p2t)) * self.k4t * self.p4t * V1 * (E / N2) + (
-                         1 - (self.k2t * self.p2t)) * self.k4t * self.p4t * V1 * (E / N2) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                 - self.phi1t * C * (B / N1) + self.phi1t * C * (B / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - (1 - self.phi1t) * self.phi3t * C * (D / N2) + (1 - self.phi1t) * self.phi3t * C * (
-                         D / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + self.phi2t * B * (C / N1) + self.phi2t * B * (C / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + (1 - self.phi2t) * self.phi4t * B * (E / N2) + (1 - self.phi2t) * self.phi4t * B * (
-                         E / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - self.muCt * C \
-                 - self.gamma2t * C + self.gamma2t * C * sqrtdt * np.random.normal(0.0, 1.0)
-            # Governing equations country 2
-            dV2 = (self.mu3t+self.r2) * N2 \
-                  - self.k3t * self.p3t * V2 * (D / N2) + self.k3t * self.p3t * V2 * (
-                              D / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                  - (1 - (self.k3t * self.p3t)) * self.k1t * self.p1t * V2 * (B / N1) + (
-                          1 - (self.k3t * self.p3t)) * self.k1t * self.p1t * V2 * (B / N1) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                  - self.k4t * self.p4t * V2 * (E / N2) + self.k4t * self.p4t * V2 * (
-                              E / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                  - (1 - (self.k4t * self.p4t)) * self.k2t * self.p2t * V2 * (C / N1) + (
-                          1 - (self.k4t * self.p4t)) * self.k2t * self.p2t * V2 * (C / N1) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                  - self.mu4t * V2 \
-                  + self.gamma3t * D + self.gamma3t * D * sqrtdt * np.random.normal(0.0, 1.0) \
-                  + self.gamma4t * E + self.gamma4t * E * sqrtdt * np.random.normal(0.0, 1.0)
-            dD = self.k3t * self.p3t * V2 * (D / N2) + self.k3t * self.p3t * V2 * (D / N2) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                 + (1 - (self.k3t * self.p3t)) * self.k1t * self.p1t * V2 * (B / N1) + (
-                         1 - (self.k3t * self.p3t)) * self.k1t * self.p1t * V2 * (B / N1) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                 - self.phi4t * D * (E / N2) + self.phi4t * D * (E / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - (1 - self.phi4t) * self.phi2t * D * (C / N1) + (1 - self.phi4t) * self.phi2t * D * (
-                         C / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + self.phi3t * E * (D / N2) + self.phi3t * E * (D / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + (1 - self.phi3t) * self.phi1t * E * (B / N1) + (1 - self.phi3t) * self.phi1t * E * (
-                         B / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - self.muDt * D \
-                 - self.gamma3t * D + self.gamma3t * D * sqrtdt * np.random.normal(0.0, 1.0)
-            dE = self.k4t * self.p4t * V2 * (E / N2) + self.k4t * self.p4t * V2 * (E / N2) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                 + (1 - (self.k4t * self.p4t)) * self.k2t * self.p2t * V2 * (C / N1) + (
-                         1 - (self.k4t * self.p4t)) * self.k2t * self.p2t * V2 * (C / N1) * sqrtdt * np.random.normal(
-                0.0, 1.0) \
-                 - self.phi3t * E * (D / N2) + self.phi3t * E * (D / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - (1 - self.phi3t) * self.phi1t * E * (B / N1) + (1 - self.phi3t) * self.phi1t * E * (
-                         B / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + self.phi4t * D * (E / N2) + self.phi4t * D * (E / N2) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 + (1 - self.phi4t) * self.phi2t * D * (C / N1) + (1 - self.phi4t) * self.phi2t * D * (
-                         C / N1) * sqrtdt * np.random.normal(0.0, 1.0) \
-                 - self.muEt * E \
-                 - self.gamma4t * E + self.gamma4t * E * sqrtdt * np.random.normal(0.0, 1.0)
-            return [dV1, dB, dC, dV2, dD, dE]
+        (mu1, mu2, mu3, mu4, muB, muC, muD, muE, k1, k2, k3, k4, p1, p2, p3, p4,
+         gamma1, gamma2, gamma3, gamma4, phi1, phi2, phi3, phi4) = self.regime(t)
+        # population growth rates over time: f(pop growth)=bo+b1*t
+        r1 = 0.018 - 0.0001 * t
+        r2 = 0.022 - 0.0001 * t
+        fV1, fB, fC, fV2, fD, fE = self.flows(u, t)
+        dV1 = (mu1 + r1) * N1 - sum(fV1[:4]) - mu2 * V1 + fV1[4] + fV1[5]
+        dB = fB[0] + fB[1] - fB[2] - fB[3] + fB[4] + fB[5] - muB * B - fB[6]
+        dC = fC[0] + fC[1] - fC[2] - fC[3] + fC[4] + fC[5] - muC * C - fC[6]
+        dV2 = (mu3 + r2) * N2 - sum(fV2[:4]) - mu4 * V2 + fV2[4] + fV2[5]
+        dD = fD[0] + fD[1] - fD[2] - fD[3] + fD[4] + fD[5] - muD * D - fD[6]
+        dE = fE[0] + fE[1] - fE[2] - fE[3] + fE[4] + fE[5] - muE * E - fE[6]
+        return [dV1, dB, dC, dV2, dD, dE]
+
+    def diffusion(self, u, t):
+        # Diffusion coefficient of each equation. Every flow term of an equation is perturbed by
+        # its own independent normal draw; the sum of independent Gaussian terms
+        # sigma*f_j*dW_j is Gaussian with standard deviation sigma*sqrt(sum f_j^2)*sqrt(dt),
+        # so one Wiener process per equation gives the same increments in distribution
+        return [self.sigma * np.sqrt(sum(f_j ** 2 for f_j in terms)) for terms in self.flows(u, t)]
+
+    def jac(self, u, t):
+        # Analytic Jacobian of drift with respect to u: the deterministic model with the parameters
+        # in force at t and the population growth rates added to the entry rates
+        params = list(self.regime(t))
+        params[0] = params[0] + 0.018 - 0.0001 * t
+        params[2] = params[2] + 0.022 - 0.0001 * t
+        return jacobian(u, *params)
+
+    def param_jac(self, u, t):
+        # Jacobian of drift with respect to the 50 parameters (PARAMETERS order): the columns of
+        # the regime in force at t; r1 and r2 do not enter drift
+        params = list(self.regime(t))
+        params[0] = params[0] + 0.018 - 0.0001 * t
+        params[2] = params[2] + 0.022 - 0.0001 * t
+        P24 = parameter_jacobian(u, *params)
+        P = np.zeros((6, len(self.PARAMETERS)) + P24.shape[2:])
+        start = 2 if t < CUTOFF else 26
+        P[:, start:start + 24] = P24
+        return P
 
 #Population
 #US: Eligible voters, Democrats, Republicans
 def multiples(value, length):
     return [value * i for i in range(1, length + 1)]
-#Timeseries from 1932 to 2020
-t_us = multiples(4,23)
-#Population in millions
-# Ensure that 'Non-partisan', 'Dem', and 'Rep' are the correct column names
-Total_Abstention = data['Non-partisan'].tolist()
-Total_US_dem = data['Dem'].tolist()
-Total_US_rep = data['Rep'].tolist()
-
-# First simulation
-#Initial conditions country 1 (US)
-V10 = 34650000
-# B0 = 22821277
-# C0 = 15761254
-B0 = 22000000
-C0 = 16000000
-#Initial conditions country 2 # At t0 = 1932, for agents outside the U.S., it is assumed that
-#political tendencies are evenly split at the start of the simulation, with one-third non-partisan, one-third
-# pro-Democrats, and one-third pro-Republicans.
-V20 = 50000000
-D0 = 50000000
-E0 = 50000000
-model = VBC(r1=0.02,r2=0.02,
-            mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
-            muB= 0.017, muC= 0.017, muD=0.017, muE=0.017,
-            k1= 0.55, k2= 0.55, k3=0.1, k4=0.1,
-            p1= 0.15, p2= 0.15, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01, gamma3=0.01, gamma4=0.01,
-            phi1= 0.05, phi2= 0.05, phi3=0.01, phi4=0.01,
-            mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
-            muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
-            k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
-            p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
-            gamma1t=0.01, gamma2t=0.01, gamma3t=0.01, gamma4t=0.01,
-            phi1t=0.05, phi2t=0.05, phi3t=0.01, phi4t=0.01,
-            )
-
-fig, axs = plt.subplots(4, 3, figsize=(10,10))
-#fig.suptitle('S0000')
-#number of simulations
-for i in range(10):
-    solver = RungeKutta4(model)
-    solver.set_initial_condition([V10, B0, C0, V20, D0, E0])
+
+# Scenarios of the figure: initial conditions [V1, B, C, V2, D, E] at t0 = 1932 and parameters.
+# At t0, for agents outside the U.S., it is assumed that political tendencies are evenly split,
+# with one-third non-partisan, one-third pro-Democrats, and one-third pro-Republicans.
+Scenario = namedtuple('Scenario', 'name U0 params')
+# US 1932 (B0 = 22821277, C0 = 15761254 in the data), and with Democrats and Republicans even
+U0_US = [34650000, 22000000, 16000000, 50000000, 50000000, 50000000]
+U0_EVEN = [34650000, 19291265, 19291265, 50000000, 50000000, 50000000]
+BASELINE = StochasticParameters(r1=0.02, r2=0.02,
+                                mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
+                                muB=0.017, muC=0.017, muD=0.017, muE=0.017,
+                                k1=0.55, k2=0.55, k3=0.1, k4=0.1,
+                                p1=0.15, p2=0.15, p3=0.1, p4=0.1,
+                                gamma1=0.01, gamma2=0.01, gamma3=0.01, gamma4=0.01,
+                                phi1=0.05, phi2=0.05, phi3=0.01, phi4=0.01,
+                                mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
+                                muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
+                                k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
+                                p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
+                                gamma1t=0.01, gamma2t=0.01, gamma3t=0.01, gamma4t=0.01,
+                                phi1t=0.05, phi2t=0.05, phi3t=0.01, phi4t=0.01)
+GAMMA_T = dict(gamma1t=0.015, gamma2t=0.015, gamma3t=0.015, gamma4t=0.015)
+SCENARIOS = OrderedDict((s.name, s) for s in [
+    Scenario('S0000', U0_US, BASELINE),
+    Scenario('S0100', U0_US, BASELINE.replace(phi2=0.055, phi2t=0.055)),
+    Scenario('S1000', U0_EVEN, BASELINE),
+    Scenario('S0001', U0_US, BASELINE.replace(phi3t=0.015)),
+    Scenario('S0101', U0_US, BASELINE.replace(phi2=0.055, phi2t=0.055, phi3t=0.015)),
+    Scenario('S1001', U0_EVEN, BASELINE.replace(phi3t=0.015)),
+    Scenario('S0010', U0_US, BASELINE.replace(phi4t=0.015)),
+    Scenario('S0110', U0_US, BASELINE.replace(phi2=0.055, phi2t=0.055, phi4t=0.015)),
+    Scenario('S1010', U0_EVEN, BASELINE.replace(phi4t=0.015)),
+    Scenario('S0011', U0_US, BASELINE.replace(**GAMMA_T)),
+    Scenario('S0111', U0_US, BASELINE.replace(phi2=0.055, phi2t=0.055, **GAMMA_T)),
+    Scenario('S1011', U0_EVEN, BASELINE.replace(**GAMMA_T)),
+])
+
+
+def time_grid(T=168, dt=0.2):
+    # Time points of the scenario runs: int(T/dt) points from t0 = 0 (1932) to T
+    return np.linspace(0, T, int(T / dt))
+
+if __name__ == "__main__":
+    # Load data from CSV
+    file_path = 'Voting_data.csv'
+    data = pd.read_csv(file_path)
+    #Timeseries from 1932 to 2020
+    t_us = multiples(4,23)
+    #Population in millions
+    # Ensure that 'Non-partisan', 'Dem', and 'Rep' are the correct column names
+    Total_Abstention = data['Non-partisan'].tolist()
+    Total_US_dem = data['Dem'].tolist()
+    Total_US_rep = data['Rep'].tolist()
+
+    # First simulation
+    scenario = SCENARIOS['S0000']
+    model = VBC(**scenario.params)
+
+    fig, axs = plt.subplots(4, 3, figsize=(10,10))
+    #fig.suptitle('S0000')
+    #number of simulations
+    # The 10 simulations are integrated as one ensemble, with all Wiener increments drawn at once
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (10, 1)))
     dt = 0.2  # Time step
     T = 168  # Total time
     n = int(T / dt)  # Number of time steps
     time_points = np.linspace(0, T, n)  # Vector times
-    sqrtdt = np.sqrt(dt)
-    u, t = solver.solve(time_points)
-    V1 = u[:, 0];
-    B = u[:, 1];
-    C = u[:, 2];
-    V2 = u[:, 3];
-    D = u[:, 4];
-    E = u[:, 5]
-
-    axs[0,0].title.set_text('S0000')
-    axs[0, 0].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[0, 0].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[0, 0].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[0, 0].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
-                      edgecolors= "black", linewidth=0.1)
-    axs[0, 0].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2,
-                      edgecolors= "black", linewidth=0.1)
-    axs[0, 0].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2,
-                      edgecolors= "black", linewidth=0.1)
-    #axs[0, 0].set_xlabel('Time in years')
-    #axs[0, 0].set_ylabel('Number of agents')
-    axs[0,0].set_ylim(0, 200000000)
-    x = np.arange(0, 169, 42)
-    axs[0, 0].set_xticks(x)
-    axs[0, 0].set_xticklabels([i + 1932 for i in x])
-    axs[0, 0].set_xticklabels([])
-
-# Second simulation
-#Initial conditions country 1 (US)
-V10 = 34650000
-# B0 = 22821277
-# C0 = 15761254
-B0 = 22000000
-C0 = 16000000
-#C0 = 19000000
-#Initial conditions country 2 # At t0 = 1932, for agents outside the U.S., it is assumed that
-#political tendencies are evenly split at the start of the simulation, with one-third non-partisan, one-third
-# pro-Democrats, and one-third pro-Republicans.
-V20 = 50000000
-D0 = 50000000
-E0 = 50000000
-model = VBC(r1=0.02,r2=0.02,
-            mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
-            muB= 0.017, muC= 0.017, muD=0.017, muE=0.017,
-            k1= 0.55, k2= 0.55, k3=0.1, k4=0.1,
-            p1= 0.15, p2= 0.15, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01, gamma3=0.01, gamma4=0.01,
-            phi1= 0.050, phi2= 0.055, phi3=0.01, phi4=0.01,
-            mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
-            muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
-            k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
-            p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
-            gamma1t=0.01, gamma2t=0.01, gamma3t=0.01, gamma4t=0.01,
-            phi1t=0.050, phi2t=0.055, phi3t=0.01, phi4t=0.01,
-            )
-
-
-for i in range(10):
-    solver = RungeKutta4(model)
-    solver.set_initial_condition([V10, B0, C0, V20, D0, E0])
+    ensemble, t = solver.solve(time_points)
+    for i in range(10):
+        u = ensemble[:, i]
+        V1 = u[:, 0];
+        B = u[:, 1];
+        C = u[:, 2];
+        V2 = u[:, 3];
+        D = u[:, 4];
+        E = u[:, 5]
+
+        axs[0,0].title.set_text('S0000')
+        axs[0, 0].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[0, 0].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[0, 0].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[0, 0].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
+                          edgecolors= "black", linewidth=0.1)
+        axs[0, 0].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2,
+                          edgecolors= "black", linewidth=0.1)
+        axs[0, 0].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2,
+                          edgecolors= "black", linewidth=0.1)
+        #axs[0, 0].set_xlabel('Time in years')
+        #axs[0, 0].set_ylabel('Number of agents')
+        axs[0,0].set_ylim(0, 200000000)
+        x = np.arange(0, 169, 42)
+        axs[0, 0].set_xticks(x)
+        axs[0, 0].set_xticklabels([i + 1932 for i in x])
+        axs[0, 0].set_xticklabels([])
+
+    # Second simulation
+    scenario = SCENARIOS['S0100']
+    model = VBC(**scenario.params)
+
+
+    # The 10 simulations are integrated as one ensemble, with all Wiener increments drawn at once
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (10, 1)))
     dt = 0.2  # Time step
     T = 168  # Total time
     n = int(T / dt)  # Number of time steps
     time_points = np.linspace(0, T, n)  # Vector times
-    sqrtdt = np.sqrt(dt)
-    u, t = solver.solve(time_points)
-    V1 = u[:, 0];
-    B = u[:, 1];
-    C = u[:, 2];
-    V2 = u[:, 3];
-    D = u[:, 4];
-    E = u[:, 5]
-
-    axs[0, 1].title.set_text('S0100')
-    axs[0, 1].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[0, 1].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[0, 1].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[0, 1].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
-                      edgecolors= "black", linewidth=0.1)
-    axs[0, 1].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4,  zorder=2, edgecolors=
-    "black", linewidth=0.1)
-    axs[0, 1].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4,  zorder=2, edgecolors=
-    "black", linewidth=0.1)
-    #axs[0, 1].set_xlabel('Time in years')
-    #axs[0, 1].set_ylabel('Number of agents')
-    axs[0,1].set_yticklabels([])
-    axs[0, 1].set_ylim(0, 200000000)
-    x = np.arange(0, 169, 42)
-    axs[0, 1].set_xticks(x)
-    axs[0, 1].set_xticklabels([i + 1932 for i in x])
-    axs[0, 1].set_xticklabels([])
-
-# Third simulation
-#Initial conditions country 1 (US)
-V10 = 34650000
-B0 = 19291265
-C0 = 19291265
-#C0 = 19000000
-#Initial conditions country 2 # At t0 = 1932, for agents outside the U.S., it is assumed that
-#political tendencies are evenly split at the start of the simulation, with one-third non-partisan, one-third
-# pro-Democrats, and one-third pro-Republicans.
-V20 = 50000000
-D0 = 50000000
-E0 = 50000000
-model = VBC(r1=0.02,r2=0.02,
-            mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
-            muB= 0.017, muC= 0.017, muD=0.017, muE=0.017,
-            k1= 0.55, k2= 0.55, k3=0.1, k4=0.1,
-            p1= 0.15, p2= 0.15, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01, gamma3=0.01, gamma4=0.01,
-            phi1= 0.050, phi2= 0.050, phi3=0.01, phi4=0.01,
-            mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
-            muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
-            k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
-            p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
-            gamma1t=0.01, gamma2t=0.01, gamma3t=0.01, gamma4t=0.01,
-            phi1t=0.050, phi2t=0.050, phi3t=0.01, phi4t=0.01,
-            )
-
-for i in range(10):
-    solver = RungeKutta4(model)
-    solver.set_initial_condition([V10, B0, C0, V20, D0, E0])
+    ensemble, t = solver.solve(time_points)
+    for i in range(10):
+        u = ensemble[:, i]
+        V1 = u[:, 0];
+        B = u[:, 1];
+        C = u[:, 2];
+        V2 = u[:, 3];
+        D = u[:, 4];
+        E = u[:, 5]
+
+        axs[0, 1].title.set_text('S0100')
+        axs[0, 1].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[0, 1].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[0, 1].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[0, 1].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
+                          edgecolors= "black", linewidth=0.1)
+        axs[0, 1].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4,  zorder=2, edgecolors=
+        "black", linewidth=0.1)
+        axs[0, 1].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4,  zorder=2, edgecolors=
+        "black", linewidth=0.1)
+        #axs[0, 1].set_xlabel('Time in years')
+        #axs[0, 1].set_ylabel('Number of agents')
+        axs[0,1].set_yticklabels([])
+        axs[0, 1].set_ylim(0, 200000000)
+        x = np.arange(0, 169, 42)
+        axs[0, 1].set_xticks(x)
+        axs[0, 1].set_xticklabels([i + 1932 for i in x])
+        axs[0, 1].set_xticklabels([])
+
+    # Third simulation
+    scenario = SCENARIOS['S1000']
+    model = VBC(**scenario.params)
+
+    # The 10 simulations are integrated as one ensemble, with all Wiener increments drawn at once
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (10, 1)))
     dt = 0.2  # Time step
     T = 168  # Total time
     n = int(T / dt)  # Number of time steps
     time_points = np.linspace(0, T, n)  # Vector times
-    sqrtdt = np.sqrt(dt)
-    u, t = solver.solve(time_points)
-    V1 = u[:, 0];
-    B = u[:, 1];
-    C = u[:, 2];
-    V2 = u[:, 3];
-    D = u[:, 4];
-    E = u[:, 5]
-
-    axs[0, 2].title.set_text('S1000')
-    axs[0, 2].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[0, 2].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[0, 2].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
-    # axs[0,2].plot(t,V2,label="V2", ls="--")
-    # axs[0,2].plot(t,D,label="D", ls="--")
-    # axs[0,2].plot(t,E,label="E", ls=":")
-    axs[0, 2].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
-                      edgecolors= "black", linewidth=0.1)
-    axs[0, 2].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    axs[0, 2].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    # axs[0, 1].set_xlabel('Time in years')
-    # axs[0, 1].set_ylabel('Number of agents')
-    axs[0, 2].set_yticklabels([])
-    axs[0, 2].set_ylim(0, 200000000)
-    x = np.arange(0, 169, 42)
-    axs[0, 2].set_xticks(x)
-    axs[0, 2].set_xticklabels([i + 1932 for i in x])
-    axs[0, 2].set_xticklabels([])
-
-
-# Fourth simulation
-#Initial conditions country 1 (US)
-V10 = 34650000
-# B0 = 22821277
-# C0 = 15761254
-B0 = 22000000
-C0 = 16000000
-#C0 = 19000000
-#Initial conditions country 2 # At t0 = 1932, for agents outside the U.S., it is assumed that
-#political tendencies are evenly split at the start of the simulation, with one-third non-partisan, one-third
-# pro-Democrats, and one-third pro-Republicans.
-V20 = 50000000
-D0 = 50000000
-E0 = 50000000
-model = VBC(r1=0.02,r2=0.02,
-            mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
-            muB= 0.017, muC= 0.017, muD=0.017, muE=0.017,
-            k1= 0.55, k2= 0.55, k3=0.1, k4=0.1,
-            p1= 0.15, p2= 0.15, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01, gamma3=0.01, gamma4=0.01,
-            phi1= 0.050, phi2= 0.050, phi3=0.01, phi4=0.01,
-            mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
-            muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
-            k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
-            p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
-            gamma1t=0.01, gamma2t=0.01, gamma3t=0.01, gamma4t=0.01,
-            phi1t=0.050, phi2t=0.050, phi3t=0.015, phi4t=0.01,
-            )
-
-
-#number of simulations
-for i in range(10):
-    solver = RungeKutta4(model)
-    solver.set_initial_condition([V10, B0, C0, V20, D0, E0])
+    ensemble, t = solver.solve(time_points)
+    for i in range(10):
+        u = ensemble[:, i]
+        V1 = u[:, 0];
+        B = u[:, 1];
+        C = u[:, 2];
+        V2 = u[:, 3];
+        D = u[:, 4];
+        E = u[:, 5]
+
+        axs[0, 2].title.set_text('S1000')
+        axs[0, 2].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[0, 2].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[0, 2].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
+        # axs[0,2].plot(t,V2,label="V2", ls="--")
+        # axs[0,2].plot(t,D,label="D", ls="--")
+        # axs[0,2].plot(t,E,label="E", ls=":")
+        axs[0, 2].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
+                          edgecolors= "black", linewidth=0.1)
+        axs[0, 2].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        axs[0, 2].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        # axs[0, 1].set_xlabel('Time in years')
+        # axs[0, 1].set_ylabel('Number of agents')
+        axs[0, 2].set_yticklabels([])
+        axs[0, 2].set_ylim(0, 200000000)
+        x = np.arange(0, 169, 42)
+        axs[0, 2].set_xticks(x)
+        axs[0, 2].set_xticklabels([i + 1932 for i in x])
+        axs[0, 2].set_xticklabels([])
+
+
+    # Fourth simulation
+    scenario = SCENARIOS['S0001']
+    model = VBC(**scenario.params)
+
+
+    #number of simulations
+    # The 10 simulations are integrated as one ensemble, with all Wiener increments drawn at once
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (10, 1)))
     dt = 0.2  # Time step
     T = 168  # Total time
     n = int(T / dt)  # Number of time steps
     time_points = np.linspace(0, T, n)  # Vector times
-    sqrtdt = np.sqrt(dt)
-    u, t = solver.solve(time_points)
-    V1 = u[:, 0];
-    B = u[:, 1];
-    C = u[:, 2];
-    V2 = u[:, 3];
-    D = u[:, 4];
-    E = u[:, 5]
-
-    axs[1, 0].title.set_text('S0001')
-    axs[1, 0].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[1, 0].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[1, 0].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[1, 0].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
-                      edgecolors= "black", linewidth=0.1)
-    axs[1, 0].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    axs[1, 0].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    #axs[1, 0].set_xlabel('Time in years')
-    axs[1, 0].set_ylabel('   ')
-    axs[1, 0].set_ylim(0, 200000000)
-    x = np.arange(0, 169, 42)
-    axs[1, 0].set_xticks(x)
-    axs[1, 0].set_xticklabels([i + 1932 for i in x])
-    axs[1, 0].patch.set_facecolor('blue')
-    axs[1, 0].patch.set_alpha(0.05)
-    axs[1, 0].set_xticklabels([])
-
-
-# Fifth simulation
-#Initial conditions country 1 (US)
-V10 = 34650000
-# B0 = 22821277
-# C0 = 15761254
-B0 = 22000000
-C0 = 16000000
-#C0 = 19000000
-#Initial conditions country 2 # At t0 = 1932, for agents outside the U.S., it is assumed that
-#political tendencies are evenly split at the start of the simulation, with one-third non-partisan, one-third
-# pro-Democrats, and one-third pro-Republicans.
-V20 = 50000000
-D0 = 50000000
-E0 = 50000000
-model = VBC(r1=0.02,r2=0.02,
-            mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
-            muB= 0.017, muC= 0.017, muD=0.017, muE=0.017,
-            k1= 0.55, k2= 0.55, k3=0.1, k4=0.1,
-            p1= 0.15, p2= 0.15, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01, gamma3=0.01, gamma4=0.01,
-            phi1= 0.050, phi2= 0.055, phi3=0.01, phi4=0.01,
-            mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
-            muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
-            k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
-            p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
-            gamma1t=0.01, gamma2t=0.01, gamma3t=0.01, gamma4t=0.01,
-            phi1t=0.050, phi2t=0.055, phi3t=0.015, phi4t=0.01,
-            )
-
-for i in range(10):
-    solver = RungeKutta4(model)
-    solver.set_initial_condition([V10, B0, C0, V20, D0, E0])
+    ensemble, t = solver.solve(time_points)
+    for i in range(10):
+        u = ensemble[:, i]
+        V1 = u[:, 0];
+        B = u[:, 1];
+        C = u[:, 2];
+        V2 = u[:, 3];
+        D = u[:, 4];
+        E = u[:, 5]
+
+        axs[1, 0].title.set_text('S0001')
+        axs[1, 0].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[1, 0].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[1, 0].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[1, 0].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
+                          edgecolors= "black", linewidth=0.1)
+        axs[1, 0].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        axs[1, 0].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        #axs[1, 0].set_xlabel('Time in years')
+        axs[1, 0].set_ylabel('   ')
+        axs[1, 0].set_ylim(0, 200000000)
+        x = np.arange(0, 169, 42)
+        axs[1, 0].set_xticks(x)
+        axs[1, 0].set_xticklabels([i + 1932 for i in x])
+        axs[1, 0].patch.set_facecolor('blue')
+        axs[1, 0].patch.set_alpha(0.05)
+        axs[1, 0].set_xticklabels([])
+
+
+    # Fifth simulation
+    scenario = SCENARIOS['S0101']
+    model = VBC(**scenario.params)
+
+    # The 10 simulations are integrated as one ensemble, with all Wiener increments drawn at once
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (10, 1)))
     dt = 0.2  # Time step
     T = 168  # Total time
     n = int(T / dt)  # Number of time steps
     time_points = np.linspace(0, T, n)  # Vector times
-    sqrtdt = np.sqrt(dt)
-    u, t = solver.solve(time_points)
-    V1 = u[:, 0];
-    B = u[:, 1];
-    C = u[:, 2];
-    V2 = u[:, 3];
-    D = u[:, 4];
-    E = u[:, 5]
-
-    axs[1, 1].title.set_text('S0101')
-    axs[1, 1].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[1, 1].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[1, 1].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[1, 1].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    axs[1, 1].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    axs[1, 1].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    #axs[1, 1].set_xlabel('Time in years')
-    #axs[1, 1].set_ylabel('Number of agents')
-    axs[1,1].set_yticklabels([])
-    axs[1, 1].set_ylim(0, 200000000)
-    x = np.arange(0, 169, 42)
-    axs[1, 1].set_xticks(x)
-    axs[1, 1].set_xticklabels([i + 1932 for i in x])
-    axs[1, 1].patch.set_facecolor('blue')
-    axs[1, 1].patch.set_alpha(0.05)
-    axs[1, 1].set_xticklabels([])
-
-# Sixth simulation
-#Initial conditions country 1 (US)
-V10 = 34650000
-B0 = 19291265
-C0 = 19291265
-#C0 = 19000000
-#Initial conditions country 2 # At t0 = 1932, for agents outside the U.S., it is assumed that
-#political tendencies are evenly split at the start of the simulation, with one-third non-partisan, one-third
-# pro-Democrats, and one-third pro-Republicans.
-V20 = 50000000
-D0 = 50000000
-E0 = 50000000
-model = VBC(r1=0.02,r2=0.02,
-            mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
-            muB= 0.017, muC= 0.017, muD=0.017, muE=0.017,
-            k1= 0.55, k2= 0.55, k3=0.1, k4=0.1,
-            p1= 0.15, p2= 0.15, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01, gamma3=0.01, gamma4=0.01,
-            phi1= 0.050, phi2= 0.050, phi3=0.01, phi4=0.01,
-            mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
-            muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
-            k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
-            p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
-            gamma1t=0.01, gamma2t=0.01, gamma3t=0.01, gamma4t=0.01,
-            phi1t=0.050, phi2t=0.050, phi3t=0.015, phi4t=0.01,
-            )
-
-for i in range(10):
-    solver = RungeKutta4(model)
-    solver.set_initial_condition([V10, B0, C0, V20, D0, E0])
+    ensemble, t = solver.solve(time_points)
+    for i in range(10):
+        u = ensemble[:, i]
+        V1 = u[:, 0];
+        B = u[:, 1];
+        C = u[:, 2];
+        V2 = u[:, 3];
+        D = u[:, 4];
+        E = u[:, 5]
+
+        axs[1, 1].title.set_text('S0101')
+        axs[1, 1].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[1, 1].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[1, 1].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[1, 1].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        axs[1, 1].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        axs[1, 1].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        #axs[1, 1].set_xlabel('Time in years')
+        #axs[1, 1].set_ylabel('Number of agents')
+        axs[1,1].set_yticklabels([])
+        axs[1, 1].set_ylim(0, 200000000)
+        x = np.arange(0, 169, 42)
+        axs[1, 1].set_xticks(x)
+        axs[1, 1].set_xticklabels([i + 1932 for i in x])
+        axs[1, 1].patch.set_facecolor('blue')
+        axs[1, 1].patch.set_alpha(0.05)
+        axs[1, 1].set_xticklabels([])
+
+    # Sixth simulation
+    scenario = SCENARIOS['S1001']
+    model = VBC(**scenario.params)
+
+    # The 10 simulations are integrated as one ensemble, with all Wiener increments drawn at once
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (10, 1)))
     dt = 0.2  # Time step
     T = 168  # Total time
     n = int(T / dt)  # Number of time steps
     time_points = np.linspace(0, T, n)  # Vector times
-    sqrtdt = np.sqrt(dt)
-    u, t = solver.solve(time_points)
-    V1 = u[:, 0];
-    B = u[:, 1];
-    C = u[:, 2];
-    V2 = u[:, 3];
-    D = u[:, 4];
-    E = u[:, 5]
-
-    axs[1, 2].title.set_text('S1001')
-    axs[1, 2].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[1, 2].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[1, 2].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[1, 2].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    axs[1, 2].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    axs[1, 2].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    # axs[1, 2].set_xlabel('Time in years')
-    # axs[1, 2].set_ylabel('Number of agents')
-    axs[1, 2].set_yticklabels([])
-    axs[1, 2].set_ylim(0, 200000000)
-    x = np.arange(0, 169, 42)
-    axs[1, 2].set_xticks(x)
-    axs[1, 2].set_xticklabels([i + 1932 for i in x])
-    axs[1, 2].patch.set_facecolor('blue')
-    axs[1, 2].patch.set_alpha(0.05)
-    axs[1, 2].set_xticklabels([])
-
-
-# Seventh simulation
-#Initial conditions country 1 (US)
-V10 = 34650000
-# B0 = 22821277
-# C0 = 15761254
-B0 = 22000000
-C0 = 16000000
-#C0 = 19000000
-#Initial conditions country 2 # At t0 = 1932, for agents outside the U.S., it is assumed that
-#political tendencies are evenly split at the start of the simulation, with one-third non-partisan, one-third
-# pro-Democrats, and one-third pro-Republicans.
-V20 = 50000000
-D0 = 50000000
-E0 = 50000000
-model = VBC(r1=0.02,r2=0.02,
-            mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
-            muB= 0.017, muC= 0.017, muD=0.017, muE=0.017,
-            k1= 0.55, k2= 0.55, k3=0.1, k4=0.1,
-            p1= 0.15, p2= 0.15, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01, gamma3=0.01, gamma4=0.01,
-            phi1= 0.050, phi2= 0.050, phi3=0.01, phi4=0.01,
-            mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
-            muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
-            k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
-            p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
-            gamma1t=0.01, gamma2t=0.01, gamma3t=0.01, gamma4t=0.01,
-            phi1t=0.050, phi2t=0.050, phi3t=0.01, phi4t=0.015,
-            )
-
-
-#number of simulations
-for i in range(10):
-    solver = RungeKutta4(model)
-    solver.set_initial_condition([V10, B0, C0, V20, D0, E0])
+    ensemble, t = solver.solve(time_points)
+    for i in range(10):
+        u = ensemble[:, i]
+        V1 = u[:, 0];
+        B = u[:, 1];
+        C = u[:, 2];
+        V2 = u[:, 3];
+        D = u[:, 4];
+        E = u[:, 5]
+
+        axs[1, 2].title.set_text('S1001')
+        axs[1, 2].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[1, 2].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[1, 2].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[1, 2].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        axs[1, 2].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        axs[1, 2].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        # axs[1, 2].set_xlabel('Time in years')
+        # axs[1, 2].set_ylabel('Number of agents')
+        axs[1, 2].set_yticklabels([])
+        axs[1, 2].set_ylim(0, 200000000)
+        x = np.arange(0, 169, 42)
+        axs[1, 2].set_xticks(x)
+        axs[1, 2].set_xticklabels([i + 1932 for i in x])
+        axs[1, 2].patch.set_facecolor('blue')
+        axs[1, 2].patch.set_alpha(0.05)
+        axs[1, 2].set_xticklabels([])
+
+
+    # Seventh simulation
+    scenario = SCENARIOS['S0010']
+    model = VBC(**scenario.params)
+
+
+    #number of simulations
+    # The 10 simulations are integrated as one ensemble, with all Wiener increments drawn at once
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (10, 1)))
     dt = 0.2  # Time step
     T = 168  # Total time
     n = int(T / dt)  # Number of time steps
     time_points = np.linspace(0, T, n)  # Vector times
-    sqrtdt = np.sqrt(dt)
-    u, t = solver.solve(time_points)
-    V1 = u[:, 0];
-    B = u[:, 1];
-    C = u[:, 2];
-    V2 = u[:, 3];
-    D = u[:, 4];
-    E = u[:, 5]
-
-    axs[2, 0].title.set_text('S0010')
-    axs[2, 0].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[2, 0].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[2, 0].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[2, 0].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
-                      edgecolors= "black", linewidth=0.1)
-    axs[2, 0].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    axs[2, 0].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    #axs[2, 0].set_xlabel('Time in years')
-    #axs[1, 0].set_ylabel('Number of agents')
-    #axs[1, 0].set_xticklabels([])
-    axs[2, 0].set_ylim(0, 200000000)
-    x = np.arange(0, 169, 42)
-    axs[2, 0].set_xticks(x)
-    axs[2, 0].set_xticklabels([i + 1932 for i in x])
-    axs[2, 0].patch.set_facecolor('red')
-    axs[2, 0].patch.set_alpha(0.05)
-    axs[2, 0].set_xticklabels([])
-
-
-
-# Eighth simulation
-#Initial conditions country 1 (US)
-V10 = 34650000
-# B0 = 22821277
-# C0 = 15761254
-B0 = 22000000
-C0 = 16000000
-#C0 = 19000000
-#Initial conditions country 2 # At t0 = 1932, for agents outside the U.S., it is assumed that
-#political tendencies are evenly split at the start of the simulation, with one-third non-partisan, one-third
-# pro-Democrats, and one-third pro-Republicans.
-V20 = 50000000
-D0 = 50000000
-E0 = 50000000
-model = VBC(r1=0.02,r2=0.02,
-            mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
-            muB= 0.017, muC= 0.017, muD=0.017, muE=0.017,
-            k1= 0.55, k2= 0.55, k3=0.1, k4=0.1,
-            p1= 0.15, p2= 0.15, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01, gamma3=0.01, gamma4=0.01,
-            phi1= 0.050, phi2= 0.055, phi3=0.01, phi4=0.01,
-            mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
-            muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
-            k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
-            p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
-            gamma1t=0.01, gamma2t=0.01, gamma3t=0.01, gamma4t=0.01,
-            phi1t=0.050, phi2t=0.055, phi3t=0.01, phi4t=0.015,
-            )
-
-
-for i in range(10):
-    solver = RungeKutta4(model)
-    solver.set_initial_condition([V10, B0, C0, V20, D0, E0])
+    ensemble, t = solver.solve(time_points)
+    for i in range(10):
+        u = ensemble[:, i]
+        V1 = u[:, 0];
+        B = u[:, 1];
+        C = u[:, 2];
+        V2 = u[:, 3];
+        D = u[:, 4];
+        E = u[:, 5]
+
+        axs[2, 0].title.set_text('S0010')
+        axs[2, 0].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[2, 0].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[2, 0].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[2, 0].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
+                          edgecolors= "black", linewidth=0.1)
+        axs[2, 0].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        axs[2, 0].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        #axs[2, 0].set_xlabel('Time in years')
+        #axs[1, 0].set_ylabel('Number of agents')
+        #axs[1, 0].set_xticklabels([])
+        axs[2, 0].set_ylim(0, 200000000)
+        x = np.arange(0, 169, 42)
+        axs[2, 0].set_xticks(x)
+        axs[2, 0].set_xticklabels([i + 1932 for i in x])
+        axs[2, 0].patch.set_facecolor('red')
+        axs[2, 0].patch.set_alpha(0.05)
+        axs[2, 0].set_xticklabels([])
+
+
+
+    # Eighth simulation
+    scenario = SCENARIOS['S0110']
+    model = VBC(**scenario.params)
+
+
+    # The 10 simulations are integrated as one ensemble, with all Wiener increments drawn at once
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (10, 1)))
     dt = 0.2  # Time step
     T = 168  # Total time
     n = int(T / dt)  # Number of time steps
     time_points = np.linspace(0, T, n)  # Vector times
-    sqrtdt = np.sqrt(dt)
-    u, t = solver.solve(time_points)
-    V1 = u[:, 0];
-    B = u[:, 1];
-    C = u[:, 2];
-    V2 = u[:, 3];
-    D = u[:, 4];
-    E = u[:, 5]
-
-    axs[2, 1].title.set_text('S0110')
-    axs[2, 1].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[2, 1].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[2, 1].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[2, 1].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    axs[2, 1].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    axs[2, 1].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    #axs[2, 1].set_xlabel('Time in years')
-    #axs[2, 1].set_ylabel('Number of agents')
-    axs[2, 1].set_yticklabels([])
-    x = np.arange(0, 169, 42)
-    axs[2, 1].set_xticks(x)
-    axs[2, 1].set_xticklabels([i + 1932 for i in x])
-    axs[2, 1].patch.set_facecolor('red')
-    axs[2, 1].patch.set_alpha(0.05)
-    axs[2, 1].set_xticklabels([])
-
-# Nineth simulation
-#Initial conditions country 1 (US)
-V10 = 34650000
-B0 = 19291265
-C0 = 19291265
-#C0 = 19000000
-#Initial conditions country 2 # At t0 = 1932, for agents outside the U.S., it is assumed that
-#political tendencies are evenly split at the start of the simulation, with one-third non-partisan, one-third
-# pro-Democrats, and one-third pro-Republicans.
-V20 = 50000000
-D0 = 50000000
-E0 = 50000000
-model = VBC(r1=0.02,r2=0.02,
-            mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
-            muB= 0.017, muC= 0.017, muD=0.017, muE=0.017,
-            k1= 0.55, k2= 0.55, k3=0.1, k4=0.1,
-            p1= 0.15, p2= 0.15, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01, gamma3=0.01, gamma4=0.01,
-            phi1= 0.050, phi2= 0.050, phi3=0.01, phi4=0.01,
-            mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
-            muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
-            k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
-            p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
-            gamma1t=0.01, gamma2t=0.01, gamma3t=0.01, gamma4t=0.01,
-            phi1t=0.050, phi2t=0.050, phi3t=0.01, phi4t=0.015,
-            )
-
-for i in range(10):
-    solver = RungeKutta4(model)
-    solver.set_initial_condition([V10, B0, C0, V20, D0, E0])
+    ensemble, t = solver.solve(time_points)
+    for i in range(10):
+        u = ensemble[:, i]
+        V1 = u[:, 0];
+        B = u[:, 1];
+        C = u[:, 2];
+        V2 = u[:, 3];
+        D = u[:, 4];
+        E = u[:, 5]
+
+        axs[2, 1].title.set_text('S0110')
+        axs[2, 1].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[2, 1].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[2, 1].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[2, 1].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        axs[2, 1].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        axs[2, 1].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        #axs[2, 1].set_xlabel('Time in years')
+        #axs[2, 1].set_ylabel('Number of agents')
+        axs[2, 1].set_yticklabels([])
+        x = np.arange(0, 169, 42)
+        axs[2, 1].set_xticks(x)
+        axs[2, 1].set_xticklabels([i + 1932 for i in x])
+        axs[2, 1].patch.set_facecolor('red')
+        axs[2, 1].patch.set_alpha(0.05)
+        axs[2, 1].set_xticklabels([])
+
+    # Nineth simulation
+    scenario = SCENARIOS['S1010']
+    model = VBC(**scenario.params)
+
+    # The 10 simulations are integrated as one ensemble, with all Wiener increments drawn at once
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (10, 1)))
     dt = 0.2  # Time step
     T = 168  # Total time
     n = int(T / dt)  # Number of time steps
     time_points = np.linspace(0, T, n)  # Vector times
-    sqrtdt = np.sqrt(dt)
-    u, t = solver.solve(time_points)
-    V1 = u[:, 0];
-    B = u[:, 1];
-    C = u[:, 2];
-    V2 = u[:, 3];
-    D = u[:, 4];
-    E = u[:, 5]
-
-    axs[2, 2].title.set_text('S1010')
-    axs[2, 2].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[2, 2].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[2, 2].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[2, 2].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    axs[2, 2].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    axs[2, 2].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
-    # axs[2, 2].set_xlabel('Time in years')
-    # axs[2, 2].set_ylabel('Number of agents')
-    axs[2, 2].set_yticklabels([])
-    axs[2, 2].set_ylim(0, 200000000)
-    x = np.arange(0, 169, 42)
-    axs[2, 2].set_xticks(x)
-    axs[2, 2].set_xticklabels([i + 1932 for i in x])
-    axs[2, 2].patch.set_facecolor('red')
-    axs[2, 2].patch.set_alpha(0.05)
-    axs[2, 2].set_xticklabels([])
-
-
-# Tenth simulation
-#Initial conditions country 1 (US)
-V10 = 34650000
-# B0 = 22821277
-# C0 = 15761254
-B0 = 22000000
-C0 = 16000000
-#C0 = 19000000
-#Initial conditions country 2 # At t0 = 1932, for agents outside the U.S., it is assumed that
-#political tendencies are evenly split at the start of the simulation, with one-third non-partisan, one-third
-# pro-Democrats, and one-third pro-Republicans.
-V20 = 50000000
-D0 = 50000000
-E0 = 50000000
-model = VBC(r1=0.02,r2=0.02,
-            mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
-            muB= 0.017, muC= 0.017, muD=0.017, muE=0.017,
-            k1= 0.55, k2= 0.55, k3=0.1, k4=0.1,
-            p1= 0.15, p2= 0.15, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01, gamma3=0.01, gamma4=0.01,
-            phi1= 0.050, phi2= 0.050, phi3=0.01, phi4=0.01,
-            mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
-            muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
-            k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
-            p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
-            gamma1t=0.015, gamma2t=0.015, gamma3t=0.015, gamma4t=0.015,
-            phi1t=0.050, phi2t=0.050, phi3t=0.01, phi4t=0.01,
-            )
-
-
-#number of simulations
-for i in range(10):
-    solver = RungeKutta4(model)
-    solver.set_initial_condition([V10, B0, C0, V20, D0, E0])
+    ensemble, t = solver.solve(time_points)
+    for i in range(10):
+        u = ensemble[:, i]
+        V1 = u[:, 0];
+        B = u[:, 1];
+        C = u[:, 2];
+        V2 = u[:, 3];
+        D = u[:, 4];
+        E = u[:, 5]
+
+        axs[2, 2].title.set_text('S1010')
+        axs[2, 2].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[2, 2].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[2, 2].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[2, 2].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        axs[2, 2].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        axs[2, 2].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors= "black", linewidth=0.1)
+        # axs[2, 2].set_xlabel('Time in years')
+        # axs[2, 2].set_ylabel('Number of agents')
+        axs[2, 2].set_yticklabels([])
+        axs[2, 2].set_ylim(0, 200000000)
+        x = np.arange(0, 169, 42)
+        axs[2, 2].set_xticks(x)
+        axs[2, 2].set_xticklabels([i + 1932 for i in x])
+        axs[2, 2].patch.set_facecolor('red')
+        axs[2, 2].patch.set_alpha(0.05)
+        axs[2, 2].set_xticklabels([])
+
+
+    # Tenth simulation
+    scenario = SCENARIOS['S0011']
+    model = VBC(**scenario.params)
+
+
+    #number of simulations
+    # The 10 simulations are integrated as one ensemble, with all Wiener increments drawn at once
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (10, 1)))
     dt = 0.2  # Time step
     T = 168  # Total time
     n = int(T / dt)  # Number of time steps
     time_points = np.linspace(0, T, n)  # Vector times
-    sqrtdt = np.sqrt(dt)
-    u, t = solver.solve(time_points)
-    V1 = u[:, 0];
-    B = u[:, 1];
-    C = u[:, 2];
-    V2 = u[:, 3];
-    D = u[:, 4];
-    E = u[:, 5]
-
-    axs[3, 0].title.set_text('S0011')
-    axs[3, 0].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[3, 0].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[3, 0].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[3, 0].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
-                      edgecolors= "black", linewidth=0.1)
-    axs[3, 0].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors=
-    "black", linewidth=0.1)
-    axs[3, 0].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors=
-    "black", linewidth=0.1)
-    #axs[2, 0].set_xlabel('Time in years')
-    #axs[1, 0].set_ylabel('Number of agents')
-    #axs[1, 0].set_xticklabels([])
-    axs[3, 0].set_ylim(0, 200000000)
-    x = np.arange(0, 169, 42)
-    axs[3,0].set_xticks(x)
-    axs[3,0].set_xticklabels([i + 1932 for i in x])
-    axs[3, 0].patch.set_facecolor('yellow')
-    axs[3, 0].patch.set_alpha(0.05)
-
-
-
-# Eleventh simulation
-#Initial conditions country 1 (US)
-V10 = 34650000
-# B0 = 22821277
-# C0 = 15761254
-B0 = 22000000
-C0 = 16000000
-#C0 = 19000000
-#Initial conditions country 2 # At t0 = 1932, for agents outside the U.S., it is assumed that
-#political tendencies are evenly split at the start of the simulation, with one-third non-partisan, one-third
-# pro-Democrats, and one-third pro-Republicans.
-V20 = 50000000
-D0 = 50000000
-E0 = 50000000
-model = VBC(r1=0.02,r2=0.02,
-            mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
-            muB= 0.017, muC= 0.017, muD=0.017, muE=0.017,
-            k1= 0.55, k2= 0.55, k3=0.1, k4=0.1,
-            p1= 0.15, p2= 0.15, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01, gamma3=0.01, gamma4=0.01,
-            phi1= 0.050, phi2= 0.055, phi3=0.01, phi4=0.01,
-            mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
-            muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
-            k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
-            p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
-            gamma1t=0.015, gamma2t=0.015, gamma3t=0.015, gamma4t=0.015,
-            phi1t=0.050, phi2t=0.055, phi3t=0.01, phi4t=0.01,
-            )
-
-for i in range(10):
-    solver = RungeKutta4(model)
-    solver.set_initial_condition([V10, B0, C0, V20, D0, E0])
+    ensemble, t = solver.solve(time_points)
+    for i in range(10):
+        u = ensemble[:, i]
+        V1 = u[:, 0];
+        B = u[:, 1];
+        C = u[:, 2];
+        V2 = u[:, 3];
+        D = u[:, 4];
+        E = u[:, 5]
+
+        axs[3, 0].title.set_text('S0011')
+        axs[3, 0].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[3, 0].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[3, 0].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[3, 0].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
+                          edgecolors= "black", linewidth=0.1)
+        axs[3, 0].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors=
+        "black", linewidth=0.1)
+        axs[3, 0].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors=
+        "black", linewidth=0.1)
+        #axs[2, 0].set_xlabel('Time in years')
+        #axs[1, 0].set_ylabel('Number of agents')
+        #axs[1, 0].set_xticklabels([])
+        axs[3, 0].set_ylim(0, 200000000)
+        x = np.arange(0, 169, 42)
+        axs[3,0].set_xticks(x)
+        axs[3,0].set_xticklabels([i + 1932 for i in x])
+        axs[3, 0].patch.set_facecolor('yellow')
+        axs[3, 0].patch.set_alpha(0.05)
+
+
+
+    # Eleventh simulation
+    scenario = SCENARIOS['S0111']
+    model = VBC(**scenario.params)
+
+    # The 10 simulations are integrated as one ensemble, with all Wiener increments drawn at once
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (10, 1)))
     dt = 0.2  # Time step
     T = 168  # Total time
     n = int(T / dt)  # Number of time steps
     time_points = np.linspace(0, T, n)  # Vector times
-    sqrtdt = np.sqrt(dt)
-    u, t = solver.solve(time_points)
-    V1 = u[:, 0];
-    B = u[:, 1];
-    C = u[:, 2];
-    V2 = u[:, 3];
-    D = u[:, 4];
-    E = u[:, 5]
-
-    axs[3, 1].title.set_text('S0111')
-    axs[3, 1].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[3, 1].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[3, 1].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[3, 1].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
-                      edgecolors= "black", linewidth=0.1)
-    axs[3, 1].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors=
-    "black", linewidth=0.1)
-    axs[3, 1].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors=
-    "black", linewidth=0.1)
-    axs[3, 1].set_xlabel('Time in years', fontsize=12)
-    #axs[2, 1].set_ylabel('Number of agents')
-    axs[3, 1].set_yticklabels([])
-    axs[3, 1].set_ylim(0, 200000000)
-    x = np.arange(0, 169, 42)
-    axs[3, 1].set_xticks(x)
-    axs[3, 1].set_xticklabels([i + 1932 for i in x])
-    axs[3, 1].patch.set_facecolor('yellow')
-    axs[3, 1].patch.set_alpha(0.05)
-
-# Twelveth simulation
-#Initial conditions country 1 (US)
-V10 = 34650000
-B0 = 19291265
-C0 = 19291265
-#C0 = 19000000
-#Initial conditions country 2 # At t0 = 1932, for agents outside the U.S., it is assumed that
-#political tendencies are evenly split at the start of the simulation, with one-third non-partisan, one-third
-# pro-Democrats, and one-third pro-Republicans.
-V20 = 50000000
-D0 = 50000000
-E0 = 50000000
-model = VBC(r1=0.02,r2=0.02,
-            mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
-            muB= 0.017, muC= 0.017, muD=0.017, muE=0.017,
-            k1= 0.55, k2= 0.55, k3=0.1, k4=0.1,
-            p1= 0.15, p2= 0.15, p3=0.1, p4=0.1,
-            gamma1= 0.01, gamma2= 0.01, gamma3=0.01, gamma4=0.01,
-            phi1= 0.050, phi2= 0.050, phi3=0.01, phi4=0.01,
-            mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
-            muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
-            k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
-            p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
-            gamma1t=0.015, gamma2t=0.015, gamma3t=0.015, gamma4t=0.015,
-            phi1t=0.050, phi2t=0.050, phi3t=0.01, phi4t=0.01,
-            )
-
-
-for i in range(10):
-    solver = RungeKutta4(model)
-    solver.set_initial_condition([V10, B0, C0, V20, D0, E0])
+    ensemble, t = solver.solve(time_points)
+    for i in range(10):
+        u = ensemble[:, i]
+        V1 = u[:, 0];
+        B = u[:, 1];
+        C = u[:, 2];
+        V2 = u[:, 3];
+        D = u[:, 4];
+        E = u[:, 5]
+
+        axs[3, 1].title.set_text('S0111')
+        axs[3, 1].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[3, 1].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[3, 1].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[3, 1].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
+                          edgecolors= "black", linewidth=0.1)
+        axs[3, 1].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors=
+        "black", linewidth=0.1)
+        axs[3, 1].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors=
+        "black", linewidth=0.1)
+        axs[3, 1].set_xlabel('Time in years', fontsize=12)
+        #axs[2, 1].set_ylabel('Number of agents')
+        axs[3, 1].set_yticklabels([])
+        axs[3, 1].set_ylim(0, 200000000)
+        x = np.arange(0, 169, 42)
+        axs[3, 1].set_xticks(x)
+        axs[3, 1].set_xticklabels([i + 1932 for i in x])
+        axs[3, 1].patch.set_facecolor('yellow')
+        axs[3, 1].patch.set_alpha(0.05)
+
+    # Twelveth simulation
+    scenario = SCENARIOS['S1011']
+    model = VBC(**scenario.params)
+
+
+    # The 10 simulations are integrated as one ensemble, with all Wiener increments drawn at once
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (10, 1)))
     dt = 0.2  # Time step
     T = 168  # Total time
     n = int(T / dt)  # Number of time steps
     time_points = np.linspace(0, T, n)  # Vector times
-    sqrtdt = np.sqrt(dt)
-    u, t = solver.solve(time_points)
-    V1 = u[:, 0];
-    B = u[:, 1];
-    C = u[:, 2];
-    V2 = u[:, 3];
-    D = u[:, 4];
-    E = u[:, 5]
-
-    axs[3, 2].title.set_text('S1011')
-    axs[3, 2].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[3, 2].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[3, 2].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
-    axs[3, 2].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
-                      edgecolors= "black", linewidth=0.1)
-    axs[3, 2].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors=
-    "black", linewidth=0.1)
-    axs[3, 2].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors=
-    "black", linewidth=0.1)
-    # axs[2, 2].set_xlabel('Time in years')
-    # axs[2, 2].set_ylabel('Number of agents')
-    axs[3, 2].set_yticklabels([])
-    axs[3, 2].set_ylim(0, 200000000)
-    x = np.arange(0, 169, 42)
-    axs[3, 2].set_xticks(x)
-    axs[3, 2].set_xticklabels([i + 1932 for i in x])
-    axs[3, 2].patch.set_facecolor('yellow')
-    axs[3, 2].patch.set_alpha(0.05)
-
-
-# handles, labels = axs[1, 1].get_legend_handles_labels()
-# handle_list, label_list = [], []
-# for handle, label in zip(handles, labels):
-#         if label not in label_list:
-#             handle_list.append(handle)
-#             label_list.append(label)
-
-handles, labels = plt.gca().get_legend_handles_labels()
-by_label = OrderedDict(zip(labels, handles))
-leg = axs[3,1].legend(by_label.values(), by_label.keys(), ncol=2, loc='upper center', bbox_to_anchor=(0.5, -0.3))
-
-#leg = axs[3,1].legend(ncol=2, loc='upper center', bbox_to_anchor=(0.5, -0.3))
-for lh in leg.legendHandles:
-    lh.set_alpha(1)
-
-plt.tight_layout()
-plt.show()
-#fig.set_size_inches(10, 12)
-#fig.set_size_inches(10,8)
-fig.set_size_inches(8,8)
-fig.subplots_adjust(bottom=0.15)
-#fig.text(0.6, 0.1, 'Time in years', ha='center', size= 1.5)
-fig.text(0.004, 0.55, 'Supporters', va='center', rotation='vertical', fontsize=12)
-fig.savefig('US_results_2100_3.pdf')
+    ensemble, t = solver.solve(time_points)
+    for i in range(10):
+        u = ensemble[:, i]
+        V1 = u[:, 0];
+        B = u[:, 1];
+        C = u[:, 2];
+        V2 = u[:, 3];
+        D = u[:, 4];
+        E = u[:, 5]
+
+        axs[3, 2].title.set_text('S1011')
+        axs[3, 2].plot(t, V1, label="Sim.Abs", color="yellow", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[3, 2].plot(t, B, label="Sim.Dem", color="blue", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[3, 2].plot(t, C, label="Sim.Rep", color="red", alpha=0.1, zorder=1, linewidth=0.5)
+        axs[3, 2].scatter(t_us, np.array(Total_Abstention) * 1000000, label="Abs", color="yellow", s=4, zorder=2,
+                          edgecolors= "black", linewidth=0.1)
+        axs[3, 2].scatter(t_us, np.array(Total_US_dem) * 1000000, label="Dem", color="blue", s=4, zorder=2, edgecolors=
+        "black", linewidth=0.1)
+        axs[3, 2].scatter(t_us, np.array(Total_US_rep) * 1000000, label="Rep", color="red", s=4, zorder=2, edgecolors=
+        "black", linewidth=0.1)
+        # axs[2, 2].set_xlabel('Time in years')
+        # axs[2, 2].set_ylabel('Number of agents')
+        axs[3, 2].set_yticklabels([])
+        axs[3, 2].set_ylim(0, 200000000)
+        x = np.arange(0, 169, 42)
+        axs[3, 2].set_xticks(x)
+        axs[3, 2].set_xticklabels([i + 1932 for i in x])
+        axs[3, 2].patch.set_facecolor('yellow')
+        axs[3, 2].patch.set_alpha(0.05)
+
+
+    # handles, labels = axs[1, 1].get_legend_handles_labels()
+    # handle_list, label_list = [], []
+    # for handle, label in zip(handles, labels):
+    #         if label not in label_list:
+    #             handle_list.append(handle)
+    #             label_list.append(label)
+
+    handles, labels = plt.gca().get_legend_handles_labels()
+    by_label = OrderedDict(zip(labels, handles))
+    leg = axs[3,1].legend(by_label.values(), by_label.keys(), ncol=2, loc='upper center', bbox_to_anchor=(0.5, -0.3))
+
+    #leg = axs[3,1].legend(ncol=2, loc='upper center', bbox_to_anchor=(0.5, -0.3))
+    for lh in leg.legendHandles:
+        lh.set_alpha(1)
+
+    plt.tight_layout()
+    plt.show()
+    #fig.set_size_inches(10, 12)
+    #fig.set_size_inches(10,8)
+    fig.set_size_inches(8,8)
+    fig.subplots_adjust(bottom=0.15)
+    #fig.text(0.6, 0.1, 'Time in years', ha='center', size= 1.5)
+    fig.text(0.004, 0.55, 'Supporters', va='center', rotation='vertical', fontsize=12)
+    fig.savefig('US_results_2100_3.pdf')
@@ -0,0 +1,250 @@
+# Benchmark suite for the solvers and models of the cross-border competition model.
+#
+# Times the ODESolver methods (including Rosenbrock2 with the analytic Jacobian and
+# the three alternative RungeKutta4 implementations), the right-hand sides
+# Model.VBC.__call__ and Stochastic_model.VBC.drift/diffusion, deterministic
+# ensembles with RungeKutta4, Rosenbrock2 and DormandPrince45, Euler-Maruyama
+# ensembles of the stochastic model and the scenario runs of
+# ensemble_runner.run_ensembles, across grid sizes and ensemble sizes. Results are
+# written as JSON and can be compared against a stored baseline to flag regressions.
+#
+# python benchmark.py --output benchmark_baseline.json
+# python benchmark.py --baseline benchmark_baseline.json --tolerance 0.25
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import numpy as np
+import ODESolver
+import Model
+import Stochastic_model
+from SDESolver import EulerMaruyama
+from ensemble_runner import run_ensembles
+
+# Parameters of Model.py's first simulation
+DETERMINISTIC_PARAMS = dict(mu1=0.016, mu2=0.016, mu3=0.016, mu4=0.016,
+                            muB=0.016, muC=0.016, muD=0.016, muE=0.016,
+                            k1=0.5, k2=0.5, k3=0.5, k4=0.5,
+                            p1=0.1, p2=0.1, p3=0.1, p4=0.1,
+                            gamma1=0.01, gamma2=0.01, gamma3=0.01, gamma4=0.01,
+                            phi1=0.02, phi2=0.02, phi3=0.02, phi4=0.02)
+DETERMINISTIC_U0 = [1000, 1000, 1000, 1000, 1000, 1000]
+
+# Parameters and initial conditions of Stochastic_model.py's first scenario (S0000)
+STOCHASTIC_PARAMS = dict(r1=0.02, r2=0.02,
+                         mu1=0.017, mu2=0.017, mu3=0.017, mu4=0.017,
+                         muB=0.017, muC=0.017, muD=0.017, muE=0.017,
+                         k1=0.55, k2=0.55, k3=0.1, k4=0.1,
+                         p1=0.15, p2=0.15, p3=0.1, p4=0.1,
+                         gamma1=0.01, gamma2=0.01, gamma3=0.01, gamma4=0.01,
+                         phi1=0.05, phi2=0.05, phi3=0.01, phi4=0.01,
+                         mu1t=0.017, mu2t=0.017, mu3t=0.017, mu4t=0.017,
+                         muBt=0.017, muCt=0.017, muDt=0.017, muEt=0.017,
+                         k1t=0.55, k2t=0.55, k3t=0.1, k4t=0.1,
+                         p1t=0.15, p2t=0.15, p3t=0.1, p4t=0.1,
+                         gamma1t=0.01, gamma2t=0.01, gamma3t=0.01, gamma4t=0.01,
+                         phi1t=0.05, phi2t=0.05, phi3t=0.01, phi4t=0.01)
+STOCHASTIC_U0 = [34650000, 22000000, 16000000, 50000000, 50000000, 50000000]
+STOCHASTIC_DT = 0.2
+STOCHASTIC_T = 168
+
+ALTERNATIVE_RK4 = ['RungeKutta4_List_Comprehensions.py',
+                   'RungeKutta4_Vectorized_Approach.py',
+                   'RungeKutta4_explicit_handling.py']
+
+
+def load_alternative(file_name):
+    # The alternative implementations are bare class definitions that expect
+    # ODESolver to be in scope
+    namespace = {'ODESolver': ODESolver.ODESolver}
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
+    with open(path) as f:
+        exec(compile(f.read(), path, 'exec'), namespace)
+    return namespace['RungeKutta4']
+
+
+def solvers():
+    # (name, function of the model returning its solver)
+    methods = [(name, getattr(ODESolver, name)) for name in
+               ('ForwardEuler', 'ExplicitMidpoint', 'RungeKutta4', 'RungeKutta4InPlace', 'DormandPrince45')]
+    methods.append(('Rosenbrock2', lambda model: ODESolver.Rosenbrock2(model, model.jac)))
+    for file_name in ALTERNATIVE_RK4:
+        methods.append((os.path.splitext(file_name)[0], load_alternative(file_name)))
+    return methods
+
+
+def deterministic_model(n_members=1):
+    params = np.array([DETERMINISTIC_PARAMS[name] for name in Model.VBC.PARAMETERS])
+    if n_members > 1:
+        params = np.tile(params, (n_members, 1))
+        # Spread the members over k1 as in a sweep
+        params[:, Model.VBC.PARAMETERS.index('k1')] = np.linspace(0.3, 0.7, n_members)
+        return Model.VBC.from_array(params), np.tile(DETERMINISTIC_U0, (n_members, 1))
+    return Model.VBC.from_array(params), np.array(DETERMINISTIC_U0, float)
+
+
+def stochastic_time_points():
+    n = int(STOCHASTIC_T/STOCHASTIC_DT)
+    return np.linspace(0, STOCHASTIC_T, n)
+
+
+# Each case returns a function running one repetition of the benchmark
+
+def case_solver(make_solver, n_points):
+    model, U0 = deterministic_model()
+    time_points = np.linspace(0, 200, n_points)
+    def run():
+        solver = make_solver(model)
+        solver.set_initial_condition(U0)
+        solver.solve(time_points)
+    return run
+
+
+def case_rhs_deterministic(n_calls):
+    model, U0 = deterministic_model()
+    def run():
+        for i in range(n_calls):
+            model(U0, 0.0)
+    return run
+
+
+def case_rhs_stochastic(n_calls):
+    # One Euler-Maruyama step evaluates the drift and the diffusion
+    model = Stochastic_model.VBC(**STOCHASTIC_PARAMS)
+    U0 = np.array(STOCHASTIC_U0, float)
+    def run():
+        for i in range(n_calls):
+            model.drift(U0, 10.0)
+            model.diffusion(U0, 10.0)
+    return run
+
+
+def case_deterministic_ensemble(make_solver, n_members, n_points):
+    model, U0 = deterministic_model(n_members)
+    time_points = np.linspace(0, 200, n_points)
+    def run():
+        solver = make_solver(model)
+        solver.set_initial_condition(U0)
+        solver.solve(time_points)
+    return run
+
+
+def case_stochastic_ensemble(n_members):
+    # As in Stochastic_model.py: the trajectories integrated as one Euler-Maruyama ensemble
+    model = Stochastic_model.VBC(**STOCHASTIC_PARAMS)
+    time_points = stochastic_time_points()
+    def run():
+        solver = EulerMaruyama(model.drift, model.diffusion)
+        solver.set_initial_condition(np.tile(STOCHASTIC_U0, (n_members, 1)))
+        solver.solve(time_points, rng=0)
+    return run
+
+
+def case_scenarios(n_replicates, scenarios):
+    # ensemble_runner in this process (workers=1), into a fresh directory every repetition
+    def run():
+        with tempfile.TemporaryDirectory() as directory:
+            run_ensembles(directory, scenarios, n_replicates, workers=1)
+    return run
+
+
+def cases(quick=False):
+    grid_sizes = [201, 1001] if quick else [201, 1001, 5001]
+    ensemble_sizes = [10, 100] if quick else [10, 100, 1000, 10000]
+    stochastic_sizes = [10, 100] if quick else [10, 100, 1000, 10000]
+    n_calls = 1000 if quick else 10000
+    # The first history group of the scenarios (see ensemble_runner.history_groups), or all twelve
+    scenarios = ['S0000', 'S0001', 'S0010', 'S0011'] if quick else None
+    n_replicates = 10 if quick else 100
+    for name, make_solver in solvers():
+        for n_points in grid_sizes:
+            yield 'solver/%s/n=%d' % (name, n_points), case_solver(make_solver, n_points)
+    yield 'rhs/Model.VBC/calls=%d' % n_calls, case_rhs_deterministic(n_calls)
+    yield 'rhs/Stochastic_model.VBC.drift+diffusion/calls=%d' % n_calls, case_rhs_stochastic(n_calls)
+    for name, make_solver in solvers():
+        if name in ('RungeKutta4', 'Rosenbrock2', 'DormandPrince45'):
+            for n_members in ensemble_sizes:
+                yield ('scenario/deterministic/%s/members=%d' % (name, n_members),
+                       case_deterministic_ensemble(make_solver, n_members, 1001))
+    for n_members in stochastic_sizes:
+        yield 'scenario/stochastic/EulerMaruyama/members=%d' % n_members, case_stochastic_ensemble(n_members)
+    yield ('scenario/ensemble_runner/scenarios=%d/replicates=%d' % (len(scenarios or Stochastic_model.SCENARIOS), n_replicates),
+           case_scenarios(n_replicates, scenarios))
+
+
+def measure(run, repeat):
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': float(np.median(times)), 'repeat': repeat}
+
+
+def run_benchmarks(quick=False, repeat=3, pattern=None, stream=sys.stdout):
+    results = {}
+    for name, run in cases(quick):
+        if pattern and pattern not in name:
+            continue
+        results[name] = measure(run, repeat)
+        if stream is not None:
+            stream.write('%-60s %10.4f s\n' % (name, results[name]['min']))
+            stream.flush()
+    return {'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.platform(),
+            'processor': platform.processor(),
+            'quick': quick,
+            'results': results}
+
+
+def compare(report, baseline, tolerance=0.25):
+    # Ratio of the current to the baseline best time for every case both contain;
+    # a case regresses when it is more than `tolerance` slower
+    regressions = {}
+    ratios = {}
+    for name, result in report['results'].items():
+        if name not in baseline['results']:
+            continue
+        ratio = result['min']/baseline['results'][name]['min']
+        ratios[name] = ratio
+        if ratio > 1.0 + tolerance:
+            regressions[name] = ratio
+    return ratios, regressions
+
+
+def main(args):
+    report = run_benchmarks(quick=args.quick, repeat=args.repeat, pattern=args.filter)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        ratios, regressions = compare(report, baseline, args.tolerance)
+        print()
+        for name, ratio in sorted(ratios.items()):
+            flag = '  REGRESSION' if name in regressions else ''
+            print('%-60s x%.2f%s' % (name, ratio, flag))
+        if regressions:
+            print('\n%d of %d cases slower than the baseline by more than %d%%'
+                  % (len(regressions), len(ratios), 100*args.tolerance))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ODE solvers and VBC models.")
+    parser.add_argument("--output", help="Write the results as JSON to this file (e.g. a new baseline)")
+    parser.add_argument("--baseline", help="Compare against a JSON report from a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Relative slowdown over the baseline reported as a regression")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions per case (the best is kept)")
+    parser.add_argument("--filter", help="Only run cases whose name contains this string")
+    parser.add_argument("--quick", action="store_true", help="Smaller grids and ensembles")
+    args = parser.parse_args()
+    sys.exit(main(args))
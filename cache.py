@@ -0,0 +1,204 @@
+# Content-addressed on-disk cache of solver runs.
+#
+# A run is identified by a sha256 digest of the model (its class and every numeric attribute,
+# i.e. the parameters), the initial condition, the time grid, the solver class with its
+# options and the random seed (or Wiener increments) of stochastic runs. The trajectory is
+# stored under that digest as an .npz file, so repeating a run loads it instead of solving:
+#
+#   cache = ResultCache('.vbc_cache', max_bytes=2**30)
+#   solver = RungeKutta4(model)
+#   solver.set_initial_condition(U0)
+#   u, t = cache.solve(solver, time_points)
+#
+# The directory is bounded to max_bytes by evicting the least recently used entries (a hit
+# refreshes the modification time of its file). Writes go through a temporary file and an
+# atomic rename, so concurrent processes can share a cache directory.
+
+import hashlib
+import inspect
+import os
+import tempfile
+import numpy as np
+
+
+class ResultCache:
+    def __init__(self, directory='.vbc_cache', max_bytes=2**30, compress=True):
+        # compress=False trades disk space for faster hits on large ensembles
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    # Keys
+
+    def key(self, model, U0, time_points, solver, seed=None, options=None, save_at=None):
+        # solver: a solver class or instance (the options of an instance are taken from the
+        # arguments of its constructor unless given); seed: an int seed, or the Wiener
+        # increments dW of a stochastic run; save_at: output times of the run, if any
+        h = hashlib.sha256()
+        solver_class = solver if isinstance(solver, type) else type(solver)
+        if options is None and not isinstance(solver, type):
+            options = solver_options(solver)
+        for part in (model, np.asarray(U0, float), np.asarray(time_points, float),
+                     solver_class.__module__ + '.' + solver_class.__qualname__, options, seed,
+                     None if save_at is None else np.asarray(save_at, float)):
+            update_digest(h, part)
+        return h.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    # Entries
+
+    def get(self, key):
+        # (u, t) stored under key, or None
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                u, t = data['u'], data['t']
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return u, t
+
+    def put(self, key, u, t):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                (np.savez_compressed if self.compress else np.savez)(f, u=u, t=t)
+            os.replace(tmp, self.path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict()
+
+    def entries(self):
+        # (mtime, size, path) of every entry, least recently used first
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for mtime, size, path in self.entries())
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for mtime, size, path in entries)
+        for mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        for mtime, size, path in self.entries():
+            os.remove(path)
+
+    # Solving through the cache
+
+    def solve(self, solver, time_points, **kwargs):
+        # solver.solve(time_points, **kwargs) for a solver whose initial condition is set,
+        # or the stored result of the same run. Stochastic runs are cached when they are
+        # reproducible, i.e. given rng as an int seed or dW; runs with events or other
+        # arguments that cannot be keyed are solved directly
+        seed = None
+        save_at = kwargs.get('save_at')
+        if hasattr(solver, 'wiener_increments'):
+            if kwargs.get('dW') is not None:
+                seed = np.asarray(kwargs['dW'], float)
+            elif isinstance(kwargs.get('rng'), (int, np.integer)):
+                seed = int(kwargs['rng'])
+            else:
+                return solver.solve(time_points, **kwargs)
+        elif set(kwargs) - {'save_at'}:
+            return solver.solve(time_points, **kwargs)
+        key = self.key(solver_model(solver), solver.U0, time_points, solver, seed, save_at=save_at)
+        result = self.get(key)
+        if result is not None:
+            solver.u, solver.t = result
+            return result
+        u, t = solver.solve(time_points, **kwargs)
+        self.put(key, u, t)
+        return u, t
+
+
+def solver_model(solver):
+    # The right-hand side(s) a solver was built from
+    if hasattr(solver, 'rhs'):
+        return solver.rhs
+    return (solver.drift, solver.diffusion)
+
+
+def solver_options(solver):
+    # Values of the constructor arguments that the solver keeps as attributes (rtol, jac, ...)
+    names = list(inspect.signature(type(solver).__init__).parameters)[2:]
+    options = {}
+    for name in names:
+        if hasattr(solver, name):
+            value = getattr(solver, name)
+            # Defaults implemented by the solver itself (e.g. a numerical Jacobian)
+            if inspect.ismethod(value) and value.__self__ is solver:
+                value = value.__name__
+            options[name] = value
+    return options
+
+
+def update_digest(h, value, depth=0):
+    # Feed a model, array, number, string or container into the hash h
+    if depth > 32:
+        raise TypeError("ResultCache: cannot key a value nested this deep")
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.number)):
+        h.update(type(value).__name__.encode() + repr(value).encode())
+    elif isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        h.update(('array%s%s' % (value.dtype.str, value.shape)).encode())
+        h.update(value.tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(('%s%d' % (type(value).__name__, len(value))).encode())
+        for item in value:
+            update_digest(h, item, depth + 1)
+    elif isinstance(value, dict):
+        h.update(('dict%d' % len(value)).encode())
+        for name in sorted(value):
+            update_digest(h, name, depth + 1)
+            update_digest(h, value[name], depth + 1)
+    elif inspect.ismethod(value):
+        # A bound method (e.g. model.drift) is keyed by its object and name
+        update_digest(h, (value.__func__.__qualname__, value.__self__), depth + 1)
+    elif inspect.isfunction(value):
+        # Plain functions are keyed by their code and the values they close over (not by
+        # the globals they read)
+        code = value.__code__
+        closure = [cell.cell_contents for cell in value.__closure__ or ()]
+        update_digest(h, (value.__module__, value.__qualname__, code.co_code, code.co_consts, closure), depth + 1)
+    elif isinstance(value, np.random.Generator):
+        # A random stream (e.g. the generators of an SDE run in checkpoint.run_key), keyed by its
+        # current state
+        update_digest(h, ('Generator', value.bit_generator.state), depth + 1)
+    elif hasattr(value, 'values') and hasattr(value, 'NAMES'):
+        # parameters.ParameterSet
+        update_digest(h, (type(value).__name__, value.values), depth + 1)
+    elif hasattr(value, '__dict__'):
+        # A model: its class and attributes
+        cls = type(value)
+        update_digest(h, (cls.__module__ + '.' + cls.__qualname__, vars(value)), depth + 1)
+    else:
+        raise TypeError("ResultCache: cannot key a value of type %s" % type(value).__name__)
@@ -0,0 +1,276 @@
+# Calibration of the cross-border model to the US presidential elections of Voting_data.csv.
+#
+# The parameters of Stochastic_model.py were tuned by hand against the Non-partisan, Dem and
+# Rep voting populations. Calibration fits chosen parameters (any of StochasticParameters.NAMES
+# in force before the 2020 cutoff) and initial conditions (V10, B0, C0, V20, D0, E0) by weighted
+# least squares on the mean dynamics, VBC.drift. The residuals are relative errors,
+# (model - data)/data, of V1, B and C at the elections, so the three series weigh alike; their
+# variance is estimated from the fit (a Gaussian likelihood with unknown noise), which gives
+# the covariance of the estimates from the Jacobian at the optimum. Estimates that end on a
+# bound are left out of the covariance (their std is nan and Fit.at_bound flags them), and a
+# warning is given for them and for standard errors wider than the box of their unknown: the
+# data (three series) pins down only a few unknowns. The contacts k and the persuasion
+# probability p of a party enter the model only through their product, so fit one of the two;
+# the switching rates phi and the leakage gamma trade off against k and against each other.
+# The default set, k1, k2, V10, B0 and C0, ends inside its bounds with standard errors of a
+# few percent of the boxes; adding phi1, phi2, gamma1 and gamma2 gives standard errors several
+# times their boxes.
+#
+# Every forward solve is batched: a set of candidates is one RungeKutta4 ensemble with
+# per-member parameters (VBC.from_array) and initial conditions. fit() samples a Latin
+# hypercube population in one solve, then runs Levenberg-Marquardt from the best candidates,
+# all starts together: each iteration is one ensemble for the finite-difference Jacobians of
+# every start and one for their trial steps. Unknowns are scaled to [0, 1] within their bounds.
+# With exact=True the Jacobians are the exact derivatives of the RK4 solution, from its forward
+# sensitivities (sensitivity.py), instead; they agree with the differences here to the digits
+# of the fit, and as the sensitivity system is as large as the ensemble of shifted candidates
+# and evaluates the model Jacobian at every stage, it is the slower of the two.
+#
+#   calibration = Calibration(['k1', 'k2', 'V10', 'B0', 'C0'])
+#   fit = calibration.fit()
+#   for name, x, std in zip(fit.names, fit.x, fit.std):
+#       print(name, x, std)
+#
+# Elections are placed at t = year - 1932, so that the 1932 election is the initial condition
+# at t0 = 0 and 2020 is the cutoff t = 88 (the plots of Stochastic_model.py place them at
+# t_us = 4, 8, ..., one term later).
+
+import argparse
+import warnings
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from ODESolver import RungeKutta4
+from Stochastic_model import VBC, SCENARIOS, CUTOFF
+from sensitivity import Sensitivities, INITIAL_CONDITIONS
+
+# Data columns (millions) and the state variables they are compared to (V1, B, C)
+COLUMNS = ('Non-partisan', 'Dem', 'Rep')
+VARIABLES = (0, 1, 2)
+
+# names, estimates x and standard errors std, covariance of x, sum of squared residuals,
+# residuals (n_elections, 3) at the optimum, noise variance, the full parameter record and
+# initial condition, the final cost of every start, and which estimates ended on a bound
+Fit = namedtuple('Fit', 'names x std covariance cost residuals variance params U0 start_costs at_bound')
+
+# The unknowns of the default fit
+DEFAULT_NAMES = ('k1', 'k2', 'V10', 'B0', 'C0')
+
+
+def load_data(path='Voting_data.csv'):
+    # t (years since 1932) and the (n, 3) voting populations in millions of the elections.
+    # The file is an Excel workbook despite its extension
+    with open(path, 'rb') as f:
+        excel = f.read(2) == b'PK'
+    data = pd.read_excel(path) if excel else pd.read_csv(path)
+    return data['Year'].to_numpy(float) - 1932, data[list(COLUMNS)].to_numpy(float)
+
+
+def default_bounds(name, value):
+    # Search range of a parameter or initial condition around its value
+    if name in INITIAL_CONDITIONS:
+        return 0.5*value, 1.5*value
+    for prefix, bounds in (('phi', (0.0, 0.2)), ('gamma', (0.0, 0.1)), ('mu', (0.0, 0.05)),
+                           ('k', (0.01, 1.0)), ('p', (0.01, 1.0)), ('r', (0.0, 0.05))):
+        if name.startswith(prefix):
+            return bounds
+    raise ValueError("Calibration: no default bounds for %s" % name)
+
+
+class Calibration:
+    def __init__(self, names, bounds=None, params=None, U0=None, data=None, dt=1.0, exact=False):
+        # names: what to fit; bounds: {name: (lower, upper)} (see default_bounds); params: a
+        # StochasticParameters record and U0 the initial condition for everything not fitted
+        # (scenario S0000 by default); data: (t, y) as from load_data; dt: RK4 step; exact:
+        # Jacobians from the sensitivities instead of finite differences
+        scenario = SCENARIOS['S0000']
+        self.params = scenario.params if params is None else params
+        self.U0 = np.asarray(scenario.U0 if U0 is None else U0, float)
+        self.names = list(names)
+        for name in self.names:
+            if name not in INITIAL_CONDITIONS and name not in self.params:
+                raise ValueError("Calibration: unknown parameter %s" % name)
+            if name.endswith('t') and name in self.params:
+                raise ValueError("Calibration: %s only acts after the data (t >= %g)" % (name, CUTOFF))
+        bounds = bounds or {}
+        self.lower, self.upper = np.array([bounds[name] if name in bounds else default_bounds(name, self.value(name))
+                                           for name in self.names], float).T
+        self.t, self.y = load_data() if data is None else data
+        # A grid through every election
+        steps = int(np.ceil(self.t[-1]/dt))
+        self.time_points = np.union1d(np.linspace(0, self.t[-1], steps + 1), self.t)
+        self.exact = exact
+        self.nfev = 0
+
+    def value(self, name):
+        if name in INITIAL_CONDITIONS:
+            return self.U0[INITIAL_CONDITIONS.index(name)]
+        return self.params[name]
+
+    # Scaled unknowns z in [0, 1] and values x
+
+    def to_x(self, Z):
+        return self.lower + np.asarray(Z, float)*(self.upper - self.lower)
+
+    def to_z(self, X):
+        return (np.asarray(X, float) - self.lower)/(self.upper - self.lower)
+
+    def unpack(self, X):
+        # (m, 50) parameters and (m, 6) initial conditions of the candidates X (m, n_names)
+        X = np.atleast_2d(X)
+        params = np.tile(self.params.values, (len(X), 1))
+        U0 = np.tile(self.U0, (len(X), 1))
+        for j, name in enumerate(self.names):
+            if name in INITIAL_CONDITIONS:
+                U0[:, INITIAL_CONDITIONS.index(name)] = X[:, j]
+            else:
+                params[:, self.params.INDEX[name]] = X[:, j]
+        return params, U0
+
+    def simulate(self, X):
+        # (m, n_elections, 3) model voting populations, in millions, of the candidates X
+        params, U0 = self.unpack(X)
+        model = VBC.from_array(params)
+        solver = RungeKutta4(model.drift)
+        solver.set_initial_condition(U0)
+        with np.errstate(all='ignore'):
+            u, t = solver.solve(self.time_points, save_at=self.t)
+        self.nfev += len(U0)
+        return np.moveaxis(u[..., list(VARIABLES)], 1, 0)/1e6
+
+    def residuals(self, X):
+        # (m, n_elections*3) relative errors; candidates whose solve broke down get inf
+        r = ((self.simulate(X) - self.y)/self.y).reshape(len(np.atleast_2d(X)), -1)
+        r[~np.isfinite(r).all(axis=1)] = np.inf
+        return r
+
+    # Search
+
+    def population(self, size, rng=None):
+        # Latin hypercube sample of the bounds, (size, n_names) in z
+        rng = np.random.default_rng(rng)
+        strata = np.array([rng.permutation(size) for name in self.names]).T
+        return (strata + rng.random(strata.shape))/size
+
+    def jacobian(self, Z, r, h=1e-6):
+        # Forward differences in z of the residuals r at the starts Z, (s, n, p), in one solve
+        if self.exact:
+            return self.exact_jacobian(Z)
+        s, p = Z.shape
+        # Step inwards at the upper bound
+        steps = np.where(Z + h <= 1, h, -h)
+        shifted = np.repeat(Z[:, None], p, axis=1) + steps[:, :, None]*np.eye(p)
+        r_shifted = self.residuals(self.to_x(shifted.reshape(s*p, p))).reshape(s, p, -1)
+        return np.swapaxes((r_shifted - r[:, None])/steps[:, :, None], 1, 2)
+
+    def exact_jacobian(self, Z):
+        # Jacobians in z of the residuals at the starts Z, (s, n, p), from the sensitivities of
+        # the candidates, in one solve
+        params, U0 = self.unpack(self.to_x(Z))
+        sensitivities = Sensitivities(VBC.from_array(params), self.names)
+        with np.errstate(all='ignore'):
+            u, S, t = sensitivities.solve(U0, self.time_points, save_at=self.t)
+        self.nfev += len(U0)
+        # (n_elections, s, 3, p) -> (s, n_elections*3, p), relative to the data
+        S = np.moveaxis(S[..., list(VARIABLES), :], 1, 0)/1e6/self.y[..., None]
+        return S.reshape(len(Z), -1, len(self.names))*(self.upper - self.lower)
+
+    def levenberg_marquardt(self, Z, max_iter=50, tol=1e-4):
+        # Batched Levenberg-Marquardt from the starts Z (s, p), bounded to [0, 1]. Returns the
+        # optima, their residuals and Jacobians
+        Z = np.array(Z, float)
+        r = self.residuals(self.to_x(Z))
+        cost = 0.5*np.sum(r**2, axis=1)
+        damping = np.full(len(Z), 1e-3)
+        active = np.isfinite(cost)
+        J = np.zeros(r.shape + (Z.shape[1],))
+        fresh = active.copy()
+        for iteration in range(max_iter):
+            if not active.any():
+                break
+            if fresh.any():
+                J[fresh] = self.jacobian(Z[fresh], r[fresh])
+            idx = np.flatnonzero(active)
+            A = np.einsum('snp,snq->spq', J[idx], J[idx])
+            g = np.einsum('snp,sn->sp', J[idx], r[idx])
+            diag = np.einsum('spp->sp', A)
+            A_damped = A + (damping[idx, None]*np.maximum(diag, 1e-12))[:, :, None]*np.eye(Z.shape[1])
+            step = -np.linalg.solve(A_damped, g[:, :, None])[:, :, 0]
+            Z_trial = np.clip(Z[idx] + step, 0, 1)
+            r_trial = self.residuals(self.to_x(Z_trial))
+            cost_trial = 0.5*np.sum(r_trial**2, axis=1)
+            better = cost_trial < cost[idx]
+            moved = np.max(np.abs(Z_trial - Z[idx]), axis=1)
+            gain = (cost[idx] - cost_trial)/np.maximum(cost[idx], 1e-300)
+            fresh[:] = False
+            accept = idx[better]
+            Z[accept], r[accept], cost[accept] = Z_trial[better], r_trial[better], cost_trial[better]
+            fresh[accept] = True
+            damping[accept] = np.maximum(damping[accept]/3, 1e-12)
+            damping[idx[~better]] *= 4
+            # Converged: negligible progress, or the damping no longer finds a descent step
+            done = (better & ((gain < tol) | (moved < tol))) | (~better & (damping[idx] > 1e6))
+            active[idx[done]] = False
+        return Z, r, J, cost
+
+    def fit(self, population=256, n_starts=8, rng=0, max_iter=50):
+        # Latin hypercube search, then Levenberg-Marquardt from the n_starts best candidates
+        self.nfev = 0
+        Z = self.population(population, rng)
+        cost = 0.5*np.sum(self.residuals(self.to_x(Z))**2, axis=1)
+        starts = Z[np.argsort(cost)[:n_starts]]
+        Z, r, J, cost = self.levenberg_marquardt(starts, max_iter)
+        best = int(np.argmin(cost))
+        # Jacobian at the optimum itself
+        J = self.jacobian(Z[best:best + 1], r[best:best + 1])[0]
+        # The local covariance holds for the estimates inside the bounds only
+        at_bound = (Z[best] <= 1e-6) | (Z[best] >= 1 - 1e-6)
+        free = np.flatnonzero(~at_bound)
+        n = J.shape[0]
+        variance = 2*cost[best]/max(n - len(free), 1)
+        width = self.upper - self.lower
+        covariance = np.full((len(self.names), len(self.names)), np.nan)
+        J_free = J[:, free]
+        covariance[np.ix_(free, free)] = (width[free, None]*(variance*np.linalg.pinv(J_free.T @ J_free))
+                                          *width[None, free])
+        std = np.sqrt(np.diag(covariance))
+        for j, name in enumerate(self.names):
+            if at_bound[j]:
+                warnings.warn("Calibration: %s ended on a bound of [%g, %g]; it is left out of the covariance"
+                              % (name, self.lower[j], self.upper[j]))
+            elif std[j] > width[j]:
+                warnings.warn("Calibration: the standard error of %s (%g) exceeds its box [%g, %g]; "
+                              "the data does not determine it" % (name, std[j], self.lower[j], self.upper[j]))
+        x = self.to_x(Z[best])
+        params, U0 = self.unpack(x)
+        return Fit(self.names, x, std, covariance, 2*cost[best], r[best].reshape(-1, len(COLUMNS)), variance,
+                   type(self.params)(params[0]), U0[0], np.sort(cost), at_bound)
+
+
+def main(args):
+    import time
+    calibration = Calibration(args.fit, dt=args.dt, exact=args.exact)
+    start = time.perf_counter()
+    fit = calibration.fit(args.population, args.starts, args.seed)
+    elapsed = time.perf_counter() - start
+    print('Fit of %d unknowns to %d elections in %.1f s (%d model runs)'
+          % (len(fit.names), len(calibration.t), elapsed, calibration.nfev))
+    print('Relative error of the data: %.2f%%' % (100*np.sqrt(fit.variance)))
+    for name, x, std, lower, upper, at_bound in zip(fit.names, fit.x, fit.std, calibration.lower,
+                                                    calibration.upper, fit.at_bound):
+        print('%-8s %12.6g +- %-12.4g [%g, %g]%s' % (name, x, std, lower, upper, '  at bound' if at_bound else ''))
+    print('Final cost of the starts:', ' '.join('%.4g' % c for c in 2*fit.start_costs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit VBC parameters to the US elections of Voting_data.csv.")
+    parser.add_argument("--fit", nargs="+", default=list(DEFAULT_NAMES),
+                        help="Parameters and initial conditions (V10, B0, C0, V20, D0, E0) to fit")
+    parser.add_argument("--population", type=int, default=256, help="Candidates of the initial search")
+    parser.add_argument("--starts", type=int, default=8, help="Levenberg-Marquardt starts")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the initial search")
+    parser.add_argument("--dt", type=float, default=1.0, help="RK4 step in years")
+    parser.add_argument("--exact", action="store_true",
+                        help="Jacobians from the forward sensitivities instead of finite differences")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,127 @@
+# Checkpoints of long solves, to resume them after the process dies.
+#
+# solve(solver, time_points, directory) integrates like solver.solve(time_points), chunk by
+# chunk through iter_solve, into a memory-mapped u.npy in directory. Every `interval` seconds
+# the rows computed so far are flushed, then the position reached and the state of the random
+# streams of an SDE solver are written to state.pkl through a temporary file and an atomic
+# rename. Calling solve() again with the same solver, time points and rng continues from the
+# last checkpoint; SDE solvers need rng, as a seed or generators, so that the run can be
+# recognised and its noise continued:
+#
+#   solver.set_initial_condition(np.tile(U0, (100000, 1)))
+#   u, t = checkpoint.solve(solver, time_points, 'run1', rng=random_stream(0, 1))
+#
+# The fixed-step solvers carry nothing but the current state from one time point to the next,
+# and the streams continue from where they were saved, so a resumed solve is bit-identical to
+# an uninterrupted one. DormandPrince45 is not supported: its step size and error history
+# between output points would have to be restored as well.
+# Ensembles of separate runs checkpoint their progress through the flags of EnsembleStore
+# (see ensemble_runner.run_ensembles(resume=True)).
+
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+import numpy as np
+from ODESolver import DormandPrince45, chunk_rows
+from cache import solver_model, solver_options, update_digest
+
+
+def run_key(solver, time_points, rng=None):
+    # Digest of the run a checkpoint belongs to, taken before anything is drawn
+    h = hashlib.sha256()
+    for part in (solver_model(solver), np.asarray(solver.U0, float), np.asarray(time_points, float),
+                 type(solver).__qualname__, solver_options(solver), rng):
+        update_digest(h, part)
+    return h.hexdigest()
+
+
+def streams(rng):
+    # The generators whose state a checkpoint saves
+    if rng is None:
+        return []
+    return rng if isinstance(rng, list) else [rng]
+
+
+def save_state(directory, state):
+    # Atomic replacement of state.pkl
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(directory, 'state.pkl'))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def load_state(directory):
+    # The last checkpoint in directory, or None
+    try:
+        with open(os.path.join(directory, 'state.pkl'), 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def solve(solver, time_points, directory, interval=60.0, chunk_size=None, rng=None):
+    # solver.solve(time_points[, rng]) for a fixed-step ODE or SDE solver whose initial
+    # condition is set, checkpointed in directory every `interval` seconds (0: after every
+    # chunk). rng (SDE solvers) must be given again, as it was, to resume. Returns (u, t)
+    # with u read from directory/u.npy as a memory map
+    if isinstance(solver, DormandPrince45):
+        raise ValueError("checkpoint: adaptive solvers cannot resume bit-identically, use a fixed-step solver")
+    time_points = np.asarray(time_points, float)
+    N = len(time_points)
+    U0 = solver.U0
+    stochastic = hasattr(solver, 'wiener_increments')
+    if stochastic:
+        if rng is None:
+            raise ValueError("checkpoint: SDE solvers need rng (a seed, a Generator or one per member) "
+                             "to resume; without it every call draws new noise")
+        rng = solver.generators(rng)
+    elif rng is not None:
+        raise ValueError("checkpoint: rng is for SDE solvers")
+    key = run_key(solver, time_points, rng)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, 'u.npy')
+    state = load_state(directory)
+    if state is not None and state['key'] != key:
+        raise ValueError("checkpoint: %s holds a different run; remove it or use another directory" % directory)
+    generators = streams(rng)
+    if state is None:
+        u = np.lib.format.open_memmap(path, mode='w+', dtype=float, shape=(N,) + np.shape(U0))
+        u[0] = U0
+        n = 1
+    else:
+        u = np.load(path, mmap_mode='r+')
+        n = state['n']
+        for generator, saved in zip(generators, state['streams']):
+            generator.bit_generator.state = saved
+    if n < N:
+        # Continue from row n-1, the last one covered by the checkpoint
+        solver.set_initial_condition(u[n - 1])
+        chunk_size = chunk_size or chunk_rows(U0)
+        chunks = solver.iter_solve(time_points[n - 1:], chunk_size, rng=rng) if stochastic else \
+            solver.iter_solve(time_points[n - 1:], chunk_size)
+        saved = time.monotonic()
+        try:
+            for i, (t_chunk, u_chunk) in enumerate(chunks):
+                # The first chunk repeats the starting row
+                u_chunk = u_chunk[1:] if i == 0 else u_chunk
+                u[n:n + len(u_chunk)] = u_chunk
+                n += len(u_chunk)
+                if n == N or time.monotonic() - saved >= interval:
+                    u.flush()
+                    save_state(directory, {'key': key, 'n': n,
+                                           'streams': [g.bit_generator.state for g in generators]})
+                    saved = time.monotonic()
+        finally:
+            solver.set_initial_condition(U0)
+    del u
+    solver.u, solver.t = np.load(path, mmap_mode='r'), time_points
+    return solver.u, solver.t
@@ -0,0 +1,232 @@
+# Numerical continuation of the equilibria of the deterministic cross-border model.
+#
+# Equilibria of the population proportions (see equilibria.py) are followed along any VBC
+# parameter by pseudo-arclength continuation: an Euler predictor along the tangent of the
+# solution curve and a Newton corrector on the plane orthogonal to it, so branches are
+# followed around folds. Along a branch, sign changes of test functions flag
+#   fold        - the parameter component of the tangent,
+#   branch      - det of the bordered Jacobian [F_y F_p; tangent] (transcritical and
+#                 other branch points, e.g. where an interior equilibrium meets B = 0),
+#   hopf        - det of the bialternate product 2J (.) I, whose eigenvalues are the sums
+#                 of pairs of eigenvalues of J (neutral saddles are filtered out),
+# and each special point is located by a secant search on the arclength. Fold, branch and
+# Hopf points are then continued in two parameters by appending the defining condition
+# det(J) = 0 or det(2J (.) I) = 0 to the equilibrium equations, which traces the regime
+# boundaries of a (p1, p2) plane from a few hundred corrector solves.
+
+from collections import namedtuple
+import numpy as np
+from Model import VBC
+from equilibria import residual, residual_jacobian, proportions
+
+# Points along a branch: parameter values (n,), y = (B, C, D, E) (n, 4), eigenvalues (n, 4),
+# stability mask (n,) and the special points found
+Branch = namedtuple('Branch', 'parameter y eigenvalues stable special_points')
+# kind: 'fold', 'branch' or 'hopf'; parameter: value (or (p1, p2)); y; eigenvalues
+SpecialPoint = namedtuple('SpecialPoint', 'kind parameter y eigenvalues')
+# A two-parameter curve: (n, 2) parameter values and (n, 4) states
+Curve = namedtuple('Curve', 'kind names parameters y')
+
+
+def with_parameters(params, names, values):
+    params = np.array(params, float)
+    for name, value in zip(names, values):
+        params[VBC.PARAMETERS.index(name)] = value
+    return params
+
+
+def bialternate(A):
+    # 2A (.) I for an n x n matrix A (Govaerts, Numerical Methods for Bifurcations of
+    # Dynamical Equilibria, 2000); its eigenvalues are lambda_i + lambda_j, i < j
+    n = len(A)
+    pairs = [(p, q) for p in range(1, n) for q in range(p)]
+    B = np.zeros((len(pairs), len(pairs)))
+    for i, (p, q) in enumerate(pairs):
+        for j, (r, s) in enumerate(pairs):
+            if r == q:
+                B[i, j] = -A[p, s]
+            elif r != p and s == q:
+                B[i, j] = A[p, r]
+            elif r == p and s == q:
+                B[i, j] = A[p, p] + A[q, q]
+            elif r == p and s != q:
+                B[i, j] = A[q, s]
+            elif s == p:
+                B[i, j] = -A[q, r]
+    return B
+
+
+class Continuation:
+    # Pseudo-arclength continuation of F(z) = 0 with z in R^(n+1), F: R^(n+1) -> R^n.
+    # DF(z) returns the n x (n+1) Jacobian
+    def __init__(self, F, DF, tol=1e-10, maxiter=8):
+        self.F = F
+        self.DF = DF
+        self.tol = tol
+        self.maxiter = maxiter
+
+    def tangent(self, z, previous=None):
+        # Null vector of DF(z), oriented along the previous tangent
+        tau = np.linalg.svd(self.DF(z))[2][-1]
+        if previous is not None and tau @ previous < 0:
+            tau = -tau
+        return tau
+
+    def correct(self, z_pred, tau):
+        # Newton on F(z) = 0, tau.(z - z_pred) = 0
+        z = np.array(z_pred, float)
+        for i in range(self.maxiter):
+            r = np.append(self.F(z), tau @ (z - z_pred))
+            if np.max(np.abs(r)) < self.tol:
+                return z, i, True
+            A = np.vstack([self.DF(z), tau])
+            try:
+                z = z - np.linalg.solve(A, r)
+            except np.linalg.LinAlgError:
+                return z, i, False
+        r = np.append(self.F(z), tau @ (z - z_pred))
+        return z, self.maxiter, bool(np.max(np.abs(r)) < self.tol)
+
+    def step(self, z, tau, ds):
+        return self.correct(z + ds*tau, tau)
+
+    def run(self, z0, ds=0.01, ds_min=1e-6, ds_max=0.05, max_steps=500, inside=None, tests=None):
+        # Follow the curve from z0 in the direction of increasing last component when ds > 0.
+        # inside(z) stops the run when False; tests maps names to test functions
+        # test(z, tau) whose sign changes are located on the arclength.
+        # Returns the points, tangents and the located zeros [(name, z, tau)]
+        tests = tests or {}
+        z, converged = self.correct(z0, np.eye(len(z0))[-1])[::2]
+        if not converged:
+            raise ValueError("Continuation: the starting point is not a solution")
+        tau = self.tangent(z)
+        if tau[-1]*ds < 0:
+            tau = -tau
+        ds = abs(ds)
+        points, tangents, zeros = [z], [tau], []
+        values = {name: test(z, tau) for name, test in tests.items()}
+        for k in range(max_steps):
+            z_new, iterations, converged = self.step(z, tau, ds)
+            if not converged:
+                ds /= 2
+                if ds < ds_min:
+                    break
+                continue
+            tau_new = self.tangent(z_new, tau)
+            if inside is not None and not inside(z_new):
+                break
+            for name, test in tests.items():
+                value = test(z_new, tau_new)
+                if np.sign(value) != np.sign(values[name]) and values[name] != 0:
+                    zeros.append((name,) + self.locate(test, z, tau, ds, values[name], value))
+                values[name] = value
+            z, tau = z_new, tau_new
+            points.append(z)
+            tangents.append(tau)
+            # Grow the step while the corrector converges quickly
+            if iterations <= 2:
+                ds = min(ds*1.5, ds_max)
+            elif iterations > 4:
+                ds = max(ds/2, ds_min)
+        return np.array(points), np.array(tangents), zeros
+
+    def locate(self, test, z, tau, ds, value_a, value_b, tol=1e-9, maxiter=30):
+        # Secant (regula falsi) on the step length from z for the zero of the test function
+        a, b = 0.0, ds
+        z_s, tau_s = z, tau
+        for i in range(maxiter):
+            s = b - value_b*(b - a)/(value_b - value_a)
+            z_s, it, converged = self.step(z, tau, s)
+            tau_s = self.tangent(z_s, tau)
+            value = test(z_s, tau_s)
+            if abs(b - a) < tol or value == 0:
+                break
+            if np.sign(value) == np.sign(value_a):
+                a, value_a = s, value
+            else:
+                b, value_b = s, value
+        return z_s, tau_s
+
+
+def equilibrium_problem(params, name, h=1e-7):
+    # F(y, p) = proportion dynamics at parameter `name` = p, with its Jacobian
+    def model(p):
+        return VBC.from_array(with_parameters(params, [name], [p]))
+    def F(z):
+        return residual(model(z[-1]), z[:-1])
+    def DF(z):
+        Fp = (F(z + h*np.eye(5)[-1]) - F(z - h*np.eye(5)[-1]))/(2*h)
+        return np.column_stack([residual_jacobian(model(z[-1]), z[:-1]), Fp])
+    return F, DF, model
+
+
+def in_domain(z, lower, upper, margin):
+    x = proportions(z[:4])
+    return lower <= z[-1] <= upper and np.all(x > -margin)
+
+
+def continue_equilibrium(params, name, y0, bounds, ds=0.01, max_steps=1000, margin=0.05,
+                         detect=('fold', 'branch', 'hopf')):
+    # Follow the equilibrium y0 = (B, C, D, E) of the model with parameters `params` (24 values
+    # in VBC.PARAMETERS order) along parameter `name` within bounds = (lower, upper); a
+    # negative ds continues towards lower values. The branch may leave the simplices by
+    # `margin`, so that crossings of the boundary (e.g. B = 0) are detected
+    lower, upper = bounds
+    F, DF, model = equilibrium_problem(params, name)
+    def J(z):
+        return residual_jacobian(model(z[-1]), z[:-1])
+    tests = {}
+    if 'fold' in detect:
+        tests['fold'] = lambda z, tau: tau[-1]
+    if 'branch' in detect:
+        tests['branch'] = lambda z, tau: np.linalg.det(np.vstack([DF(z), tau]))
+    if 'hopf' in detect:
+        tests['hopf'] = lambda z, tau: np.linalg.det(bialternate(J(z)))
+    continuation = Continuation(F, DF)
+    z0 = np.append(np.asarray(y0, float), with_parameters(params, [], [])[VBC.PARAMETERS.index(name)])
+    points, tangents, zeros = continuation.run(z0, ds, max_steps=max_steps, tests=tests,
+                                               inside=lambda z: in_domain(z, lower, upper, margin))
+    eigenvalues = np.array([np.linalg.eigvals(J(z)) for z in points])
+    stable = np.all(eigenvalues.real < -1e-10, axis=1)
+    special = []
+    for kind, z, tau in zeros:
+        ev = np.linalg.eigvals(J(z))
+        if kind == 'hopf' and not np.any(np.abs(ev.imag) > 1e-8):
+            # Neutral saddle (a pair of real eigenvalues +-lambda), not a Hopf point
+            continue
+        special.append(SpecialPoint(kind, z[-1], z[:-1], ev))
+    return Branch(points[:, -1], points[:, :-1], eigenvalues, stable, special)
+
+
+def continue_bifurcation(params, names, point, bounds, ds=0.01, max_steps=1000, margin=0.05, h=1e-7):
+    # Follow a fold/branch or Hopf point (a SpecialPoint from continue_equilibrium in
+    # names[0]) in the two parameters names = (p1, p2) within bounds = ((lo1, hi1), (lo2, hi2)).
+    # Unknowns z = (B, C, D, E, p1, p2); the defining condition is det(J) = 0 for folds and
+    # branch points and det(2J (.) I) = 0 for Hopf points
+    def model(z):
+        return VBC.from_array(with_parameters(params, names, z[-2:]))
+    def condition(z):
+        J = residual_jacobian(model(z), z[:4])
+        return np.linalg.det(bialternate(J) if point.kind == 'hopf' else J)
+    def F(z):
+        return np.append(residual(model(z), z[:4]), condition(z))
+    def DF(z):
+        columns = []
+        for k in range(len(z)):
+            e = np.zeros(len(z))
+            e[k] = h
+            columns.append((F(z + e) - F(z - e))/(2*h))
+        return np.column_stack(columns)
+    (lo1, hi1), (lo2, hi2) = bounds
+    def inside(z):
+        return lo1 <= z[-2] <= hi1 and lo2 <= z[-1] <= hi2 and np.all(proportions(z[:4]) > -margin)
+    p2 = with_parameters(params, [], [])[VBC.PARAMETERS.index(names[1])]
+    z0 = np.concatenate([point.y, [point.parameter, p2]])
+    continuation = Continuation(F, DF)
+    curves = []
+    # Both directions from the starting point
+    for direction in (1, -1):
+        points = continuation.run(z0, direction*ds, max_steps=max_steps, inside=inside)[0]
+        curves.append(points[::direction])
+    points = np.vstack([curves[1][:-1], curves[0]])
+    return Curve(point.kind, tuple(names), points[:, -2:], points[:, :4])
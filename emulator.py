@@ -0,0 +1,176 @@
+# Gaussian process emulator of the 2100 outcomes, for instant what-if queries.
+#
+# An RK4 solve to 2100 takes tens of milliseconds; the emulator answers thousands of queries
+# in a few. Emulator(names) is trained on a batch of runs of VBC.drift over a box of the
+# parameters around a scenario, by default its values +- spread (names and scenario as in
+# GlobalSensitivity, see sensitivity_analysis.py): a scrambled Halton design of n points is
+# integrated as one ensemble, and a Gaussian process with a squared exponential kernel is
+# fitted to the logarithms of the six populations at T. The lengthscales (one per parameter,
+# shared by the outputs) maximise the marginal likelihood; the variance of each output is
+# profiled out. Over +-25% of six rates of S0000, 256 runs give relative errors under 1%; the
+# error grows quickly with the size of the box.
+#
+# Every answer comes with an error estimate: the predictive standard deviation of the log
+# population, i.e. a relative error, scaled so that the leave-one-out residuals of the
+# training runs have unit variance. Queries outside the box, or whose error exceeds
+# `tolerance`, are answered by the solver instead (Prediction.solved):
+#
+#   emulator = Emulator(['k1', 'k2', 'phi1', 'phi2', 'gamma1', 'gamma2']).train(256)
+#   answer = emulator.what_if(k1=0.9*emulator.params['k1'])   # k1 drops 10%
+#   answer.mean[0, OUTPUTS.index('B')], answer.error[0, OUTPUTS.index('B')]
+#   emulator.predict(X)                                       # X (m, d) parameter values
+
+import argparse
+from collections import namedtuple
+import numpy as np
+from Stochastic_model import VBC, SCENARIOS
+from sensitivity_analysis import GlobalSensitivity, OUTPUTS, halton, scrambling
+
+# Populations (m, 6) in millions at T, their relative errors (0 where solved) and which of the
+# queries were solved (m,)
+Prediction = namedtuple('Prediction', 'mean error solved')
+
+
+def squared_exponential(A, B, lengthscales):
+    # Kernel matrix (len(A), len(B)) of the points A and B
+    A, B = A/lengthscales, B/lengthscales
+    d2 = np.sum(A**2, axis=1)[:, None] + np.sum(B**2, axis=1)[None] - 2*A @ B.T
+    return np.exp(-0.5*np.maximum(d2, 0))
+
+
+class Emulator(GlobalSensitivity):
+    def __init__(self, names=None, bounds=None, scenario='S0000', T=168, dt=1.0, chunk=4096,
+                 spread=0.25, tolerance=0.01, nugget=1e-8):
+        # As GlobalSensitivity, with the bounds of the parameters not in bounds at their value
+        # in the scenario +- spread (relative; the bounds of GlobalSensitivity for those that
+        # are 0); tolerance: largest relative error answered by the emulator; nugget: jitter
+        # added to the kernel of the (noise-free) training runs
+        params = SCENARIOS[scenario].params
+        bounds = dict(bounds or {})
+        for name in names or VBC.PARAMETERS[2:26]:
+            if name not in bounds and name in params and params[name] != 0:
+                bounds[name] = sorted([(1 - spread)*params[name], (1 + spread)*params[name]])
+        GlobalSensitivity.__init__(self, names, bounds, scenario, T, dt, chunk)
+        self.tolerance = tolerance
+        self.nugget = nugget
+
+    def train(self, n=256, rng=None, iterations=200, learning_rate=0.05):
+        # Integrate n design points and fit the process (Adam on the log lengthscales).
+        # Returns the emulator
+        rng = np.random.default_rng(rng)
+        Z = halton(0, n, self.d, scrambling(self.d, rng))
+        Y = self.evaluate(Z)
+        # Runs that broke down are left out
+        valid = np.all(np.isfinite(Y) & (Y > 0), axis=1)
+        Z, Y = Z[valid], np.log(Y[valid])
+        self.Z = Z
+        self.offset, self.scale = Y.mean(axis=0), np.maximum(Y.std(axis=0), 1e-12)
+        y = (Y - self.offset)/self.scale
+        log_l = np.full(self.d, np.log(0.5))
+        m, v = np.zeros(self.d), np.zeros(self.d)
+        for i in range(1, iterations + 1):
+            objective, gradient = self.log_likelihood(log_l, y)
+            m = 0.9*m + 0.1*gradient
+            v = 0.999*v + 0.001*gradient**2
+            log_l += learning_rate*(m/(1 - 0.9**i))/(np.sqrt(v/(1 - 0.999**i)) + 1e-8)
+            log_l = np.clip(log_l, np.log(1e-2), np.log(1e2))
+        self.lengthscales = np.exp(log_l)
+        self.factor(y)
+        return self
+
+    def log_likelihood(self, log_l, y):
+        # Marginal log likelihood of the standardised outputs y (n, q), their variances profiled
+        # out, and its gradient with respect to the log lengthscales
+        n, q = y.shape
+        lengthscales = np.exp(log_l)
+        K = squared_exponential(self.Z, self.Z, lengthscales)
+        L = np.linalg.cholesky(K + self.nugget*np.eye(n))
+        L_inv = np.linalg.inv(L)
+        K_inv = L_inv.T @ L_inv
+        alpha = K_inv @ y
+        quadratic = np.sum(y*alpha, axis=0)
+        objective = -0.5*n*np.sum(np.log(quadratic)) - q*np.sum(np.log(np.diag(L)))
+        # d/d log l_j = 0.5 sum(W * dK_j), dK_j = K * (z_aj - z_bj)^2/l_j^2
+        W = n*(alpha/quadratic) @ alpha.T - q*K_inv
+        M = W*K
+        Z = self.Z
+        distances = 2*(M.sum(axis=1) @ Z**2) - 2*np.sum((M @ Z)*Z, axis=0)
+        return objective, 0.5*distances/lengthscales**2
+
+    def factor(self, y):
+        # Quantities of the predictions, and the leave-one-out errors of the training runs
+        n = len(y)
+        K = squared_exponential(self.Z, self.Z, self.lengthscales) + self.nugget*np.eye(n)
+        L_inv = np.linalg.inv(np.linalg.cholesky(K))
+        self.K_inv = L_inv.T @ L_inv
+        self.alpha = self.K_inv @ y
+        self.variance = np.sum(y*self.alpha, axis=0)/n
+        # Leave-one-out residuals and variances of every run (Rasmussen & Williams 5.4.2)
+        diagonal = np.diag(self.K_inv)[:, None]
+        residuals = self.alpha/diagonal
+        self.calibration = np.mean(residuals**2/(self.variance/diagonal), axis=0)
+        # Root mean square leave-one-out error of each output, relative
+        self.loo_error = np.sqrt(np.mean(residuals**2, axis=0))*self.scale
+
+    def predict(self, X, solve=True):
+        # Answers to the queries X (m, d) (values of names), see Prediction; solve=False
+        # answers every query with the emulator
+        X = np.atleast_2d(np.asarray(X, float))
+        Z = (X - self.lower)/(self.upper - self.lower)
+        K_star = squared_exponential(Z, self.Z, self.lengthscales)
+        mean = np.exp(self.offset + self.scale*(K_star @ self.alpha))
+        variance = np.maximum(1 + self.nugget - np.sum((K_star @ self.K_inv)*K_star, axis=1), 0)
+        error = self.scale*np.sqrt(variance[:, None]*self.variance*self.calibration)
+        solved = np.zeros(len(X), dtype=bool)
+        if solve:
+            solved = np.any((Z < 0) | (Z > 1), axis=1) | np.any(error > self.tolerance, axis=1)
+            if solved.any():
+                mean[solved] = self.evaluate(Z[solved])
+                error[solved] = 0
+        return Prediction(mean, error, solved)
+
+    def what_if(self, solve=True, **values):
+        # Answer for the scenario with the parameters in values changed (the others of names
+        # as in the scenario)
+        x = np.array([values.pop(name, self.params[name]) for name in self.names], float)
+        if values:
+            raise ValueError("Emulator: %s not emulated" % ', '.join(values))
+        return self.predict(x, solve)
+
+
+def main(args):
+    import time
+    emulator = Emulator(args.names, scenario=args.scenario, T=args.T, spread=args.spread, tolerance=args.tolerance)
+    start = time.perf_counter()
+    emulator.train(args.n, rng=args.seed)
+    print('Trained on %d runs in %.1f s' % (len(emulator.Z), time.perf_counter() - start))
+    print('Leave-one-out relative error:', '  '.join('%s %.2g' % item for item in zip(OUTPUTS, emulator.loo_error)))
+    changes = {}
+    for change in args.change or []:
+        name, factor = change.split('=')
+        changes[name] = float(factor)*emulator.params[name]
+    answer = emulator.what_if(**changes)
+    exact = emulator.evaluate((np.array([changes.get(name, emulator.params[name]) for name in emulator.names]) -
+                               emulator.lower)/(emulator.upper - emulator.lower))
+    for i, name in enumerate(OUTPUTS):
+        print('%-3s %12.5g +- %5.2f%%   (solver %12.5g)%s' % (name, answer.mean[0, i], 100*answer.error[0, i],
+                                                           exact[0, i], '  solved' if answer.solved[0] else ''))
+    X = emulator.lower + np.random.default_rng(args.seed).random((1000, emulator.d))*(emulator.upper - emulator.lower)
+    start = time.perf_counter()
+    prediction = emulator.predict(X, solve=False)
+    print('1000 queries in %.1f ms' % (1000*(time.perf_counter() - start)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train a Gaussian process emulator of the 2100 outcomes and query it.")
+    parser.add_argument("--names", nargs="+", default=['k1', 'k2', 'phi1', 'phi2', 'gamma1', 'gamma2'],
+                        help="Parameters of the emulator")
+    parser.add_argument("--scenario", default='S0000', help="Scenario of the other parameters")
+    parser.add_argument("--n", type=int, default=256, help="Training runs")
+    parser.add_argument("--T", type=float, default=168, help="Time of the outcomes")
+    parser.add_argument("--spread", type=float, default=0.25, help="Relative half-width of the parameter box")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Largest relative error answered by the emulator")
+    parser.add_argument("--change", nargs="+", help="Query: NAME=FACTOR multiplies a parameter of the scenario, e.g. k1=0.9")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the design")
+    args = parser.parse_args()
+    main(args)
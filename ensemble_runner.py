@@ -0,0 +1,236 @@
+# Parallel ensembles of the stochastic scenarios.
+#
+# Stochastic_model.py integrates 10 trajectories of each of its 12 scenarios in one process.
+# run_ensembles() spreads (scenario, replicate) jobs over a pool of worker processes. The
+# replicates are cut into batches, each integrated by EulerMaruyama as one (n_members, 6)
+# ensemble, and each worker writes its batch straight into the scenario's EnsembleStore (a
+# memory-mapped .npy file, see trajectory_store.py), so only batch indices travel back through
+# the pool.
+#
+# Scenarios that share their initial conditions and parameters before Stochastic_model.CUTOFF
+# (t=88, 2020) differ only in their projections; the 12 scenarios make 3 such histories of 4.
+# A batch integrates the history of its replicates once, then forks every projection of the
+# group from the state and noise streams at the cutoff, integrated together as one ensemble.
+# The Wiener increments of replicate r come from the counter-based stream
+# SDESolver.random_stream(seed, h, r) of its history h, which the projections continue, so the
+# scenarios of a group are compared under common random numbers, and a forked trajectory is
+# the same, bit for bit, as the full run of its scenario (branch=False, or replay()). Nothing
+# depends on the number of workers or on the batch size, and any one trajectory can be
+# regenerated on demand instead of being stored:
+#
+#   stores = run_ensembles('runs', n_replicates=100, workers=32)
+#   stores['S0100'].quantiles([0.05, 0.5, 0.95], time_index=-1, variable='B')
+#   u, t = replay('S0100', 42)   # replicate 42, as stored
+#
+# Progress is kept by the flags of the stores: with resume=True (--resume), a run that was
+# interrupted skips the batches already written and gives the same ensemble.
+#
+# A batch of the vectorised solver costs about as much as a single run up to a few hundred
+# members (the time goes into the Python loop over the steps, not the arithmetic), so the
+# default batches are as large as possible while still giving every worker a batch.
+
+import argparse
+import copy
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from SDESolver import EulerMaruyama, random_stream
+from Stochastic_model import VBC, SCENARIOS, CUTOFF, time_grid
+from trajectory_store import EnsembleStore
+
+# Members per batch above which larger batches stop paying off (the cost of a step grows
+# linearly) and only take more memory: 2*N*6 floats per member for the path and its noise
+MAX_BATCH = 256
+# Parameters in force before the cutoff: r1, r2 and the 24 without the suffix t
+N_HISTORY = VBC.PARAMETERS.index('mu1t')
+
+
+def history(name):
+    # The first scenario in SCENARIOS with the same initial conditions and parameters before
+    # the cutoff as scenario `name` (whichever scenarios are run, so the noise keys are fixed)
+    scenario = SCENARIOS[name]
+    for other in SCENARIOS.values():
+        if (list(other.U0) == list(scenario.U0) and
+                np.array_equal(other.params.values[:N_HISTORY], scenario.params.values[:N_HISTORY])):
+            return other.name
+
+
+def history_groups(names):
+    # [[names sharing a history]], in the order of names
+    groups = OrderedDict()
+    for name in names:
+        groups.setdefault(history(name), []).append(name)
+    return list(groups.values())
+
+
+def cutoff_index(time_points):
+    # First time point at or after the cutoff: the steps before it use the historical
+    # parameters only (the solvers take the parameters in force at the start of each step)
+    return min(int(np.searchsorted(time_points, CUTOFF)), len(time_points) - 1)
+
+
+def replicate_rng(seed, name, replicate):
+    # Stream of the noise of one replicate of scenario `name`, keyed by the position of its
+    # history in SCENARIOS
+    return random_stream(seed, list(SCENARIOS).index(history(name)), replicate)
+
+
+def scenario_solver(names, U0, sigma=0.1):
+    # Solver for the ensemble U0, whose members run the scenarios in names in turn (one
+    # scenario each, len(U0)/len(names) members per scenario)
+    params = np.repeat([SCENARIOS[name].params.values for name in names], len(U0)//len(names), axis=0)
+    model = VBC.from_array(params, sigma=sigma)
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(U0)
+    return solver
+
+
+def replay(name, replicate, seed=0, time_points=None, sigma=0.1):
+    # (u, t) of one replicate of a run_ensembles() ensemble, regenerated from its stream
+    time_points = time_grid() if time_points is None else time_points
+    solver = scenario_solver([name], [SCENARIOS[name].U0], sigma)
+    u, t = solver.solve(time_points, rng=[replicate_rng(seed, name, replicate)])
+    return u[:, 0], t
+
+
+def batch_size(n_replicates, n_groups, workers):
+    # Replicates per batch: split each group over the workers it gets
+    per_group = max(1, workers // n_groups)
+    return max(1, min(-(-n_replicates // per_group), MAX_BATCH))
+
+
+def batches(groups, n_replicates, size):
+    # (scenario names, first replicate, end) jobs
+    return [(names, start, min(start + size, n_replicates))
+            for names in groups for start in range(0, n_replicates, size)]
+
+
+# Stores opened by this process, reused over the batches it runs
+_stores = {}
+
+
+def open_store(path):
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = EnsembleStore.open(path, mode='r+')
+    return store
+
+
+def prepare_store(path, name, n_replicates, time_points, seed, sigma, dtype, resume):
+    # The store of scenario `name`: created, or the one of an interrupted run to resume
+    scenario = SCENARIOS[name]
+    attrs = {'scenario': name, 'seed': seed, 'sigma': sigma, 'solver': 'EulerMaruyama', 'history': history(name),
+             'noise': 'random_stream(seed, %d, replicate)' % list(SCENARIOS).index(history(name))}
+    if resume and os.path.exists(os.path.join(path, 'meta.json')):
+        store = EnsembleStore.open(path)
+        if (store.meta['attrs'] != attrs or store.n_members != n_replicates or
+                not np.array_equal(store.t, time_points) or store.u.dtype != np.dtype(dtype)):
+            raise ValueError("run_ensembles: %s holds a different ensemble" % path)
+        return store
+    return EnsembleStore.create(path, n_replicates, time_points, len(scenario.U0),
+                                params=np.tile(scenario.params.values, (n_replicates, 1)),
+                                parameter_names=VBC.PARAMETERS, dtype=dtype, attrs=attrs)
+
+
+def run_batch(paths, names, start, stop, seed, sigma):
+    # Integrate replicates start..stop-1 of the scenarios in names, which share their
+    # history, into the stores at paths
+    stores = [open_store(path) for path in paths]
+    t = stores[0].t
+    k = stop - start
+    rng = [replicate_rng(seed, names[0], r) for r in range(start, stop)]
+    # A lone scenario runs through in one go
+    cut = cutoff_index(t) if len(names) > 1 else len(t) - 1
+    solver = scenario_solver(names[:1], np.tile(SCENARIOS[names[0]].U0, (k, 1)), sigma)
+    u_history, t_history = solver.solve(t[:cut + 1], rng=rng)
+    if cut < len(t) - 1:
+        # Every projection starts from the state and the streams at the cutoff
+        solver = scenario_solver(names, np.tile(u_history[-1], (len(names), 1)), sigma)
+        u, t_projection = solver.solve(t[cut:], rng=[copy.deepcopy(g) for name in names for g in rng])
+        for i, store in enumerate(stores):
+            store.write_solution(start, np.concatenate([u_history[:-1], u[:, i*k:(i + 1)*k]]))
+    else:
+        # No projection on this grid (or a lone scenario)
+        for store in stores:
+            store.write_solution(start, u_history)
+    for store in stores:
+        store.flush()
+    return names, start, stop
+
+
+def run_ensembles(directory, scenarios=None, n_replicates=10, seed=0, workers=None, batch=None,
+                  time_points=None, sigma=0.1, dtype='float64', branch=True, resume=False, progress=None):
+    # Run n_replicates of each scenario (names in SCENARIOS, all by default) into one
+    # EnsembleStore per scenario under directory. workers: processes (os.cpu_count() by
+    # default; 1 runs in this process); batch: replicates per job (see batch_size);
+    # branch=False integrates every scenario over the whole time grid (same results, about
+    # twice the work); resume=True continues the ensemble found under directory (which must
+    # have been started with the same arguments) instead of starting over;
+    # progress(names, start, stop) is called as batches finish.
+    # Returns {name: EnsembleStore} opened read only
+    names = list(SCENARIOS) if scenarios is None else list(scenarios)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise ValueError("run_ensembles: unknown scenarios %s" % ', '.join(unknown))
+    time_points = time_grid() if time_points is None else np.asarray(time_points, float)
+    groups = history_groups(names) if branch else [[name] for name in names]
+    workers = workers or os.cpu_count() or 1
+    batch = batch or batch_size(n_replicates, len(groups), workers)
+    paths = OrderedDict()
+    stores = {}
+    for name in names:
+        paths[name] = os.path.join(directory, name)
+        stores[name] = prepare_store(paths[name], name, n_replicates, time_points, seed, sigma, dtype, resume)
+    jobs = [([paths[name] for name in group], group, start, stop, seed, sigma)
+            for group, start, stop in batches(groups, n_replicates, batch)
+            if not all(stores[name].done[start:stop].all() for name in group)]
+    stores.clear()
+    if workers == 1:
+        for job in jobs:
+            done = run_batch(*job)
+            if progress:
+                progress(*done)
+    elif jobs:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = [pool.submit(run_batch, *job) for job in jobs]
+            for future in as_completed(futures):
+                done = future.result()
+                if progress:
+                    progress(*done)
+    _stores.clear()
+    return OrderedDict((name, EnsembleStore.open(path)) for name, path in paths.items())
+
+
+def main(args):
+    start = time.perf_counter()
+    stores = run_ensembles(args.directory, args.scenarios, args.replicates, args.seed, args.workers,
+                           args.batch, time_grid(args.T, args.dt), args.sigma, args.dtype, not args.no_branch,
+                           args.resume)
+    elapsed = time.perf_counter() - start
+    n_runs = sum(store.n_members for store in stores.values())
+    print('%d runs of %d scenarios in %.1f s' % (n_runs, len(stores), elapsed))
+    for name, store in stores.items():
+        final = store.at_time(-1)
+        print('%s  B %.4g  C %.4g  (mean at t=%g)' % (name, final[:, 1].mean(), final[:, 2].mean(), store.t[-1]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run ensembles of the stochastic scenarios over a process pool.")
+    parser.add_argument("directory", help="Directory of the ensemble stores, one per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), help="Scenarios to run (default: all)")
+    parser.add_argument("--replicates", type=int, default=10, help="Trajectories per scenario")
+    parser.add_argument("--seed", type=int, default=0, help="Master seed of the noise")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument("--batch", type=int, help="Replicates per job (default: tuned to the workers)")
+    parser.add_argument("--T", type=float, default=168, help="Final time")
+    parser.add_argument("--dt", type=float, default=0.2, help="Time step")
+    parser.add_argument("--sigma", type=float, default=0.1, help="Noise intensity")
+    parser.add_argument("--dtype", default="float64", help="Storage type of the trajectories")
+    parser.add_argument("--no-branch", action="store_true",
+                        help="Integrate every scenario over the whole grid instead of forking at the cutoff")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run in directory instead of starting over")
+    args = parser.parse_args()
+    main(args)
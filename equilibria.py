@@ -0,0 +1,151 @@
+# Equilibria of the deterministic cross-border model (Model.VBC).
+#
+# The governing equations are homogeneous of degree one in the population of each country
+# (every non-linear term is c*X*Y/N), so the proportions x = (V1, B, C)/N1, (V2, D, E)/N2
+# evolve on their own:
+#     dx_i/dt = f_i(x) - x_i*S_c(x),   S_c = sum of f_j over the compartments of country c,
+# where f is the model evaluated at the proportions (N1 = N2 = 1) and S_c is the per capita
+# growth rate of country c. Steady states of the proportions are where populations settle
+# (up to the common exponential growth S_c of each country), so instead of integrating to
+# t=200 we solve the algebraic system in y = (B, C, D, E), with V1 = 1-B-C, V2 = 1-D-E, by
+# Newton's method from several starting points.
+
+from collections import namedtuple
+import numpy as np
+from Model import VBC
+
+# proportions: (V1, B, C, V2, D, E) within each country; eigenvalues: of the Jacobian of the
+# proportion dynamics in y (stable if all real parts are negative, a zero eigenvalue marks a
+# continuum of equilibria as in the fully symmetric model); growth: (S1, S2)
+Equilibrium = namedtuple('Equilibrium', 'proportions eigenvalues stable growth')
+
+# Index of B, C, D, E in the state, and dx/dy
+FREE = [1, 2, 4, 5]
+DXDY = np.array([[-1, -1, 0, 0],
+                 [1, 0, 0, 0],
+                 [0, 1, 0, 0],
+                 [0, 0, -1, -1],
+                 [0, 0, 1, 0],
+                 [0, 0, 0, 1]], float)
+COUNTRY = [0, 0, 0, 1, 1, 1]
+
+
+def proportions(y):
+    # Full proportion state (6, ...) from y = (B, C, D, E) of shape (4, ...)
+    y = np.asarray(y, float)
+    return np.array([1 - y[0] - y[1], y[0], y[1], 1 - y[2] - y[3], y[2], y[3]])
+
+
+def growth_rates(model, x):
+    f = np.asarray(model(x, 0.0), float)
+    return np.array([f[0] + f[1] + f[2], f[3] + f[4] + f[5]])
+
+
+def residual(model, y):
+    # Right-hand side of the proportion dynamics for B, C, D, E
+    x = proportions(y)
+    f = np.asarray(model(x, 0.0), float)
+    S = np.array([f[0] + f[1] + f[2], f[3] + f[4] + f[5]])
+    return f[FREE] - x[FREE]*S[[COUNTRY[i] for i in FREE]]
+
+
+def residual_jacobian(model, y):
+    # d(residual)/dy, shape (4, 4, ...)
+    x = proportions(y)
+    f = np.asarray(model(x, 0.0), float)
+    J = model.jac(x, 0.0)
+    S = np.array([f[0] + f[1] + f[2], f[3] + f[4] + f[5]])
+    dS = np.array([J[0] + J[1] + J[2], J[3] + J[4] + J[5]])
+    dG = np.empty((4, 6) + J.shape[2:])
+    for row, i in enumerate(FREE):
+        c = COUNTRY[i]
+        dG[row] = J[i] - x[i]*dS[c]
+        dG[row, i] -= S[c]
+    return np.einsum('ik...,kj->ij...', dG, DXDY)
+
+
+def solve_linear(A, b):
+    # Batched solve of A x = b with A of shape (n, n, m) and b of shape (n, m)
+    A = np.moveaxis(A, -1, 0)
+    b = np.moveaxis(b, -1, 0)[..., None]
+    try:
+        x = np.linalg.solve(A, b)
+    except np.linalg.LinAlgError:
+        x = np.linalg.pinv(A) @ b
+    return np.moveaxis(x[..., 0], 0, -1)
+
+
+def newton(model, y0, tol=1e-12, maxiter=50, max_step=0.25):
+    # Damped Newton iteration on every column of y0 (4, m) at once; the model parameters
+    # broadcast against the columns. Returns the iterates and a mask of converged columns
+    y = np.array(y0, float)
+    converged = np.zeros(y.shape[1:], bool)
+    for i in range(maxiter):
+        R = residual(model, y)
+        converged = np.max(np.abs(R), axis=0) < tol
+        if np.all(converged):
+            break
+        step = solve_linear(residual_jacobian(model, y), -R)
+        step[~np.isfinite(step)] = 0.0
+        # Limit the step so that iterates do not jump far out of the simplex
+        size = np.max(np.abs(step), axis=0)
+        step *= np.minimum(1.0, max_step/np.maximum(size, 1e-300))
+        y = y + np.where(converged, 0.0, step)
+    return y, converged
+
+
+def starting_points(n_starts, rng=None):
+    # Corners, centre and random points of the two simplices (4, n_starts)
+    rng = np.random.default_rng(rng)
+    fixed = [[0.001, 0.001], [0.998, 0.001], [0.001, 0.998], [1/3, 1/3]]
+    points = [a + b for a in fixed for b in fixed][:n_starts]
+    if len(points) < n_starts:
+        draws = rng.dirichlet(np.ones(3), size=(n_starts - len(points), 2))[..., 1:]
+        points += [list(d.ravel()) for d in draws]
+    return np.array(points).T
+
+
+def classify(model, y, tol=1e-10):
+    x = proportions(y)
+    eigenvalues = np.linalg.eigvals(residual_jacobian(model, y))
+    return Equilibrium(x, eigenvalues, bool(np.all(eigenvalues.real < -tol)), growth_rates(model, x))
+
+
+def unique_roots(y, converged, tol=1e-7, domain_tol=1e-9):
+    # Distinct converged roots (columns of y) that lie in the simplices
+    x = proportions(y)
+    inside = converged & np.all(x > -domain_tol, axis=0)
+    roots = []
+    for j in np.flatnonzero(inside):
+        if all(np.max(np.abs(y[:, j] - r)) > tol for r in roots):
+            roots.append(y[:, j])
+    return roots
+
+
+def find_equilibria(model, n_starts=32, rng=0, tol=1e-12):
+    # All equilibria of the proportions reached from n_starts starting points, sorted with
+    # stable ones first
+    y, converged = newton(model, starting_points(n_starts, rng), tol)
+    roots = unique_roots(y, converged)
+    equilibria = [classify(model, r) for r in roots]
+    return sorted(equilibria, key=lambda e: (not e.stable, tuple(e.proportions)))
+
+
+def find_equilibria_batch(params, n_starts=16, rng=0, tol=1e-12):
+    # Equilibria for every row of an (n_sets, 24) parameter array (VBC.PARAMETERS order):
+    # all sets and starting points run through one vectorized Newton iteration.
+    # Returns one list of equilibria per parameter set
+    params = np.atleast_2d(np.asarray(params, float))
+    n_sets = len(params)
+    model = VBC.from_array(np.repeat(params, n_starts, axis=0))
+    y0 = np.tile(starting_points(n_starts, rng), n_sets)
+    y, converged = newton(model, y0, tol)
+    y = y.reshape(4, n_sets, n_starts)
+    converged = converged.reshape(n_sets, n_starts)
+    results = []
+    for s in range(n_sets):
+        single = VBC.from_array(params[s])
+        roots = unique_roots(y[:, s], converged[s])
+        equilibria = [classify(single, r) for r in roots]
+        results.append(sorted(equilibria, key=lambda e: (not e.stable, tuple(e.proportions))))
+    return results
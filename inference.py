@@ -0,0 +1,214 @@
+# Sequential Monte Carlo inference of the stochastic model from the elections of Voting_data.csv.
+#
+# calibration.py fits the mean dynamics by least squares. Here the noise of the stochastic
+# model is taken into account, with two samplers that advance all their particles as one
+# EulerMaruyama ensemble (n_members, 6), so a generation costs about one batched solve:
+#
+# - particle_filter(X) runs a bootstrap particle filter for each parameter set in X: the
+#   particles are propagated by the SDE from one election to the next, weighted by the
+#   likelihood of the election (relative errors, Gaussian with standard deviation `error`)
+#   and resampled (systematic resampling). It returns the log-likelihood of the data under
+#   each parameter set and the filtered states at every election.
+# - abc_smc() samples the posterior of the chosen parameters without a likelihood (ABC-SMC,
+#   Beaumont et al. 2009): particles are accepted when a simulated trajectory comes within a
+#   tolerance of the data (root mean square relative error), the tolerance shrinks from
+#   generation to generation to a quantile of the last distances, and new candidates are
+#   drawn from the weighted last generation with a Gaussian kernel of twice its covariance.
+#
+#   smc = SequentialMonteCarlo(['k1', 'k2', 'phi1', 'phi2'])
+#   posterior = smc.abc_smc(n=1000)
+#   filtered = smc.particle_filter(posterior.x[:8])
+#
+# The unknowns, bounds (the uniform prior of abc_smc) and data are those of calibration.py.
+
+import argparse
+from collections import namedtuple
+import numpy as np
+from SDESolver import EulerMaruyama
+from Stochastic_model import VBC
+from calibration import Calibration, VARIABLES
+
+# Log-likelihood of the data under each parameter set, effective sample size of the weights
+# (n_sets, n_elections) and filtered (resampled) states (n_elections, n_sets, n_particles, 6)
+Filter = namedtuple('Filter', 'log_likelihood ess states')
+# names, samples x (n, p) and their normalised weights, distances, tolerance of every
+# generation, acceptance rate of every generation, number of simulations
+Posterior = namedtuple('Posterior', 'names x weights distances epsilons acceptance nsim')
+
+
+def systematic_resample(weights, rng):
+    # Indices (m, n) of systematic resampling of each row of the normalised weights (m, n).
+    # The rows are shifted by their index so that one searchsorted serves them all
+    m, n = weights.shape
+    offset = np.arange(m)[:, None]
+    cumulative = np.cumsum(weights, axis=1)
+    cumulative[:, -1] = 1
+    positions = (rng.random((m, 1)) + np.arange(n))/n
+    index = np.searchsorted((cumulative + offset).ravel(), (positions + offset).ravel(), side='right')
+    return np.minimum(index.reshape(m, n) - offset*n, n - 1)
+
+
+class SequentialMonteCarlo(Calibration):
+    def __init__(self, names, bounds=None, params=None, U0=None, data=None, dt=0.2, sigma=0.1, error=0.1):
+        # As Calibration; dt: Euler-Maruyama step; sigma: noise intensity of the model
+        # (VBC.sigma); error: relative standard deviation of the data in the likelihood
+        Calibration.__init__(self, names, bounds, params, U0, data, dt)
+        self.sigma = sigma
+        self.error = error
+
+    def solver(self, X, n_particles=1):
+        # Euler-Maruyama solver of n_particles members for each parameter set in X, with their
+        # initial conditions
+        params, U0 = self.unpack(X)
+        model = VBC.from_array(np.repeat(params, n_particles, axis=0), sigma=self.sigma)
+        solver = EulerMaruyama(model.drift, model.diffusion)
+        solver.set_initial_condition(np.repeat(U0, n_particles, axis=0))
+        return solver
+
+    def sample(self, X, rng=None):
+        # (m, n_elections, 3) voting populations, in millions, of one stochastic trajectory of
+        # each candidate in X
+        solver = self.solver(np.atleast_2d(X))
+        with np.errstate(all='ignore'):
+            u, t = solver.solve(self.time_points, rng=rng, save_at=self.t)
+        self.nfev += solver.n_members
+        return np.moveaxis(u[..., list(VARIABLES)], 1, 0)/1e6
+
+    def distances(self, X, rng=None):
+        # Root mean square relative error of a trajectory of each candidate; inf if it broke down
+        r = (self.sample(X, rng) - self.y)/self.y
+        d = np.sqrt(np.mean(r.reshape(len(r), -1)**2, axis=1))
+        d[~np.isfinite(d)] = np.inf
+        return d
+
+    # Particle filter
+
+    def particle_filter(self, X, n_particles=1000, rng=None):
+        # Bootstrap particle filter of every parameter set in X (m, p) at once, see Filter
+        X = np.atleast_2d(np.asarray(X, float))
+        m, n = len(X), n_particles
+        rng = np.random.default_rng(rng)
+        solver = self.solver(X, n)
+        u = solver.U0
+        # Normalisation of the Gaussian density of each election
+        constants = np.sum(np.log(np.sqrt(2*np.pi)*self.error*self.y), axis=1)
+        log_likelihood = np.zeros(m)
+        ess = np.zeros((m, len(self.t)))
+        states = np.zeros((len(self.t), m, n, u.shape[-1]))
+        t0 = self.time_points[0]
+        for k, t in enumerate(self.t):
+            if t > t0:
+                solver.set_initial_condition(u)
+                grid = self.time_points[(self.time_points >= t0) & (self.time_points <= t)]
+                with np.errstate(all='ignore'):
+                    path, grid = solver.solve(grid, rng=rng)
+                self.nfev += m*n
+                u, t0 = path[-1], t
+            r = (u[:, list(VARIABLES)]/1e6 - self.y[k])/(self.error*self.y[k])
+            log_w = -0.5*np.sum(r**2, axis=1).reshape(m, n)
+            log_w[~np.isfinite(log_w)] = -np.inf
+            top = np.max(log_w, axis=1)
+            alive = np.isfinite(top)
+            w = np.ones((m, n))/n
+            w[alive] = np.exp(log_w[alive] - top[alive, None])
+            total = w.sum(axis=1)
+            log_likelihood += np.where(alive, top + np.log(total/n), -np.inf) - constants[k]
+            w /= total[:, None]
+            ess[:, k] = 1/np.sum(w**2, axis=1)
+            index = systematic_resample(w, rng)
+            u = u.reshape(m, n, -1)[np.arange(m)[:, None], index]
+            states[k] = u
+            u = u.reshape(m*n, -1)
+        return Filter(log_likelihood, ess, states)
+
+    # ABC-SMC
+
+    def propose(self, Z, weights, covariance, size, rng):
+        # size candidates in z drawn from the weighted particles Z with the Gaussian kernel,
+        # within the support [0, 1] of the prior
+        accepted = np.empty((0, Z.shape[1]))
+        while len(accepted) < size:
+            ancestors = rng.choice(len(Z), size=size, p=weights)
+            candidates = Z[ancestors] + rng.multivariate_normal(np.zeros(Z.shape[1]), covariance, size=size)
+            accepted = np.concatenate([accepted, candidates[np.all((candidates >= 0) & (candidates <= 1), axis=1)]])
+        return accepted[:size]
+
+    def kernel_weights(self, Z, Z_old, weights_old, covariance):
+        # Importance weights, normalised, of the new particles Z under a uniform prior:
+        # 1/sum_j w_j K(Z | Z_old_j)
+        precision = np.linalg.inv(covariance)
+        diff = Z[:, None] - Z_old[None]
+        density = np.exp(-0.5*np.einsum('ijp,pq,ijq->ij', diff, precision, diff))
+        w = 1/(density @ weights_old)
+        return w/w.sum()
+
+    def abc_smc(self, n=1000, generations=10, quantile=0.5, batch=None, rng=None, min_acceptance=0.01):
+        # ABC-SMC posterior of the unknowns, see Posterior. n: particles per generation;
+        # quantile: of the last distances, the next tolerance; batch: candidates simulated
+        # together (n by default); stops after `generations` or when fewer than min_acceptance
+        # of the candidates are accepted
+        rng = np.random.default_rng(rng)
+        batch = batch or n
+        self.nfev = 0
+        # Generation 0: the prior
+        Z = self.population(n, rng)
+        d = self.distances(self.to_x(Z), rng)
+        weights = np.ones(n)/n
+        epsilons, acceptance = [np.inf], [1.0]
+        for generation in range(1, generations):
+            epsilon = np.quantile(d[np.isfinite(d)], quantile)
+            covariance = 2*np.atleast_2d(np.cov(Z, rowvar=False, aweights=weights))
+            covariance += 1e-12*np.eye(Z.shape[1])
+            new_Z, new_d, tried = [], [], 0
+            while sum(len(z) for z in new_Z) < n:
+                candidates = self.propose(Z, weights, covariance, batch, rng)
+                distances = self.distances(self.to_x(candidates), rng)
+                tried += batch
+                keep = distances <= epsilon
+                new_Z.append(candidates[keep])
+                new_d.append(distances[keep])
+                if tried >= n/min_acceptance:
+                    break
+            rate = sum(len(z) for z in new_Z)/tried
+            if rate < min_acceptance:
+                break
+            new_Z, new_d = np.concatenate(new_Z)[:n], np.concatenate(new_d)[:n]
+            weights = self.kernel_weights(new_Z, Z, weights, covariance)
+            Z, d = new_Z, new_d
+            epsilons.append(epsilon)
+            acceptance.append(rate)
+        return Posterior(self.names, self.to_x(Z), weights, d, np.array(epsilons), np.array(acceptance), self.nfev)
+
+
+def main(args):
+    import time
+    smc = SequentialMonteCarlo(args.fit, dt=args.dt, sigma=args.sigma, error=args.error)
+    start = time.perf_counter()
+    posterior = smc.abc_smc(args.particles, args.generations, rng=args.seed)
+    elapsed = time.perf_counter() - start
+    print('ABC-SMC of %d unknowns: %d generations, %d simulations in %.1f s'
+          % (len(posterior.names), len(posterior.epsilons), posterior.nsim, elapsed))
+    print('Tolerances:', ' '.join('%.4g' % e for e in posterior.epsilons[1:]))
+    mean = posterior.weights @ posterior.x
+    std = np.sqrt(posterior.weights @ (posterior.x - mean)**2)
+    for name, m, s in zip(posterior.names, mean, std):
+        print('%-8s %12.6g +- %-12.4g' % (name, m, s))
+    start = time.perf_counter()
+    filtered = smc.particle_filter(mean, args.filter_particles, rng=args.seed)
+    print('Particle filter at the posterior mean: log-likelihood %.2f, minimum ESS %.0f of %d (%.1f s)'
+          % (filtered.log_likelihood[0], filtered.ess.min(), args.filter_particles, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ABC-SMC and particle filtering of the stochastic model against Voting_data.csv.")
+    parser.add_argument("--fit", nargs="+", default=['k1', 'k2', 'phi1', 'phi2'],
+                        help="Parameters and initial conditions (V10, B0, C0, V20, D0, E0) to infer")
+    parser.add_argument("--particles", type=int, default=1000, help="ABC-SMC particles per generation")
+    parser.add_argument("--generations", type=int, default=10, help="ABC-SMC generations")
+    parser.add_argument("--filter-particles", type=int, default=1000, help="Particles of the particle filter")
+    parser.add_argument("--sigma", type=float, default=0.1, help="Noise intensity of the model")
+    parser.add_argument("--error", type=float, default=0.1, help="Relative error of the data in the likelihood")
+    parser.add_argument("--seed", type=int, default=0, help="Seed")
+    parser.add_argument("--dt", type=float, default=0.2, help="Euler-Maruyama step in years")
+    args = parser.parse_args()
+    main(args)
@@ -0,0 +1,143 @@
+# Parameter records for the VBC models.
+#
+# A ParameterSet is an immutable, named view over one contiguous float64 array: values are
+# read as attributes (params.k1) or by name (params['k1']), and since a set is a read-only
+# mapping from names to values, VBC(**params) builds the model. Sets stack into
+# (n_sets, n_params) arrays for the batched solvers (VBC.from_array), hash and compare by
+# value, and round-trip through the command line flags of run_model.py.
+
+import hashlib
+import numpy as np
+from Model import VBC
+
+
+class ParameterSet:
+    # Subclasses set NAMES (the order of the values) and optionally DEFAULTS
+    __slots__ = ('values',)
+    NAMES = ()
+    INDEX = {}
+    DEFAULTS = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.INDEX = {name: i for i, name in enumerate(cls.NAMES)}
+
+    def __init__(self, values=None, **kwargs):
+        # From an array of values in NAMES order, or from keyword arguments (missing ones
+        # are taken from DEFAULTS)
+        name = type(self).__name__
+        if values is None:
+            unknown = set(kwargs) - set(self.NAMES)
+            if unknown:
+                raise TypeError("%s: unknown parameters %s" % (name, ', '.join(sorted(unknown))))
+            defaults = self.DEFAULTS or {}
+            missing = [n for n in self.NAMES if n not in kwargs and n not in defaults]
+            if missing:
+                raise TypeError("%s: missing parameters %s" % (name, ', '.join(missing)))
+            values = [kwargs[n] if n in kwargs else defaults[n] for n in self.NAMES]
+        elif kwargs:
+            raise TypeError("%s: give either values or keyword arguments" % name)
+        values = np.array(values, float)
+        if values.shape != (len(self.NAMES),):
+            raise ValueError("%s: expected %d values, got shape %s" % (name, len(self.NAMES), values.shape))
+        values.flags.writeable = False
+        object.__setattr__(self, 'values', values)
+
+    @classmethod
+    def from_model(cls, model):
+        # Record of the parameters of a model built from scalar values
+        return cls([getattr(model, name) for name in cls.NAMES])
+
+    @classmethod
+    def stack(cls, sets):
+        # (n_sets, n_params) array, e.g. for VBC.from_array
+        return np.stack([s.values for s in sets])
+
+    @classmethod
+    def unstack(cls, array):
+        return [cls(row) for row in np.atleast_2d(array)]
+
+    def replace(self, **changes):
+        values = self.values.copy()
+        for name, value in changes.items():
+            values[self.INDEX[name]] = value
+        return type(self)(values)
+
+    # Read-only mapping from names to values
+
+    def __getattr__(self, name):
+        try:
+            return float(self.values[self.INDEX[name]])
+        except KeyError:
+            raise AttributeError("%s has no parameter %r" % (type(self).__name__, name)) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%s is immutable, use replace()" % type(self).__name__)
+
+    def __getitem__(self, name):
+        return float(self.values[self.INDEX[name]])
+
+    def keys(self):
+        return self.NAMES
+
+    def items(self):
+        return zip(self.NAMES, self.values.tolist())
+
+    def __iter__(self):
+        return iter(self.NAMES)
+
+    def __len__(self):
+        return len(self.NAMES)
+
+    def __contains__(self, name):
+        return name in self.INDEX
+
+    def __eq__(self, other):
+        return type(self) is type(other) and np.array_equal(self.values, other.values)
+
+    def __reduce__(self):
+        return type(self), (self.values.copy(),)
+
+    def __hash__(self):
+        return hash((type(self).__name__, self.values.tobytes()))
+
+    def digest(self):
+        # Stable across processes and sessions, unlike hash()
+        return hashlib.sha256(type(self).__name__.encode() + self.values.tobytes()).hexdigest()
+
+    def __repr__(self):
+        return '%s(%s)' % (type(self).__name__, ', '.join('%s=%r' % item for item in self.items()))
+
+    # Command line
+
+    @classmethod
+    def add_arguments(cls, parser):
+        for name in cls.NAMES:
+            default = (cls.DEFAULTS or {}).get(name)
+            parser.add_argument('--' + name, type=float, default=default, required=default is None,
+                                help='%s parameter' % name)
+
+    @classmethod
+    def from_namespace(cls, args):
+        # From parsed arguments (argparse.Namespace) holding one attribute per name
+        return cls([getattr(args, name) for name in cls.NAMES])
+
+    def to_argv(self):
+        # Flags that parse back to exactly these values
+        return ['--%s=%r' % item for item in self.items()]
+
+
+class ModelParameters(ParameterSet):
+    # Model.VBC; the defaults are those of run_model.py (Model.py's first simulation)
+    __slots__ = ()
+    NAMES = VBC.PARAMETERS
+    DEFAULTS = dict([(name, 0.016) for name in NAMES[:8]] + [(name, 0.5) for name in NAMES[8:12]] +
+                    [(name, 0.1) for name in NAMES[12:16]] + [(name, 0.01) for name in NAMES[16:20]] +
+                    [(name, 0.02) for name in NAMES[20:24]])
+
+
+class StochasticParameters(ParameterSet):
+    # Stochastic_model.VBC: the rates r1, r2, the parameters up to t=88 and those of the
+    # projections afterwards (suffix t)
+    __slots__ = ()
+    NAMES = ('r1', 'r2') + VBC.PARAMETERS + tuple(name + 't' for name in VBC.PARAMETERS)
@@ -0,0 +1,77 @@
+# Forward sensitivities of the VBC models with respect to their parameters.
+#
+# The derivatives of the solution u(t) with respect to parameters theta, S = du/dtheta (6, p),
+# obey the sensitivity equations
+#
+#   dS/dt = J(u, t) S + F(u, t),    S(0) = 0 (the identity columns for initial conditions)
+#
+# where J = df/du is the Jacobian of the model (VBC.jac) and F = df/dtheta its Jacobian with
+# respect to the parameters (VBC.param_jac). Sensitivities(model, names) is the right-hand side
+# of the state and the sensitivities to `names` together, a system of 6 + 6p equations that
+# any solver of ODESolver.py integrates like the model itself, ensembles included. An explicit
+# Runge-Kutta method applied to this system differentiates its own discrete solution, so with
+# RungeKutta4 the sensitivities are the exact derivatives of the RK4 solution, not finite
+# difference estimates, for the cost of one solve of the larger system instead of p + 1 solves:
+#
+#   sensitivities = Sensitivities(model, ['k1', 'phi2', 'B0'])
+#   u, S, t = sensitivities.solve(U0, time_points)   # S[n, ..., i, j] = du_i(t_n)/d names[j]
+#
+# Model.VBC has 24 parameters and the drift of Stochastic_model.VBC 50 (the 24 before and the
+# 24 after the cutoff, and r1, r2, which the drift does not use); the initial conditions are
+# named as in INITIAL_CONDITIONS.
+
+import numpy as np
+from ODESolver import RungeKutta4
+
+# Names of the initial conditions, in the order of the state
+INITIAL_CONDITIONS = ('V10', 'B0', 'C0', 'V20', 'D0', 'E0')
+
+
+class Sensitivities:
+    def __init__(self, model, names=None):
+        # model: Model.VBC, or Stochastic_model.VBC (its drift); names: parameters and initial
+        # conditions to differentiate by (all the parameters by default)
+        self.model = model
+        self.rhs = model.drift if hasattr(model, 'drift') else model
+        self.names = list(model.PARAMETERS if names is None else names)
+        self.p = len(self.names)
+        self.parameters, self.columns, self.initial = [], [], []
+        for j, name in enumerate(self.names):
+            if name in INITIAL_CONDITIONS:
+                self.initial.append((INITIAL_CONDITIONS.index(name), j))
+            elif name in model.PARAMETERS:
+                self.parameters.append(model.PARAMETERS.index(name))
+                self.columns.append(j)
+            else:
+                raise ValueError("Sensitivities: unknown parameter %s" % name)
+
+    def initial_condition(self, U0):
+        # State and sensitivities at t0, (..., 6 + 6p) in the layout of the solvers
+        U0 = np.asarray(U0, float)
+        S0 = np.zeros(U0.shape + (self.p,))
+        for i, j in self.initial:
+            S0[..., i, j] = 1
+        return np.concatenate([U0, S0.reshape(U0.shape[:-1] + (-1,))], axis=-1)
+
+    def __call__(self, y, t):
+        # Equations along the first axis, as for the model
+        u = y[:6]
+        S = y[6:].reshape((6, self.p) + y.shape[1:])
+        du = np.asarray(self.rhs(u, t), float)
+        dS = np.einsum('ij...,jk...->ik...', self.model.jac(u, t), S)
+        if self.parameters:
+            dS[:, self.columns] += self.model.param_jac(u, t)[:, self.parameters]
+        return np.concatenate([du, dS.reshape((-1,) + y.shape[1:])])
+
+    def split(self, u):
+        # States (..., 6) and sensitivities (..., 6, p) of a solution of this system
+        u = np.asarray(u)
+        return u[..., :6], u[..., 6:].reshape(u.shape[:-1] + (6, self.p))
+
+    def solve(self, U0, time_points, solver=RungeKutta4, save_at=None):
+        # (u, S, t): the solution from U0 (6,) or (n_members, 6) and its sensitivities
+        solver = solver(self)
+        solver.set_initial_condition(self.initial_condition(U0))
+        u, t = solver.solve(time_points) if save_at is None else solver.solve(time_points, save_at=save_at)
+        u, S = self.split(u)
+        return u, S, t
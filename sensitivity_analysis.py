@@ -0,0 +1,269 @@
+# Global sensitivity analysis of the 2100 outcomes of the scenarios.
+#
+# Which parameters drive the voting populations at the end of the projections (t = 168, 2100)?
+# GlobalSensitivity(names) varies the chosen parameters of a scenario over boxes (the bounds of
+# calibration.default_bounds by default) and integrates the mean dynamics, VBC.drift, with
+# RungeKutta4. A name without the suffix t varies the parameter before and after the cutoff
+# together (k1 sets k1 and k1t); k1t varies the projection only. Two analyses are provided:
+#
+# - sobol(N): first-order and total Sobol indices of every output from a Saltelli design of
+#   N*(d+2) runs (matrices A, B and the d matrices A with column i from B), with the
+#   estimators of Saltelli (first order) and Jansen (total), and bootstrap confidence intervals.
+# - morris(r): Morris screening with r one-at-a-time trajectories of d+1 runs: the mean, mean
+#   absolute value and standard deviation of the elementary effects.
+#
+# Both designs are built from the scrambled Halton sequence, whose points are computed from
+# their index, so the runs are generated and evaluated chunk by chunk (one RungeKutta4
+# ensemble of up to `chunk` members each, keeping only the final state) and nothing but the
+# outputs, N*(d+2)*6 numbers, is held in memory. Designs of 10^5-10^6 runs take minutes;
+# workers > 1 spreads the chunks over a process pool.
+#
+#   analysis = GlobalSensitivity(['k1', 'k2', 'p1', 'p2', 'gamma1', 'gamma2', 'phi1', 'phi2'])
+#   sobol = analysis.sobol(4096)
+#   sobol.ST[:, OUTPUTS.index('B')]   # total indices of B in 2100
+
+import argparse
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from ODESolver import RungeKutta4
+from Stochastic_model import VBC, SCENARIOS
+from calibration import default_bounds
+
+# Outputs: the state at the final time, in millions
+OUTPUTS = ('V1', 'B', 'C', 'V2', 'D', 'E')
+
+# Indices (d, q) and their confidence intervals (2, d, q), variance of each output and the
+# number of base points
+Sobol = namedtuple('Sobol', 'names S1 ST S1_conf ST_conf variance N')
+# Statistics (d, q) of the elementary effects, and the number of trajectories
+Morris = namedtuple('Morris', 'names mu mu_star sigma r')
+
+
+def primes(n):
+    # The first n primes
+    found = []
+    candidate = 2
+    while len(found) < n:
+        if all(candidate % p for p in found if p*p <= candidate):
+            found.append(candidate)
+        candidate += 1
+    return np.array(found)
+
+
+def scrambling(d, rng):
+    # Random digit permutations (53 digits, d, largest base) for halton(): one permutation of
+    # the digits of its base per dimension and digit
+    bases = primes(d)
+    permutations = np.zeros((53, d, bases[-1]), dtype=int)
+    for digit in range(53):
+        for j, base in enumerate(bases):
+            permutations[digit, j, :base] = rng.permutation(base)
+    return permutations
+
+
+def halton(start, stop, d, permutations=None):
+    # Points start..stop-1 (n, d) of the d-dimensional Halton sequence (the radical inverse of
+    # the index in the first d primes), skipping the point 0. The plain sequence has strongly
+    # correlated projections in the higher dimensions; with permutations (see scrambling)
+    # the digits are scrambled, which randomises the design and removes them
+    index = np.arange(start + 1, stop + 1)[:, None]
+    bases = primes(d)[None]
+    points = np.zeros((len(index), d))
+    factor = 1.0/bases
+    if permutations is None:
+        while np.any(index > 0):
+            points += factor*(index % bases)
+            index = index // bases
+            factor = factor/bases
+        return points
+    columns = np.arange(d)
+    for digits in permutations:
+        # Also the leading zeros, which the permutations turn into digits
+        points += factor*digits[columns, index % bases]
+        index = index // bases
+        factor = factor/bases
+    return points
+
+
+class GlobalSensitivity:
+    def __init__(self, names=None, bounds=None, scenario='S0000', T=168, dt=1.0, chunk=4096):
+        # names: parameters to vary (the 24 rates of the model by default); bounds: {name:
+        # (lower, upper)}; scenario: name in SCENARIOS of the other parameters and the initial
+        # condition; T: time of the outcomes; dt: RK4 step; chunk: runs per ensemble
+        scenario = SCENARIOS[scenario]
+        self.params = scenario.params
+        self.U0 = np.asarray(scenario.U0, float)
+        self.names = list(VBC.PARAMETERS[2:26] if names is None else names)
+        self.d = len(self.names)
+        self.columns = []
+        for name in self.names:
+            if name not in self.params:
+                raise ValueError("GlobalSensitivity: unknown parameter %s" % name)
+            linked = name + 't'
+            self.columns.append([self.params.INDEX[name]] +
+                                ([self.params.INDEX[linked]] if linked in self.params and name not in ('r1', 'r2') else []))
+        bounds = bounds or {}
+        self.lower, self.upper = np.array([bounds[name] if name in bounds else default_bounds(name, self.params[name])
+                                           for name in self.names], float).T
+        self.time_points = np.linspace(0, T, int(np.ceil(T/dt)) + 1)
+        self.chunk = chunk
+
+    def evaluate(self, Z):
+        # (m, 6) outputs of the points Z (m, d) in the unit cube, as RungeKutta4 ensembles of
+        # at most `chunk` members
+        Z = np.atleast_2d(Z)
+        Y = np.empty((len(Z), len(OUTPUTS)))
+        X = self.lower + Z*(self.upper - self.lower)
+        for start in range(0, len(Z), self.chunk):
+            x = X[start:start + self.chunk]
+            params = np.tile(self.params.values, (len(x), 1))
+            for j, columns in enumerate(self.columns):
+                params[:, columns] = x[:, j:j + 1]
+            solver = RungeKutta4(VBC.from_array(params).drift)
+            solver.set_initial_condition(np.tile(self.U0, (len(x), 1)))
+            with np.errstate(all='ignore'):
+                u, t = solver.solve(self.time_points, save_at=self.time_points[-1:])
+            Y[start:start + len(x)] = u[-1]/1e6
+        return Y
+
+    def map(self, function, ranges, workers):
+        # [function(start, stop)] over the ranges, in this process or over a pool
+        if workers == 1 or len(ranges) == 1:
+            return [function(start, stop) for start, stop in ranges]
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+            return list(pool.map(function, *zip(*ranges)))
+
+    # Sobol indices
+
+    def saltelli_block(self, start, stop, permutations):
+        # Outputs of base points start..stop-1 of the Saltelli design: A, B (n, 6) and the
+        # matrices A_B^i (d, n, 6)
+        points = halton(start, stop, 2*self.d, permutations)
+        A, B = points[:, :self.d], points[:, self.d:]
+        AB = np.repeat(A[None], self.d, axis=0)
+        for i in range(self.d):
+            AB[i, :, i] = B[:, i]
+        Y = self.evaluate(np.concatenate([A, B, AB.reshape(-1, self.d)]))
+        n = stop - start
+        return Y[:n], Y[n:2*n], Y[2*n:].reshape(self.d, n, -1)
+
+    def sobol(self, N=4096, n_bootstrap=100, confidence=0.95, rng=None, workers=1):
+        # First-order and total Sobol indices from N*(d+2) runs, see Sobol. Base points are
+        # evaluated in blocks of about `chunk` runs; workers > 1 evaluates the blocks over a
+        # process pool
+        rng = np.random.default_rng(rng)
+        permutations = scrambling(2*self.d, rng)
+        size = max(1, self.chunk//(self.d + 2))
+        ranges = [(first, min(first + size, N)) for first in range(0, N, size)]
+        blocks = self.map(_SaltelliBlock(self, permutations), ranges, workers or os.cpu_count() or 1)
+        YA = np.concatenate([block[0] for block in blocks])
+        YB = np.concatenate([block[1] for block in blocks])
+        YAB = np.concatenate([block[2] for block in blocks], axis=1)
+        S1, ST, variance = sobol_indices(YA, YB, YAB)
+        # Bootstrap over the base points
+        S1_boot = np.empty((n_bootstrap,) + S1.shape)
+        ST_boot = np.empty((n_bootstrap,) + ST.shape)
+        for b in range(n_bootstrap):
+            index = rng.integers(0, N, N)
+            S1_boot[b], ST_boot[b], v = sobol_indices(YA[index], YB[index], YAB[:, index])
+        q = [(1 - confidence)/2, (1 + confidence)/2]
+        return Sobol(self.names, S1, ST, np.quantile(S1_boot, q, axis=0), np.quantile(ST_boot, q, axis=0),
+                     variance, N)
+
+    # Morris screening
+
+    def morris(self, r=100, levels=4, rng=None, workers=1):
+        # Elementary effects of r trajectories on a grid of `levels` levels, see Morris
+        rng = np.random.default_rng(rng)
+        d = self.d
+        delta = levels/(2.0*(levels - 1))
+        # Starting points from the Halton sequence, on the levels from which a step of delta
+        # in the direction of each factor stays in [0, 1]
+        sign = rng.choice([-1.0, 1.0], size=(r, d))
+        start = np.floor(halton(0, r, d, scrambling(d, rng))*(levels//2))/(levels - 1)
+        start = np.where(sign > 0, start, start + delta)
+        order = np.argsort(rng.random((r, d)), axis=1)
+        Z = np.repeat(start[:, None], d + 1, axis=1)
+        for k in range(d):
+            step = np.zeros((r, d))
+            step[np.arange(r), order[:, k]] = sign[np.arange(r), order[:, k]]*delta
+            Z[:, k + 1:] += step[:, None]
+        size = max(1, self.chunk//(d + 1))
+        ranges = [(first, min(first + size, r)) for first in range(0, r, size)]
+        Y = np.concatenate(self.map(_MorrisBlock(self, Z), ranges, workers or os.cpu_count() or 1))
+        Y = Y.reshape(r, d + 1, -1)
+        effects = np.empty((r, d, Y.shape[-1]))
+        for k in range(d):
+            i = order[:, k]
+            effects[np.arange(r), i] = (Y[:, k + 1] - Y[:, k])*(sign[np.arange(r), i]/delta)[:, None]
+        return Morris(self.names, effects.mean(axis=0), np.abs(effects).mean(axis=0),
+                      effects.std(axis=0, ddof=1), r)
+
+
+class _SaltelliBlock:
+    # Picklable function of a block of base points, for the process pool
+    def __init__(self, analysis, permutations):
+        self.analysis, self.permutations = analysis, permutations
+
+    def __call__(self, start, stop):
+        return self.analysis.saltelli_block(start, stop, self.permutations)
+
+
+class _MorrisBlock:
+    def __init__(self, analysis, Z):
+        self.analysis, self.Z = analysis, Z
+
+    def __call__(self, start, stop):
+        return self.analysis.evaluate(self.Z[start:stop].reshape(-1, self.analysis.d))
+
+
+def sobol_indices(YA, YB, YAB):
+    # First-order (Saltelli 2010) and total (Jansen 1999) indices (d, q) from the outputs of
+    # A and B (N, q) and A_B^i (d, N, q), and the variance of the outputs (q,)
+    variance = np.var(np.concatenate([YA, YB]), axis=0)
+    variance = np.where(variance > 0, variance, np.nan)
+    S1 = np.mean(YB*(YAB - YA), axis=1)/variance
+    ST = 0.5*np.mean((YA - YAB)**2, axis=1)/variance
+    return S1, ST, variance
+
+
+def main(args):
+    import time
+    analysis = GlobalSensitivity(args.names, scenario=args.scenario, T=args.T, dt=args.dt, chunk=args.chunk)
+    output = OUTPUTS.index(args.output)
+    start = time.perf_counter()
+    if args.morris:
+        morris = analysis.morris(args.N, rng=args.seed, workers=args.workers)
+        print('Morris screening of %s at t=%g: %d runs in %.1f s'
+              % (args.output, args.T, args.N*(analysis.d + 1), time.perf_counter() - start))
+        print('%-8s %10s %10s %10s' % ('', 'mu*', 'mu', 'sigma'))
+        for i in np.argsort(-morris.mu_star[:, output]):
+            print('%-8s %10.4g %10.4g %10.4g' % (morris.names[i], morris.mu_star[i, output],
+                                                 morris.mu[i, output], morris.sigma[i, output]))
+        return
+    sobol = analysis.sobol(args.N, rng=args.seed, workers=args.workers)
+    print('Sobol indices of %s at t=%g: %d runs in %.1f s'
+          % (args.output, args.T, args.N*(analysis.d + 2), time.perf_counter() - start))
+    print('%-8s %18s %18s' % ('', 'first order', 'total'))
+    for i in np.argsort(-sobol.ST[:, output]):
+        print('%-8s %6.3f [%5.2f, %5.2f] %6.3f [%5.2f, %5.2f]'
+              % (sobol.names[i], sobol.S1[i, output], sobol.S1_conf[0, i, output], sobol.S1_conf[1, i, output],
+                 sobol.ST[i, output], sobol.ST_conf[0, i, output], sobol.ST_conf[1, i, output]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sobol indices and Morris screening of the 2100 outcomes.")
+    parser.add_argument("--names", nargs="+", help="Parameters to vary (default: the 24 rates)")
+    parser.add_argument("--scenario", default='S0000', choices=list(SCENARIOS), help="Scenario of the other parameters")
+    parser.add_argument("--N", type=int, default=1024, help="Base points (Sobol) or trajectories (--morris)")
+    parser.add_argument("--morris", action="store_true", help="Morris screening instead of Sobol indices")
+    parser.add_argument("--output", default='B', choices=OUTPUTS, help="Output to report")
+    parser.add_argument("--T", type=float, default=168, help="Time of the outcomes")
+    parser.add_argument("--dt", type=float, default=1.0, help="RK4 step")
+    parser.add_argument("--chunk", type=int, default=4096, help="Runs per ensemble")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (0: one per core)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the randomisation")
+    args = parser.parse_args()
+    main(args)
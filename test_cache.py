@@ -0,0 +1,56 @@
+# ResultCache: hits return the stored run, and only reproducible stochastic runs are cached.
+#
+#   python -m pytest test_cache.py
+
+import numpy as np
+import Model
+from cache import ResultCache
+from ODESolver import RungeKutta4
+from SDESolver import EulerMaruyama
+from Stochastic_model import VBC, SCENARIOS
+
+TIME_POINTS = np.linspace(0, 20, 101)
+
+
+def deterministic_solver(k1=0.5):
+    params = np.full(24, 0.05)
+    params[Model.VBC.PARAMETERS.index('k1')] = k1
+    solver = RungeKutta4(Model.VBC.from_array(params))
+    solver.set_initial_condition(np.full(6, 1000.0))
+    return solver
+
+
+def stochastic_solver():
+    scenario = SCENARIOS['S0000']
+    model = VBC(**scenario.params)
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (3, 1)))
+    return solver
+
+
+def test_deterministic_hit(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    u, t = cache.solve(deterministic_solver(), TIME_POINTS)
+    u_hit, t_hit = cache.solve(deterministic_solver(), TIME_POINTS)
+    assert (cache.hits, cache.misses) == (1, 1)
+    np.testing.assert_array_equal(u_hit, u)
+    # Another parameter value is another run
+    cache.solve(deterministic_solver(k1=0.6), TIME_POINTS)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_stochastic_runs(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    u, t = cache.solve(stochastic_solver(), TIME_POINTS, rng=3)
+    u_hit, t_hit = cache.solve(stochastic_solver(), TIME_POINTS, rng=3)
+    assert cache.hits == 1
+    np.testing.assert_array_equal(u_hit, u)
+    # A Generator draws differently every call, so its runs are not stored
+    cache.solve(stochastic_solver(), TIME_POINTS, rng=np.random.default_rng(3))
+    assert len(cache.entries()) == 1
+
+
+def test_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1, compress=False)
+    cache.solve(deterministic_solver(), TIME_POINTS)
+    assert cache.entries() == []
@@ -0,0 +1,65 @@
+# checkpoint.solve: an interrupted run resumes bit-identically, and runs that cannot be resumed
+# are refused.
+#
+#   python -m pytest test_checkpoint.py
+
+import numpy as np
+import pytest
+import checkpoint
+import Model
+from ODESolver import DormandPrince45
+from SDESolver import EulerMaruyama, random_stream
+from Stochastic_model import VBC, SCENARIOS
+
+TIME_POINTS = np.linspace(0, 100, 501)
+
+
+class Interrupted(Exception):
+    pass
+
+
+def stochastic_solver():
+    scenario = SCENARIOS['S0000']
+    model = VBC(**scenario.params)
+    solver = EulerMaruyama(model.drift, model.diffusion)
+    solver.set_initial_condition(np.tile(scenario.U0, (5, 1)))
+    return solver
+
+
+def interrupt(solver, after):
+    # Make iter_solve of solver raise after `after` chunks
+    iter_solve = solver.iter_solve
+    def chunks(*args, **kwargs):
+        for i, chunk in enumerate(iter_solve(*args, **kwargs)):
+            if i == after:
+                raise Interrupted
+            yield chunk
+    solver.iter_solve = chunks
+
+
+def test_resume_is_bit_identical(tmp_path):
+    directory = str(tmp_path)
+    expected, t = stochastic_solver().solve(TIME_POINTS, rng=random_stream(0, 1))
+    solver = stochastic_solver()
+    interrupt(solver, 3)
+    with pytest.raises(Interrupted):
+        checkpoint.solve(solver, TIME_POINTS, directory, interval=0, chunk_size=100, rng=random_stream(0, 1))
+    assert 1 < checkpoint.load_state(directory)['n'] < len(TIME_POINTS)
+    u, t = checkpoint.solve(stochastic_solver(), TIME_POINTS, directory, interval=0, chunk_size=100,
+                            rng=random_stream(0, 1))
+    np.testing.assert_array_equal(u, expected)
+
+
+def test_refused(tmp_path):
+    with pytest.raises(ValueError):
+        checkpoint.solve(stochastic_solver(), TIME_POINTS, str(tmp_path / 'unseeded'))
+    model = Model.VBC.from_array(np.full(24, 0.05))
+    solver = DormandPrince45(model)
+    solver.set_initial_condition(np.full(6, 1000.0))
+    with pytest.raises(ValueError):
+        checkpoint.solve(solver, TIME_POINTS, str(tmp_path / 'adaptive'))
+    # Another run in the same directory
+    directory = str(tmp_path / 'run')
+    checkpoint.solve(stochastic_solver(), TIME_POINTS, directory, rng=0)
+    with pytest.raises(ValueError):
+        checkpoint.solve(stochastic_solver(), TIME_POINTS, directory, rng=1)
@@ -0,0 +1,71 @@
+# Analytic Jacobians of the VBC models (VBC.jac, VBC.param_jac) against central finite
+# differences of their right-hand sides, for one system and for an ensemble.
+#
+#   python -m pytest test_jacobian.py
+
+import numpy as np
+import Model
+import Stochastic_model
+
+RTOL = 1e-7
+
+
+def random_parameters(n_parameters, n_members=None, seed=0):
+    shape = (n_parameters,) if n_members is None else (n_members, n_parameters)
+    return np.random.default_rng(seed).uniform(0.01, 0.5, shape)
+
+
+def random_states(n_members=None, seed=1):
+    shape = (6,) if n_members is None else (6, n_members)
+    return np.random.default_rng(seed).uniform(1e6, 5e7, shape)
+
+
+def state_differences(f, u, t):
+    # (6, 6[, n_members]) central differences of f(u, t) with respect to u
+    J = np.zeros((6,) + u.shape)
+    for j in range(6):
+        h = 1e-6*u[j]
+        up, down = u.copy(), u.copy()
+        up[j] += h
+        down[j] -= h
+        J[:, j] = (np.asarray(f(up, t)) - np.asarray(f(down, t)))/(2*h)
+    return J
+
+
+def parameter_differences(cls, params, u, t, rhs):
+    # (6, p[, n_members]) central differences of rhs(cls.from_array(params)) with respect to
+    # the parameters, in PARAMETERS order
+    p = params.shape[-1]
+    P = np.zeros((6, p) + u.shape[1:])
+    for j in range(p):
+        h = 1e-6*np.maximum(np.abs(params[..., j]), 1e-3)
+        up, down = params.copy(), params.copy()
+        up[..., j] += h
+        down[..., j] -= h
+        P[:, j] = (np.asarray(rhs(cls.from_array(up))(u, t)) - np.asarray(rhs(cls.from_array(down))(u, t)))/(2*h)
+    return P
+
+
+def assert_close(analytic, numerical):
+    np.testing.assert_allclose(analytic, numerical, rtol=0, atol=RTOL*np.abs(numerical).max())
+
+
+def test_deterministic_jacobians():
+    for n_members in (None, 5):
+        params = random_parameters(24, n_members)
+        u = random_states(n_members)
+        model = Model.VBC.from_array(params)
+        assert_close(model.jac(u, 0.0), state_differences(model, u, 0.0))
+        assert_close(model.param_jac(u, 0.0), parameter_differences(Model.VBC, params, u, 0.0, lambda m: m))
+
+
+def test_stochastic_drift_jacobians():
+    # Before and after the cutoff, where the projection parameters take over
+    for t in (10.0, Stochastic_model.CUTOFF + 10.0):
+        for n_members in (None, 5):
+            params = random_parameters(50, n_members)
+            u = random_states(n_members)
+            model = Stochastic_model.VBC.from_array(params)
+            assert_close(model.jac(u, t), state_differences(model.drift, u, t))
+            assert_close(model.param_jac(u, t),
+                         parameter_differences(Stochastic_model.VBC, params, u, t, lambda m: m.drift))
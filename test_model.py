@@ -0,0 +1,51 @@
+# VBC.__call__ evaluated into out (VBC.evaluate_into) against the expression path, and the
+# invalidation of its workspace.
+#
+#   python -m pytest test_model.py
+
+import numpy as np
+import Model
+from ODESolver import RungeKutta4, RungeKutta4InPlace
+
+PARAMS = np.random.default_rng(0).uniform(0.01, 0.5, 24)
+U0 = np.random.default_rng(1).uniform(1e6, 5e7, 6)
+
+
+def test_out_matches_expressions():
+    for n_members in (None, 5):
+        if n_members is None:
+            model, u = Model.VBC.from_array(PARAMS), U0
+        else:
+            model = Model.VBC.from_array(np.tile(PARAMS, (n_members, 1)))
+            u = np.tile(U0, (n_members, 1)).T
+        out = np.empty(u.shape)
+        assert model(u, 0.0, out) is out
+        np.testing.assert_allclose(out, np.array(model(u, 0.0)), rtol=1e-12)
+
+
+def test_reassigned_parameter():
+    model = Model.VBC.from_array(PARAMS)
+    out = np.empty(6)
+    for k1 in (0.7, 0.2, 0.7):
+        model.k1 = k1
+        model(U0, 0.0, out)
+        np.testing.assert_allclose(out, np.array(model(U0, 0.0)), rtol=1e-12)
+
+
+def test_workspace_not_an_attribute():
+    model = Model.VBC.from_array(PARAMS)
+    before = dict(vars(model))
+    model(U0, 0.0, np.empty(6))
+    assert vars(model).keys() == before.keys()
+    assert model in Model.WORKSPACES
+
+
+def test_in_place_solver():
+    time_points = np.linspace(0, 50, 501)
+    model = Model.VBC.from_array(PARAMS)
+    solutions = []
+    for solver_class in (RungeKutta4, RungeKutta4InPlace):
+        solver = solver_class(model)
+        solver.set_initial_condition(U0)
+        solutions.append(solver.solve(time_points)[0])
+    np.testing.assert_allclose(solutions[1], solutions[0], rtol=1e-12)
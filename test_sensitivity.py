@@ -0,0 +1,54 @@
+# Forward sensitivities (sensitivity.Sensitivities) against central finite differences of the
+# RungeKutta4 solution.
+#
+#   python -m pytest test_sensitivity.py
+
+import numpy as np
+import Model
+import Stochastic_model
+from ODESolver import RungeKutta4
+from sensitivity import Sensitivities, INITIAL_CONDITIONS
+
+
+def solution(model, U0, time_points):
+    solver = RungeKutta4(model.drift if hasattr(model, 'drift') else model)
+    solver.set_initial_condition(U0)
+    return solver.solve(time_points)[0]
+
+
+def finite_differences(cls, params, U0, time_points, names):
+    # (N, 6, p) central differences of the solution with respect to names
+    x = np.concatenate([params, U0]).astype(float)
+    p = len(params)
+    columns = []
+    for name in names:
+        i = p + INITIAL_CONDITIONS.index(name) if name in INITIAL_CONDITIONS else cls.PARAMETERS.index(name)
+        h = 1e-6*abs(x[i])
+        up, down = x.copy(), x.copy()
+        up[i] += h
+        down[i] -= h
+        columns.append((solution(cls.from_array(up[:p]), up[p:], time_points) -
+                        solution(cls.from_array(down[:p]), down[p:], time_points))/(2*h))
+    return np.stack(columns, axis=-1)
+
+
+def check(cls, params, U0, time_points, names):
+    model = cls.from_array(params)
+    u, S, t = Sensitivities(model, names).solve(U0, time_points)
+    np.testing.assert_allclose(u, solution(model, U0, time_points), rtol=1e-12)
+    F = finite_differences(cls, params, U0, time_points, names)
+    for j in range(len(names)):
+        np.testing.assert_allclose(S[..., j], F[..., j], rtol=0, atol=1e-5*np.abs(F[..., j]).max())
+
+
+def test_deterministic():
+    params = np.random.default_rng(0).uniform(0.01, 0.3, 24)
+    U0 = np.random.default_rng(1).uniform(1e3, 5e3, 6)
+    check(Model.VBC, params, U0, np.linspace(0, 20, 201), ['k1', 'phi2', 'gamma3', 'mu1', 'B0'])
+
+
+def test_stochastic_drift():
+    # Across the cutoff, where the projection parameters take over
+    scenario = Stochastic_model.SCENARIOS['S0000']
+    params = np.array(scenario.params.values, float)
+    check(Stochastic_model.VBC, params, scenario.U0, np.linspace(80, 100, 101), ['k1', 'k1t', 'phi3t', 'C0'])
@@ -0,0 +1,146 @@
+# On-disk store for large ensembles of trajectories.
+#
+# An ensemble of n_members runs over N time points with neq variables lives in a directory:
+#   u.npy       (n_members, N, neq) trajectories, one contiguous block per member
+#   done.npy    (n_members,) flags of the members written so far
+#   t.npy       (N,) time grid
+#   params.npy  (n_members, n_params) parameters of each member (optional)
+#   seeds.npy   (n_members,) random seed of each member (optional)
+#   meta.json   shape, dtype, parameter and variable names and free-form attributes
+# The arrays are .npy files opened as memory maps, so members are written straight to disk
+# as they are computed, and analyses read slices (a member, a time point over all members)
+# as views without loading the ensemble. 100k stochastic runs of 840 steps take 4 GB in
+# float64 (2 GB with dtype='float32') on disk but only the pages touched in memory.
+#
+#   store = EnsembleStore.create('S0000', 100000, time_points, 6, seeds=np.arange(100000))
+#   for start in range(0, 100000, 1000):
+#       solver.set_initial_condition(np.tile(U0, (1000, 1)))
+#       u, t = solver.solve(time_points, rng=start)
+#       store.write_solution(start, u)   # (N, 1000, 6) as returned by the solvers
+#   final = EnsembleStore.open('S0000').at_time(-1)   # (100000, 6) view
+
+import json
+import os
+import numpy as np
+
+VARIABLES = ('V1', 'B', 'C', 'V2', 'D', 'E')
+
+
+class EnsembleStore:
+    def __init__(self, path, mode='r'):
+        # Open an existing store; mode 'r' (read only) or 'r+' (to write members)
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.u = np.load(os.path.join(path, 'u.npy'), mmap_mode=mode)
+        self.done = np.load(os.path.join(path, 'done.npy'), mmap_mode=mode)
+        self.t = np.load(os.path.join(path, 't.npy'))
+        self.params = self.load_optional('params.npy', mode)
+        self.seeds = self.load_optional('seeds.npy', mode)
+
+    def load_optional(self, name, mode):
+        path = os.path.join(self.path, name)
+        return np.load(path, mmap_mode=mode) if os.path.exists(path) else None
+
+    @classmethod
+    def create(cls, path, n_members, time_points, neq, params=None, seeds=None, parameter_names=None,
+               variables=None, dtype='float64', attrs=None):
+        # Preallocate the store for n_members runs of neq variables over time_points.
+        # attrs: JSON-serializable metadata (scenario name, solver, dt, ...)
+        os.makedirs(path, exist_ok=True)
+        time_points = np.asarray(time_points, float)
+        shape = (n_members, len(time_points), neq)
+        np.lib.format.open_memmap(os.path.join(path, 'u.npy'), mode='w+', dtype=dtype, shape=shape).flush()
+        np.save(os.path.join(path, 'done.npy'), np.zeros(n_members, bool))
+        np.save(os.path.join(path, 't.npy'), time_points)
+        if params is not None:
+            params = np.asarray(params, float)
+            if len(params) != n_members:
+                raise ValueError("EnsembleStore: %d parameter rows for %d members" % (len(params), n_members))
+            np.save(os.path.join(path, 'params.npy'), params)
+        if seeds is not None:
+            np.save(os.path.join(path, 'seeds.npy'), np.asarray(seeds, np.int64))
+        if variables is None and neq == len(VARIABLES):
+            variables = VARIABLES
+        meta = {'n_members': n_members, 'n_times': len(time_points), 'neq': neq, 'dtype': np.dtype(dtype).str,
+                'variables': list(variables) if variables is not None else None,
+                'parameter_names': list(parameter_names) if parameter_names is not None else None,
+                'attrs': attrs or {}}
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        return cls(path, mode='r+')
+
+    @classmethod
+    def open(cls, path, mode='r'):
+        return cls(path, mode)
+
+    @property
+    def n_members(self):
+        return self.u.shape[0]
+
+    @property
+    def variables(self):
+        return self.meta['variables']
+
+    # Writing
+
+    def write(self, start, u):
+        # Members start, start+1, ... from u of shape (k, N, neq). The trajectories reach the
+        # file before the members are flagged as written, so an interrupted run never leaves
+        # a flagged member incomplete
+        u = np.asarray(u)
+        self.u[start:start + len(u)] = u
+        self.u.flush()
+        self.done[start:start + len(u)] = True
+
+    def write_solution(self, start, u):
+        # As write(), from a solver result of shape (N, k, neq) or (N, neq) for one member
+        u = np.asarray(u)
+        if u.ndim == 2:
+            u = u[:, None]
+        self.write(start, np.swapaxes(u, 0, 1))
+
+    def flush(self):
+        self.u.flush()
+        self.done.flush()
+
+    def missing(self):
+        # Members not written yet (e.g. to resume an interrupted run)
+        return np.flatnonzero(~np.asarray(self.done))
+
+    # Reading: views into the memory map
+
+    def member(self, i):
+        # (N, neq) trajectory of member i
+        return self.u[i]
+
+    def at_time(self, i):
+        # (n_members, neq) states of all members at time index i
+        return self.u[:, i]
+
+    def variable(self, name):
+        # (n_members, N) trajectories of one variable, by name or index
+        j = self.variables.index(name) if isinstance(name, str) else name
+        return self.u[..., j]
+
+    def chunks(self, size=1024):
+        # (start, u[start:start+size]) over the members, to reduce an ensemble that does
+        # not fit in memory chunk by chunk
+        for start in range(0, self.n_members, size):
+            yield start, self.u[start:start + size]
+
+    def mean(self, size=1024):
+        # Mean trajectory (N, neq) over the members, accumulated chunk by chunk
+        total = np.zeros(self.u.shape[1:])
+        for start, chunk in self.chunks(size):
+            total += chunk.sum(axis=0, dtype=float)
+        return total/self.n_members
+
+    def quantiles(self, q, time_index=None, variable=None):
+        # Quantiles over the members, at one time index and/or of one variable to keep the
+        # data read bounded
+        u = self.u if time_index is None else self.u[:, time_index]
+        if variable is not None:
+            j = self.variables.index(variable) if isinstance(variable, str) else variable
+            u = u[..., j]
+        return np.quantile(u, q, axis=0)